@@ -0,0 +1,177 @@
+"""
+Attribute alignment: pair a golden product's attributes with scraped products' attributes
+- Every label is reduced to a skeleton, its lowercase letters and digits only, so amz_scraper's
+  "Country of Origin" meets scraper.py's "Country of Origin :" with its LRM/RLM marks
+- ALIASES maps known Amazon label variants to one canonical label; its skeleton index is
+  built once at import, so an alias lookup is one dict access
+- Golden attributes without an exact or alias match fall back to the closest remaining
+  scraped label (difflib, FUZZY_CUTOFF), which also absorbs small spelling differences
+- align_batch() prepares the golden side once and aligns it against any number of products
+"""
+
+import difflib
+import functools
+import re
+
+import metrics
+
+# Ratio (0-1) a fuzzy match needs between two label skeletons
+FUZZY_CUTOFF = 0.8
+
+# Canonical label -> variants Amazon (or the golden sheet) uses for the same attribute
+ALIASES = {
+    "Product Dimensions": ("Item Dimensions", "Item Dimensions LxWxH", "Package Dimensions", "Dimensions"),
+    "Item Weight": ("Weight", "Product Weight", "Package Weight"),
+    "Country of Origin": ("Country of Manufacture", "Origin"),
+    "Item model number": ("Model Number", "Model"),
+    "Item part number": ("Part Number",),
+    "Generic Name": ("Item Type Name", "Product Type"),
+    "Date First Available": ("Launch Date", "Release Date"),
+    "Target Gender": ("Gender",),
+    "Material": ("Material composition", "Material Type", "Fabric", "Fabric Type", "Outer Material"),
+    "Sleeve type": ("Sleeves", "Sleeve", "Sleeve Style"),
+    "Fit type": ("Fit",),
+    "Neck style": ("Neck Type", "Neck", "Neckline"),
+    "Collar style": ("Collar", "Collar Type"),
+    "Color": ("Colour", "Color Name", "Colour Name"),
+    "Brand": ("Brand Name",),
+    "Pattern": ("Pattern Name", "Print"),
+    "Occasion": ("Occasion Type",),
+    "Care instructions": ("Care Instruction", "Wash Care", "Care"),
+    "Closure type": ("Closure",),
+    "Net Quantity": ("Quantity", "Number of Items", "Item Count"),
+    "Manufacturer": ("Manufacturer Name", "Manufactured By"),
+    "Packer": ("Packed By", "Packer Details"),
+    "Importer": ("Imported By", "Importer Details"),
+}
+
+# (array key, nested details key, section) for the scraped product shapes the frontend uses
+SECTIONS = (
+    ("productDetailsArray", "productDetails", "Product Details"),
+    ("manufacturingDetailsArray", "manufacturingDetails", "Manufacturing Details"),
+    ("additionalInfoArray", "additionalInfo", "Additional Information"),
+)
+
+_NOT_ALNUM = re.compile(r'[^a-z0-9]+')
+_CAMEL = re.compile(r'([A-Z])')
+
+
+def skeleton(key):
+    """Comparable form of a label, the same for its clean and raw (marks, colon, case) spellings"""
+    return _NOT_ALNUM.sub('', str(key or '').lower())
+
+
+ALIAS_INDEX = {}
+for _canonical, _variants in ALIASES.items():
+    for _variant in (_canonical,) + _variants:
+        ALIAS_INDEX.setdefault(skeleton(_variant), skeleton(_canonical))
+
+
+@functools.lru_cache(maxsize=4096)
+def canonical_key(key):
+    """(canonical skeleton, True if it came from ALIASES) for a label"""
+    sk = skeleton(key)
+    canonical = ALIAS_INDEX.get(sk)
+    if canonical is not None and canonical != sk:
+        return canonical, True
+    return sk, False
+
+
+def attributes_of(product):
+    """[(label, value, section)] from a golden or scraped product, read like the comparator page does"""
+    details = product.get("details")
+    if isinstance(details, dict) and not any(isinstance(details.get(name), list) for _, name, _ in SECTIONS):
+        # Mock / golden format: {"neckType": "Round Neck", ...}
+        return [(_CAMEL.sub(r' \1', str(key)).strip(), value, "Product Details") for key, value in details.items()]
+
+    nested = details if isinstance(details, dict) else {}
+    attributes = []
+    for array_key, name, section in SECTIONS:
+        for item in product.get(array_key) or nested.get(name) or []:
+            if isinstance(item, dict):
+                label = item.get("label") or item.get("key") or "Attribute"
+                attributes.append((str(label).strip(), item.get("value") or "N/A", section))
+    return attributes
+
+
+class GoldenIndex:
+    """A golden product's attributes with their canonical keys, prepared once per batch"""
+
+    def __init__(self, golden):
+        self.attributes = [(label, value, section, canonical_key(label))
+                           for label, value, section in attributes_of(golden)]
+
+
+def align(index, product):
+    """Aligned attribute list (the comparator page's shape) plus match counts for one product"""
+    scraped = {}
+    for label, value, section in attributes_of(product):
+        # The first label wins when two reduce to the same key, as in the page's key map
+        scraped.setdefault(canonical_key(label)[0], (label, value, section))
+
+    aligned = []
+    unmatched = []
+    for position, (label, value, section, (canonical, _)) in enumerate(index.attributes):
+        row = {
+            "id": position,
+            "key": label,
+            "goldenValue": value,
+            "scrapedValue": "",
+            "scrapedKey": None,
+            "section": section,
+            "isMatched": False,
+            "match": None,
+        }
+        match = scraped.pop(canonical, None)
+        if match is not None:
+            # Same label on both sides is exact even when it is one of an alias's variants
+            _fill(row, match, "exact" if skeleton(label) == skeleton(match[0]) else "alias")
+        else:
+            unmatched.append((row, canonical))
+        aligned.append(row)
+
+    # Fuzzy matches only compete for the labels no exact or alias match took
+    for row, canonical in unmatched:
+        close = difflib.get_close_matches(canonical, list(scraped), n=1, cutoff=FUZZY_CUTOFF)
+        if close:
+            _fill(row, scraped.pop(close[0]), "fuzzy")
+            row["score"] = round(difflib.SequenceMatcher(None, canonical, close[0]).ratio(), 3)
+
+    for label, value, section in scraped.values():
+        aligned.append({
+            "id": len(aligned),
+            "key": label,
+            "goldenValue": "",
+            "scrapedValue": value,
+            "scrapedKey": label,
+            "section": section,
+            "isMatched": False,
+            "isExtra": True,
+            "match": None,
+        })
+
+    counts = {"exact": 0, "alias": 0, "fuzzy": 0, "none": 0}
+    for row in aligned[:len(index.attributes)]:
+        counts[row["match"] or "none"] += 1
+    for kind, count in counts.items():
+        if count:
+            metrics.ALIGNED_ATTRIBUTES.inc(count, match=kind)
+
+    return {
+        "aligned": aligned,
+        "matched": len(index.attributes) - counts.pop("none"),
+        "total": len(index.attributes),
+        "extra": len(scraped),
+        "matches": counts,
+    }
+
+
+def _fill(row, match, kind):
+    label, value, _ = match
+    row.update(scrapedValue=value, scrapedKey=label, isMatched=True, match=kind)
+
+
+def align_batch(golden, products):
+    """Align one golden product against each scraped product, in order"""
+    index = GoldenIndex(golden)
+    return [align(index, product) for product in products]
@@ -0,0 +1,37 @@
+"""
+Alignment blueprint: golden vs scraped attribute alignment in one batched call
+- POST /api/align-attributes {"golden": {...}, "products": [{...}, ...]} (or "product": {...})
+- Products take any shape the comparator page reads (details dict, *DetailsArray lists, or an
+  /api/scrape-product response); results come back in the same order
+"""
+
+from flask import Blueprint, request, jsonify
+
+import alignment
+import logs
+from executors import run_in_pool
+
+align_bp = Blueprint("align", __name__)
+log = logs.get_logger("align")
+
+MAX_PRODUCTS = 500
+
+
+@align_bp.route("/api/align-attributes", methods=["POST"])
+@run_in_pool("align")
+def align_attributes():
+    data = request.get_json(silent=True) or {}
+    golden = data.get("golden")
+    products = data.get("products")
+    if products is None and data.get("product") is not None:
+        products = [data["product"]]
+    if not isinstance(golden, dict) or not isinstance(products, list):
+        return jsonify({"success": False, "error": 'Send a "golden" product and a "products" list'}), 400
+    if len(products) > MAX_PRODUCTS:
+        return jsonify({"success": False, "error": f"At most {MAX_PRODUCTS} products per call"}), 400
+    if not all(isinstance(product, dict) for product in products):
+        return jsonify({"success": False, "error": "Every product must be an object"}), 400
+
+    results = alignment.align_batch(golden, products)
+    log.info("🧩 Aligned %d golden attributes against %d products", results[0]["total"] if results else 0, len(products))
+    return jsonify({"success": True, "results": results})
@@ -7,136 +7,41 @@ Universal Amazon Scraper 507 - Complete Fix
 - Product details only from productFactsDesktopExpander
 """
 
-import requests
-from bs4 import BeautifulSoup
-import sys
+import argparse
 import re
 import json
 import os
 import urllib.request
-from urllib.parse import urljoin, urlparse
+
+import extraction
+import fetcher
+import image_data
+import image_probe
+import jsonl_serve
+import logs
+import metrics
+import rate_limit
+import serialization
+import tracing
+from cleaners import safe_extract, clean_key, clean_value, should_exclude_key
+from extraction import Derived, FieldSpec, text_of
+from serialization import select_fields
+
+log = logs.get_logger("amz_scraper")
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
     "Accept-Language": "en-US,en;q=0.9",
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
-    "Accept-Encoding": "gzip, deflate, br"
+    "Accept-Encoding": fetcher.ACCEPT_ENCODING
 }
 
-def safe_extract(element, default="N/A"):
-    """Safely extract text from BeautifulSoup element"""
-    if element:
-        text = element.get_text(strip=True)
-        # Fix text corruption in extracted text
-        text = fix_text_corruption(text)
-        return text if text else default
-    return default
-
-def fix_text_corruption(text):
-    """Fix ALL text corruption issues comprehensively"""
-    if not text:
-        return text
-    
-    # Comprehensive corruption fixes - covers ALL patterns
-    corruption_fixes = {
-        # Word-level fixes with space issues
-        r'\bP\s*o\s*duct\b': 'Product',
-        r'\bDi\s*m?\s*ensions\b': 'Dimensions',
-        r'\bDate\s+Fi\s*r?\s*st\b': 'Date First',
-        r'\bAvai\s*l?\s*ab\s*l?\s*e\b': 'Available',
-        r'\bManufactu\s*r?\s*e\b': 'Manufacturer',
-        r'\bIte\s*m?\s*\b': 'Item ',
-        r'\bMode\s*l?\s*nNu\s*m?\s*be\s*r?\b': 'Model Number',
-        r'\bMode\s*l?\s*\b': 'Model',
-        r'\bNu\s*m?\s*be\s*r?\b': 'Number',
-        r'\bDepa\s*r?\s*t\s*m?\s*ent\b': 'Department',
-        r'\bPacke\s*r?\s*\b': 'Packer',
-        r'\bI\s*m?\s*po\s*r?\s*te\s*r?\b': 'Importer',
-        r'\bGene\s*r?\s*ic\s+Na\s*m?\s*e\b': 'Generic Name',
-        r'\bBest\s+Se\s*l?\s*e\s*r?\s*s\s+Rank\b': 'Best Sellers Rank',
-        r'\bCusto\s*m?\s*e\s*r?\s+Reviews\b': 'Customer Reviews',
-        r'\bSe\s*l?\s*e\s*r?\s*s\b': 'Sellers',
-        
-        # Compound word fixes
-        r'\bDi\s+Di\s+ensions\b': 'Dimensions',
-        r'\bIte\s+Mode\s+nNu\s+be\b': 'Item Model Number',
-        r'\bIte\s+Weight\b': 'Item Weight',
-        r'\bIte\s+Di\s+Di\s+ensions\b': 'Item Dimensions',
-        
-        # Single letter/syllable fixes
-        r'\bens\b': 'Mens',
-        r'\bW\s*e?\s*ight\b': 'Weight',
-        r'\bNam\s*e?\s*\b': 'Name',
-        r'\bR\s*a?\s*nk\b': 'Rank',
-        
-        # Common partial word corruption
-        r'odel\s+nu': 'Model Nu',
-        r'ensions': 'Dimensions',
-        r'epartm': 'Departm',
-        r'mport': 'Import',
-        r'anufact': 'Manufact',
-    }
-    
-    # Apply all fixes
-    for corrupted, fixed in corruption_fixes.items():
-        text = re.sub(corrupted, fixed, text, flags=re.IGNORECASE)
-    
-    # Remove extra spaces between words
-    text = re.sub(r'\s+', ' ', text)
-    
-    return text.strip()
-
-def clean_key(key):
-    """Clean key by removing special characters and fixing text corruption"""
-    if not key:
-        return key
-    
-    # First, fix text corruption
-    key = fix_text_corruption(key)
-    
-    # Remove special characters
-    key = re.sub(r'[&rlm;&lrm;‏‎]+', '', key)
-    key = re.sub(r'\s*:\s*$', '', key)
-    
-    # Clean up whitespace
-    key = re.sub(r'\s+', ' ', key).strip()
-    
-    return key
-
-def clean_value(value):
-    """Clean value text"""
-    if not value:
-        return value
-    
-    # Fix text corruption
-    value = fix_text_corruption(value)
-    
-    # Remove special characters
-    value = re.sub(r'^[:\s&rlm;&lrm;‏‎]+', '', value)
-    value = re.sub(r'[:\s&rlm;&lrm;‏‎]+$', '', value)
-    
-    return value.strip()
+REQUEST_TIMEOUT = 30
+# Longest a scrape waits for Amazon's rate limiter / circuit breaker before giving up
+MAX_PACING_WAIT = 60
 
-def should_exclude_key(key):
-    """Check if key should be excluded from all sections"""
-    if not key:
-        return True
-    
-    key_lower = key.lower()
-    
-    # Excluded keys list
-    excluded_keywords = [
-        'best sellers rank',
-        'best seller rank',
-        'customer reviews',
-        'customer review',
-        'manufacturer',
-        'packer',
-        'importer',
-        'asin'  # ASIN handled separately
-    ]
-    
-    return any(excluded in key_lower for excluded in excluded_keywords)
+# Stop reading the page once every section the extractors use has arrived (STREAM_FETCH=0 reads it all)
+STREAM_FETCH = os.environ.get("STREAM_FETCH", "1") != "0"
 
 def download_images(image_urls, asin, download_dir="downloaded_images"):
     """Download images to local directory"""
@@ -156,309 +61,320 @@ def download_images(image_urls, asin, download_dir="downloaded_images"):
             urllib.request.urlretrieve(img_url, filepath)
             
             downloaded_paths.append(filepath)
-            print(f"Downloaded: {filename}", file=sys.stderr)
+            log.debug("Downloaded: %s", filename, extra=logs.SAMPLED)
         except Exception as e:
-            print(f"Failed to download image {i+1}: {e}", file=sys.stderr)
+            log.warning("Failed to download image %d: %s", i + 1, e)
     
     return downloaded_paths
 
-def scrape_amazon(url):
-    try:
-        print(f"🔍 Starting scrape for: {url}", file=sys.stderr)
-        response = requests.get(url, headers=HEADERS, timeout=30)
-        if response.status_code != 200:
-            print(f"❌ HTTP Error: {response.status_code}", file=sys.stderr)
-            return {"success": False, "error": f"Failed to fetch page. Status code: {response.status_code}"}
-       
-        print(f"✅ Page fetched successfully (size: {len(response.text)} bytes)", file=sys.stderr)
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        # Extract ASIN from URL
-        asin_match = re.search(r"/dp/([A-Z0-9]{10})", url)
-        asin = asin_match.group(1) if asin_match else "N/A"
-        print(f"📦 ASIN: {asin}", file=sys.stderr)
-
-        # Basic Product Information
-        product_info = extract_basic_info(soup, asin, url)
-        print(f"✅ Basic info extracted - Title: {product_info.get('title', 'N/A')[:50]}...", file=sys.stderr)
-
-        # Product Details Section 1 - ONLY from productFactsDesktopExpander
-        product_details_section1 = extract_product_facts_from_expander_only(soup)
-
-        # About This Item (Feature Bullets)
-        about_this_item = extract_about_this_item_universal(soup)
-        print(f"✅ Feature bullets: {len(about_this_item)}", file=sys.stderr)
-
-        # Additional Information (clean - no manufacturing, no rankings)
-        additional_information = extract_additional_information_clean(soup)
-
-        # Product Description
-        product_description = extract_product_description_universal(soup)
-
-        # Product Details Section 2 (Detail Bullets - clean)
-        product_details_section2 = extract_detail_bullets_clean(soup)
-
-        # Pricing Information
-        pricing_info = extract_pricing_info_universal(soup)
-
-        # Manufacturing Details - ONLY Manufacturer, Packer, Importer, ASIN
-        manufacturing_details = extract_manufacturing_details_only(soup, asin)
-
-        # High Quality Images - EXACTLY 7
-        images = extract_high_quality_images_universal(soup)
-        print(f"📸 Images extracted: {len(images)}", file=sys.stderr)
-        
-        # Download images
-        downloaded_images = download_images(images, asin)
-        print(f"💾 Images downloaded: {len(downloaded_images)}", file=sys.stderr)
-
-        result = {
-            "success": True,
-            "basic_information": product_info,
-            "product_details_section1": product_details_section1,
-            "about_this_item": about_this_item,
-            "additional_information": additional_information,
-            "product_description": product_description,
-            "product_details_section2": product_details_section2,
-            "pricing_information": pricing_info,
-            "manufacturing_details": manufacturing_details,
-            "images": {
-                "urls": images,
-                "downloaded_paths": downloaded_images
-            }
+def extract_product(html, url, probe_images=False):
+    """
+    Run the field spec over a fetched product page. No network access unless probe_images,
+    which picks the 7 images from the page's candidates with image_probe.
+    """
+    values = PLAN.run(html, url)
+    if probe_images and image_probe.ENABLED:
+        values["images"] = image_probe.best(values["image_candidates"], fallback=values["images"])
+    log.debug("✅ Basic info extracted - Title: %.50s...", values["title"])
+    log.debug("✅ Feature bullets: %d", len(values["about_this_item"]))
+    log.info("📸 Images extracted: %d", len(values["images"]))
+
+    return {
+        "success": True,
+        "basic_information": {
+            "asin": values["asin"],
+            "title": values["title"],
+            "brand": values["brand"],
+            "url": url
+        },
+        "product_details_section1": values["product_facts"],
+        "about_this_item": values["about_this_item"],
+        "additional_information": values["additional_information"],
+        "product_description": values["product_description"],
+        "product_details_section2": values["detail_bullets"],
+        "pricing_information": values["pricing"],
+        "manufacturing_details": values["manufacturing_details"],
+        "images": {
+            "urls": values["images"]
         }
+    }
 
-        print(f"✅ Scraping completed successfully!", file=sys.stderr)
+def fetch_page(url):
+    """
+    Paced fetch of a product page: (html, None), or (None, error result) for an HTTP error or
+    CAPTCHA. Raises rate_limit.CircuitOpen while the host's breaker is open, or
+    rate_limit.PacingTimeout when the wait for the host's rate limit is too long.
+    """
+    with tracing.span("scrape.pacing") as span:
+        span.set(seconds=round(rate_limit.acquire(url, MAX_PACING_WAIT), 2))
+    try:
+        with metrics.FETCH_SECONDS.time(scraper="amz_scraper"):
+            response = fetcher.get(url, headers=HEADERS, timeout=REQUEST_TIMEOUT,
+                                   sections=STREAM_SECTIONS if STREAM_FETCH else None, scraper="amz_scraper")
+    except Exception:
+        rate_limit.record(url, rate_limit.ERROR)
+        raise
+    if response.status_code != 200:
+        rate_limit.record(url, rate_limit.BLOCKED if response.status_code in (429, 503) else rate_limit.ERROR)
+        log.error("❌ HTTP Error: %s", response.status_code)
+        return None, {"success": False, "error": f"Failed to fetch page. Status code: {response.status_code}"}
+    if fetcher.is_captcha(response.text):
+        rate_limit.record(url, rate_limit.BLOCKED)
+        metrics.CAPTCHA_HITS.inc(scraper="amz_scraper")
+        log.error("❌ CAPTCHA page returned instead of the product")
+        return None, {"success": False, "error": "Amazon CAPTCHA detected. Please try again later or use a different IP."}
+    rate_limit.record(url, rate_limit.OK)
+    log.info("✅ Page fetched successfully (size: %d bytes)", response.bytes_read)
+    return response.text, None
+
+def scrape_amazon(url, download=True):
+    try:
+        log.info("🔍 Starting scrape for: %s", url)
+        html, error = fetch_page(url)
+        if error is not None:
+            return error
+        result = extract_product(html, url, probe_images=image_probe.ENABLED)
+
+        # Download images
+        if download:
+            images = result["images"]["urls"]
+            asin = result["basic_information"]["asin"]
+            with tracing.span("images.download", count=len(images)):
+                downloaded_images = download_images(images, asin)
+            log.info("💾 Images downloaded: %d", len(downloaded_images))
+            result["images"]["downloaded_paths"] = downloaded_images
+
+        log.info("✅ Scraping completed successfully!")
         return result
 
+    except rate_limit.CircuitOpen as e:
+        log.warning("🚧 Not scraping: %s", e)
+        return {"success": False, "error": f"Amazon is blocking requests right now. Please try again in {e.retry_after:.0f} seconds."}
+
+    except rate_limit.PacingTimeout as e:
+        log.warning("⏳ Not scraping: %s", e)
+        return {"success": False, "error": f"Too many Amazon requests are queued right now. Please try again in {e.retry_after:.0f} seconds."}
+
     except Exception as e:
-        print(f"❌ Scraping error: {str(e)}", file=sys.stderr)
-        import traceback
-        traceback.print_exc(file=sys.stderr)
+        log.exception("❌ Scraping error: %s", e)
         return {"success": False, "error": str(e)}
 
-def extract_basic_info(soup, asin, url):
-    """Extract basic product information"""
-    title = "N/A"
-    title_selectors = [
-        "span#productTitle",
-        "h1#title",
-        ".product-title-word",
-        "#titleSection h1",
-        "#title_feature_div h1"
-    ]
-    
-    for selector in title_selectors:
-        title_elem = soup.select_one(selector)
-        if title_elem:
-            title = safe_extract(title_elem)
-            if title != "N/A":
-                break
-    
-    brand = "N/A"
-    brand_selectors = [
-        "a#bylineInfo",
-        "a[href*='/brand/']",
-        ".a-link-normal[href*='/brand/']",
-        "#bylineInfo",
-        "#brand"
-    ]
-    
-    for selector in brand_selectors:
-        brand_elem = soup.select_one(selector)
-        if brand_elem:
-            brand = safe_extract(brand_elem)
-            if brand != "N/A":
+# --- FIELD EXTRACTORS ---
+# Each reads located regions from the extraction Page instead of searching the soup.
+
+ASIN_IN_URL = re.compile(r"/dp/([A-Z0-9]{10})")
+IMAGE_SCRIPT_MARKERS = ("colorImages", "imageBlock", "ImageBlockATF")
+AMAZON_IMAGE_SRC = re.compile(r"(images-na\.ssl-images-amazon\.com|m\.media-amazon\.com)")
+IMAGE_DOMAINS = ["images-na.ssl-images-amazon.com", "m.media-amazon.com"]
+MANUFACTURING_KEYS = ['manufacturer', 'packer', 'importer']
+MAX_IMAGES = 7
+
+# Sections read by the fields below; reviews, carousels and the footer come after all of them
+STREAM_SECTIONS = fetcher.Sections(
+    ids=["productTitle", "bylineInfo", "feature-bullets", "productFactsDesktopExpander",
+         "detailBulletsWrapper_feature_div", "detailBullets_feature_div", "productDescription"],
+    scripts=IMAGE_SCRIPT_MARKERS,
+    tail=["sp_detail", "sims-", "customer-reviews", "reviewsMedley", "cm-cr-dp-review-list", "navFooter"],
+)
+
+def extract_asin(page):
+    """Extract ASIN from URL"""
+    asin_match = ASIN_IN_URL.search(page.url)
+    asin = asin_match.group(1) if asin_match else "N/A"
+    log.debug("📦 ASIN: %s", asin)
+    return asin
+
+def facts_heading(page, title):
+    """First "product-facts-title" heading in productFactsDesktopExpander whose text matches title"""
+    pattern = re.compile(title, re.IGNORECASE)
+    for heading in page.derived("facts_headings"):
+        if heading.string is not None and pattern.search(heading.string):
+            return heading
+    return None
+
+def _facts_headings(page):
+    product_facts_div = page.region("facts_expander")
+    if not product_facts_div:
+        return []
+    return product_facts_div.find_all("h3", class_="product-facts-title")
+
+def _additional_rows(page):
+    """(key, value) pairs under the expander's "Additional Information" heading"""
+    rows = []
+    additional_heading = facts_heading(page, "Additional Information")
+    if additional_heading:
+        current_elem = additional_heading.find_next_sibling()
+        while current_elem:
+            if current_elem.name in ['h3', 'hr']:
                 break
-    
-    return {
-        "asin": asin,
-        "title": title,
-        "brand": brand,
-        "url": url
-    }
 
-def extract_product_facts_from_expander_only(soup):
+            if current_elem.name == 'div' and 'product-facts-detail' in current_elem.get('class', []):
+                all_spans = current_elem.find_all("span", class_="a-color-base")
+                if len(all_spans) >= 2:
+                    rows.append((safe_extract(all_spans[0]), safe_extract(all_spans[1])))
+
+            current_elem = current_elem.find_next_sibling()
+    return rows
+
+def _detail_bullet_rows(page):
+    """Cleaned (key, value) pairs from detailBullets_feature_div"""
+    rows = []
+    detail_bullets_div = page.region("detail_bullets")
+    if detail_bullets_div:
+        for li in detail_bullets_div.select("li"):
+            k = li.select_one("span.a-text-bold")
+            if k:
+                key_text = k.get_text(" ", strip=True)
+                key = clean_key(key_text)
+
+                full_text = li.get_text(" ", strip=True)
+                val = full_text.replace(key_text, "").strip()
+                val = clean_value(val)
+                rows.append((key, val))
+    return rows
+
+FACTS_HEADINGS = Derived("facts_headings", _facts_headings, regions=[extraction.FACTS_EXPANDER])
+ADDITIONAL_ROWS = Derived("additional_rows", _additional_rows, derived=[FACTS_HEADINGS])
+DETAIL_BULLET_ROWS = Derived("detail_bullet_rows", _detail_bullet_rows, regions=[extraction.DETAIL_BULLETS])
+
+def extract_product_facts_from_expander_only(page):
     """Extract product facts ONLY from productFactsDesktopExpander section"""
     product_details = {}
-    
-    # ONLY Method: Product Facts Desktop Expander
-    product_facts_div = soup.find("div", id="productFactsDesktopExpander")
-    if product_facts_div:
-        # Find the "Product details" heading
-        product_details_heading = product_facts_div.find("h3", class_="product-facts-title", 
-                                                          string=re.compile("Product details", re.IGNORECASE))
-        
-        if product_details_heading:
-            # Get all detail divs after this heading until next heading
-            current_elem = product_details_heading.find_next_sibling()
-            
-            while current_elem:
-                # Stop if we hit another heading
-                if current_elem.name == 'h3':
-                    break
-                
-                # Process product-facts-detail divs
-                if current_elem.name == 'div':
-                    # Check if it's a section with product-facts-detail inside
-                    detail_divs = current_elem.find_all("div", class_="product-facts-detail")
-                    
-                    for detail_div in detail_divs:
-                        all_spans = detail_div.find_all("span", class_="a-color-base")
-                        if len(all_spans) >= 2:
-                            key = safe_extract(all_spans[0])
-                            value = safe_extract(all_spans[1])
-                            
-                            # Exclude unwanted keys
-                            if key and value and key != "N/A" and value != "N/A" and not should_exclude_key(key):
-                                product_details[key] = value
-                
-                current_elem = current_elem.find_next_sibling()
-    
-    return product_details if product_details else {"status": "No data available"}
 
-def extract_about_this_item_universal(soup):
-    """Extract About This Item section"""
+    # Find the "Product details" heading
+    product_details_heading = facts_heading(page, "Product details")
+    if product_details_heading:
+        # Get all detail divs after this heading until next heading
+        current_elem = product_details_heading.find_next_sibling()
+
+        while current_elem:
+            # Stop if we hit another heading
+            if current_elem.name == 'h3':
+                break
+
+            # Process product-facts-detail divs
+            if current_elem.name == 'div':
+                # Check if it's a section with product-facts-detail inside
+                detail_divs = current_elem.find_all("div", class_="product-facts-detail")
+
+                for detail_div in detail_divs:
+                    all_spans = detail_div.find_all("span", class_="a-color-base")
+                    if len(all_spans) >= 2:
+                        key = safe_extract(all_spans[0])
+                        value = safe_extract(all_spans[1])
+
+                        # Exclude unwanted keys
+                        if key and value and key != "N/A" and value != "N/A" and not should_exclude_key(key):
+                            product_details[key] = value
+
+            current_elem = current_elem.find_next_sibling()
+
+    return product_details
+
+def extract_about_this_item_universal(page):
+    """Extract About This Item section from the feature bullets"""
     bullets = []
-    
-    # Method 1: Feature bullets
-    feature_bullets = soup.find("div", id="feature-bullets")
+
+    feature_bullets = page.region("feature_bullets")
     if feature_bullets:
         list_items = feature_bullets.find_all("li")
         for li in list_items:
             text = safe_extract(li)
             if text and "about this item" not in text.lower() and text not in bullets:
                 bullets.append(text)
-    
-    # Method 2: Product Facts Desktop Expander
-    if not bullets:
-        product_facts_div = soup.find("div", id="productFactsDesktopExpander")
-        if product_facts_div:
-            about_heading = product_facts_div.find("h3", class_="product-facts-title", 
-                                                   string=re.compile("About this item", re.IGNORECASE))
-            if about_heading:
-                next_elem = about_heading.find_next_sibling()
-                while next_elem:
-                    if next_elem.name == "ul":
-                        list_items = next_elem.find_all("li")
-                        for li in list_items:
-                            text = safe_extract(li)
-                            if text and text not in bullets:
-                                bullets.append(text)
-                        break
-                    next_elem = next_elem.find_next_sibling()
-    
-    return bullets if bullets else ["N/A"]
 
-def extract_additional_information_clean(soup):
-    """Extract Additional Information - NO manufacturing, NO rankings"""
-    additional_info = {}
-    
-    product_facts_div = soup.find("div", id="productFactsDesktopExpander")
-    if product_facts_div:
-        additional_heading = product_facts_div.find("h3", class_="product-facts-title", 
-                                                    string=re.compile("Additional Information", re.IGNORECASE))
-        if additional_heading:
-            current_elem = additional_heading.find_next_sibling()
-            while current_elem:
-                if current_elem.name in ['h3', 'hr']:
-                    break
-                
-                if current_elem.name == 'div' and 'product-facts-detail' in current_elem.get('class', []):
-                    all_spans = current_elem.find_all("span", class_="a-color-base")
-                    if len(all_spans) >= 2:
-                        key = safe_extract(all_spans[0])
-                        value = safe_extract(all_spans[1])
-                        
-                        # Exclude unwanted keys
-                        if key and value and key != "N/A" and value != "N/A" and not should_exclude_key(key):
-                            additional_info[key] = value
-                
-                current_elem = current_elem.find_next_sibling()
-    
-    return additional_info if additional_info else {"status": "No data available"}
+    return bullets
 
-def extract_product_description_universal(soup):
-    """Extract product description"""
-    description = "N/A"
-    
-    desc_selectors = [
-        "div#productDescription",
-        "div#descriptionAndDetails",
-        "div#productDescription_feature_div",
-        "div.a-section.description"
-    ]
-    
-    for selector in desc_selectors:
-        desc_elem = soup.select_one(selector)
-        if desc_elem:
-            description = safe_extract(desc_elem)
-            if description != "N/A":
+def about_this_item_from_expander(page):
+    """Fallback: the expander's "About this item" list"""
+    bullets = []
+    about_heading = facts_heading(page, "About this item")
+    if about_heading:
+        next_elem = about_heading.find_next_sibling()
+        while next_elem:
+            if next_elem.name == "ul":
+                list_items = next_elem.find_all("li")
+                for li in list_items:
+                    text = safe_extract(li)
+                    if text and text not in bullets:
+                        bullets.append(text)
                 break
-    
-    if description == "N/A":
-        feature_div = soup.find("div", id="feature-bullets")
-        if feature_div:
-            full_text = feature_div.get_text(strip=True)
-            if len(full_text) > 200:
-                description = full_text
-    
-    return description
+            next_elem = next_elem.find_next_sibling()
+    return bullets
 
-def extract_detail_bullets_clean(soup):
+def extract_additional_information_clean(page):
+    """Extract Additional Information - NO manufacturing, NO rankings"""
+    additional_info = {}
+    for key, value in page.derived("additional_rows"):
+        # Exclude unwanted keys
+        if key and value and key != "N/A" and value != "N/A" and not should_exclude_key(key):
+            additional_info[key] = value
+    return additional_info
+
+def description_from_feature_bullets(page):
+    """Fallback: the whole feature-bullets text when it is long enough to be a description"""
+    feature_div = page.region("feature_bullets")
+    if feature_div:
+        full_text = feature_div.get_text(strip=True)
+        if len(full_text) > 200:
+            return full_text
+    return None
+
+def extract_detail_bullets_clean(page):
     """Extract detail bullets - NO manufacturing, NO rankings"""
     data = {}
-    
-    # Method 1: Detail Bullets Feature Div
-    detail_bullets_div = soup.find("div", id="detailBullets_feature_div")
-    if detail_bullets_div:
-        for li in detail_bullets_div.select("li"):
-            k = li.select_one("span.a-text-bold")
-            if k:
-                key_raw = k.get_text(" ", strip=True)
+    for key, val in page.derived("detail_bullet_rows"):
+        # Exclude unwanted keys
+        if key and val and not should_exclude_key(key):
+            data[key] = val
+    return data
+
+def detail_bullets_from_wrapper(page):
+    """Fallback: list items of detailBulletsWrapper_feature_div"""
+    data = {}
+    detail_bullets_wrapper = page.region("detail_bullets_wrapper")
+    if detail_bullets_wrapper:
+        for li in detail_bullets_wrapper.select("li.a-list-item"):
+            bold_spans = li.select("span.a-text-bold")
+            if bold_spans:
+                key_span = bold_spans[0]
+                key_raw = key_span.get_text(" ", strip=True)
                 key = clean_key(key_raw)
-                
-                full_text = li.get_text(" ", strip=True)
-                key_text = k.get_text(" ", strip=True)
-                val = full_text.replace(key_text, "").strip()
-                val = clean_value(val)
-                
-                # Exclude unwanted keys
-                if key and val and not should_exclude_key(key):
-                    data[key] = val
-    
-    # Method 2: Detail Bullets Wrapper
-    if not data:
-        detail_bullets_wrapper = soup.find("div", id="detailBulletsWrapper_feature_div")
-        if detail_bullets_wrapper:
-            for li in detail_bullets_wrapper.select("li.a-list-item"):
-                bold_spans = li.select("span.a-text-bold")
-                if bold_spans:
-                    key_span = bold_spans[0]
-                    key_raw = key_span.get_text(" ", strip=True)
-                    key = clean_key(key_raw)
-                    
-                    value_spans = li.select("span:not(.a-text-bold)")
-                    value = ""
-                    for span in value_spans:
-                        text = span.get_text(" ", strip=True)
-                        if text and text != key_raw:
-                            value = text
-                            break
-                    
-                    if not value:
-                        full_text = li.get_text(" ", strip=True)
-                        value = full_text.replace(key_raw, "").strip(": ").strip()
-                    
-                    value = clean_value(value)
-                    
-                    # Exclude unwanted keys
-                    if key and value and not should_exclude_key(key):
-                        data[key] = value
-    
-    return data if data else {"status": "No data available"}
 
-def extract_pricing_info_universal(soup):
+                value_spans = li.select("span:not(.a-text-bold)")
+                value = ""
+                for span in value_spans:
+                    text = span.get_text(" ", strip=True)
+                    if text and text != key_raw:
+                        value = text
+                        break
+
+                if not value:
+                    full_text = li.get_text(" ", strip=True)
+                    value = full_text.replace(key_raw, "").strip(": ").strip()
+
+                value = clean_value(value)
+
+                # Exclude unwanted keys
+                if key and value and not should_exclude_key(key):
+                    data[key] = value
+    return data
+
+PRICE_SELECTORS = [
+    ".a-price-whole",
+    ".a-price .a-offscreen",
+    "#priceblock_dealprice",
+    "#priceblock_ourprice",
+    ".a-price-range .a-price .a-offscreen"
+]
+
+LIST_PRICE_SELECTORS = [
+    ".a-price.a-text-price .a-offscreen",
+    ".a-text-strike",
+    "#priceblock_saleprice"
+]
+
+def extract_pricing_info_universal(page):
     """Extract pricing information"""
     pricing_info = {
         "current_price": "N/A",
@@ -466,203 +382,230 @@ def extract_pricing_info_universal(soup):
         "savings": "N/A",
         "currency": "USD"
     }
-    
-    price_selectors = [
-        ".a-price-whole",
-        ".a-price .a-offscreen",
-        "#priceblock_dealprice",
-        "#priceblock_ourprice",
-        ".a-price-range .a-price .a-offscreen"
-    ]
-    
-    for selector in price_selectors:
-        price_elem = soup.select_one(selector)
+
+    for selector in PRICE_SELECTORS:
+        price_elem = page.select_one(selector)
         if price_elem:
             pricing_info["current_price"] = safe_extract(price_elem)
             break
-    
-    list_price_selectors = [
-        ".a-price.a-text-price .a-offscreen",
-        ".a-text-strike",
-        "#priceblock_saleprice"
-    ]
-    
-    for selector in list_price_selectors:
-        list_price_elem = soup.select_one(selector)
+
+    for selector in LIST_PRICE_SELECTORS:
+        list_price_elem = page.select_one(selector)
         if list_price_elem:
             pricing_info["list_price"] = safe_extract(list_price_elem)
             break
-    
+
     return pricing_info
 
-def extract_manufacturing_details_only(soup, asin):
+def extract_manufacturing_details_only(page):
     """Extract ONLY Manufacturer, Packer, Importer, and ASIN"""
+    asin = page.values["asin"]
     manufacturing_details = {}
-    
+
     # Add ASIN
     if asin != "N/A":
         manufacturing_details["ASIN"] = asin
-    
-    manufacturing_keys = ['manufacturer', 'packer', 'importer']
-    
+
     # Method 1: Additional Information section
-    product_facts_div = soup.find("div", id="productFactsDesktopExpander")
-    if product_facts_div:
-        additional_heading = product_facts_div.find("h3", class_="product-facts-title", 
-                                                    string=re.compile("Additional Information", re.IGNORECASE))
-        if additional_heading:
-            current_elem = additional_heading.find_next_sibling()
-            while current_elem:
-                if current_elem.name in ['h3', 'hr']:
-                    break
-                
-                if current_elem.name == 'div' and 'product-facts-detail' in current_elem.get('class', []):
-                    all_spans = current_elem.find_all("span", class_="a-color-base")
-                    if len(all_spans) >= 2:
-                        key = safe_extract(all_spans[0])
-                        value = safe_extract(all_spans[1])
-                        
-                        if (key and value and key != "N/A" and value != "N/A" and
-                            any(mfg_key in key.lower() for mfg_key in manufacturing_keys)):
-                            manufacturing_details[key] = value
-                
-                current_elem = current_elem.find_next_sibling()
-    
+    for key, value in page.derived("additional_rows"):
+        if (key and value and key != "N/A" and value != "N/A" and
+            any(mfg_key in key.lower() for mfg_key in MANUFACTURING_KEYS)):
+            manufacturing_details[key] = value
+
     # Method 2: Detail bullets
-    detail_bullets_div = soup.find("div", id="detailBullets_feature_div")
-    if detail_bullets_div:
-        for li in detail_bullets_div.select("li"):
-            k = li.select_one("span.a-text-bold")
-            if k:
-                key_raw = k.get_text(" ", strip=True)
-                key = clean_key(key_raw)
-                
-                full_text = li.get_text(" ", strip=True)
-                key_text = k.get_text(" ", strip=True)
-                val = full_text.replace(key_text, "").strip()
-                val = clean_value(val)
-                
-                if (key and val and 
-                    any(mfg_key in key.lower() for mfg_key in manufacturing_keys)):
-                    manufacturing_details[key] = val
-    
+    for key, val in page.derived("detail_bullet_rows"):
+        if (key and val and
+            any(mfg_key in key.lower() for mfg_key in MANUFACTURING_KEYS)):
+            manufacturing_details[key] = val
+
     # Method 3: Technical specifications
-    tech_spec_sections = soup.find_all("div", id=re.compile(r"productDetails_techSpec_section_\d+"))
-    for section in tech_spec_sections:
+    for section in page.region("tech_spec_sections"):
         for row in section.select("tr"):
             cols = row.select("th, td")
             if len(cols) >= 2:
                 key = safe_extract(cols[0])
                 value = safe_extract(cols[1])
-                
-                if (key and value and 
-                    any(mfg_key in key.lower() for mfg_key in manufacturing_keys)):
+
+                if (key and value and
+                    any(mfg_key in key.lower() for mfg_key in MANUFACTURING_KEYS)):
                     manufacturing_details[key] = value
-    
+
     return manufacturing_details if manufacturing_details else {"status": "No data available", "ASIN": asin}
 
-def extract_high_quality_images_universal(soup):
-    """Extract EXACTLY 7 main high-quality product images"""
+def image_candidates(page, limit):
+    """Up to `limit` high-quality product image URLs, in the order the methods below find them"""
     images = []
     seen_urls = set()
-    
-    print("🖼️ Starting image extraction...", file=sys.stderr)
-    
+
+    log.debug("🖼️ Starting image extraction...")
+
     # Method 1: JavaScript data extraction - hiRes images
-    script_tags = soup.find_all("script", string=re.compile("colorImages|imageBlock|ImageBlockATF"))
-    print(f"📜 Found {len(script_tags)} script tags with image data", file=sys.stderr)
-    
+    script_tags = [s for s in page.region("scripts")
+                   if s.string is not None and any(marker in s.string for marker in IMAGE_SCRIPT_MARKERS)]
+    log.debug("📜 Found %d script tags with image data", len(script_tags))
+
     for script in script_tags:
         script_text = script.string
         if script_text:
-            # Try multiple patterns
-            patterns = [
-                r'"hiRes":"(https://[^"]+?)"',
-                r'"large":"(https://[^"]+?)"',
-                r'"main":\s*{[^}]*"(https://m\.media-amazon\.com/images/I/[^"]+?)"'
-            ]
-            
-            for pattern in patterns:
-                matches = re.findall(pattern, script_text)
+            # Image data is decoded once per script, then read as hiRes, large and main URLs
+            image_script = image_data.ImageScript(script_text)
+            found = (image_script.key_urls("hiRes"), image_script.key_urls("large"), image_script.main_urls())
+
+            for matches in found:
                 for img_url in matches:
                     if img_url not in seen_urls:
-                        high_quality_url = img_url.replace("._SL75_", "._SL1500_").replace("._SL100_", "._SL1500_").replace("._SL150_", "._SL1500_").replace("._SL200_", "._SL1500_").replace("._SL500_", "._SL1500_").replace("._SL1000_", "._SL1500_").replace("._SL800_", "._SL1500_")
-                        
-                        if any(domain in high_quality_url for domain in ["images-na.ssl-images-amazon.com", "m.media-amazon.com"]):
+                        high_quality_url = image_data.upscale_sl(img_url)
+
+                        if any(domain in high_quality_url for domain in IMAGE_DOMAINS):
                             images.append(high_quality_url)
                             seen_urls.add(img_url)
-                            print(f"✅ Found image {len(images)}: {high_quality_url[:60]}...", file=sys.stderr)
-                            
-                            if len(images) >= 7:
+                            log.debug("✅ Found image %d: %.60s...", len(images), high_quality_url, extra=logs.SAMPLED)
+
+                            if len(images) >= limit:
                                 break
-                
-                if len(images) >= 7:
+
+                if len(images) >= limit:
                     break
-        
-        if len(images) >= 7:
+
+        if len(images) >= limit:
             break
-    
+
     # Method 2: Data dynamic image attribute
-    if len(images) < 7:
-        print("📸 Trying data-a-dynamic-image method...", file=sys.stderr)
-        image_blocks = soup.find_all(["div", "img", "span"], {"data-a-dynamic-image": True})
-        print(f"📦 Found {len(image_blocks)} elements with data-a-dynamic-image", file=sys.stderr)
-        
+    if len(images) < limit:
+        log.debug("📸 Trying data-a-dynamic-image method...")
+        image_blocks = [el for el in page.region("dynamic_images") if el.name in ("div", "img", "span")]
+        log.debug("📦 Found %d elements with data-a-dynamic-image", len(image_blocks))
+
         for block in image_blocks:
-            if len(images) >= 7:
+            if len(images) >= limit:
                 break
-                
+
             dynamic_data = block.get("data-a-dynamic-image", "{}")
             try:
                 image_dict = json.loads(dynamic_data)
                 for img_url in image_dict.keys():
                     if img_url not in seen_urls:
-                        high_quality_url = img_url.replace("._SL75_", "._SL1500_").replace("._SL100_", "._SL1500_").replace("._SL150_", "._SL1500_").replace("._SL200_", "._SL1500_").replace("._SL500_", "._SL1500_").replace("._SL1000_", "._SL1500_").replace("._SL800_", "._SL1500_")
-                        
-                        if any(domain in high_quality_url for domain in ["images-na.ssl-images-amazon.com", "m.media-amazon.com"]):
+                        high_quality_url = image_data.upscale_sl(img_url)
+
+                        if any(domain in high_quality_url for domain in IMAGE_DOMAINS):
                             images.append(high_quality_url)
                             seen_urls.add(img_url)
-                            print(f"✅ Found image {len(images)}: {high_quality_url[:60]}...", file=sys.stderr)
-                            
-                            if len(images) >= 7:
+                            log.debug("✅ Found image %d: %.60s...", len(images), high_quality_url, extra=logs.SAMPLED)
+
+                            if len(images) >= limit:
                                 break
             except Exception as e:
-                print(f"⚠️ Error parsing dynamic image: {e}", file=sys.stderr)
-    
+                log.warning("⚠️ Error parsing dynamic image: %s", e)
+
     # Method 3: Image block with img tags
-    if len(images) < 7:
-        print("🔍 Trying img tag method...", file=sys.stderr)
-        img_tags = soup.find_all("img", src=re.compile(r"(images-na\.ssl-images-amazon\.com|m\.media-amazon\.com)"))
-        print(f"🏷️ Found {len(img_tags)} img tags with Amazon domain", file=sys.stderr)
-        
+    if len(images) < limit:
+        log.debug("🔍 Trying img tag method...")
+        img_tags = [img for img in page.region("images")
+                    if img.get("src") is not None and AMAZON_IMAGE_SRC.search(img.get("src"))]
+        log.debug("🏷️ Found %d img tags with Amazon domain", len(img_tags))
+
         for img in img_tags:
-            if len(images) >= 7:
+            if len(images) >= limit:
                 break
-            
+
             src = img.get("src", "")
             if src and src not in seen_urls:
                 # Skip small icons/logos
                 if not any(exclude in src.lower() for exclude in ['sprite', 'icon', 'logo', 'arrow', 'pixel', 'transparent']):
-                    high_quality_url = re.sub(r'\._[A-Z0-9_]+\.', '._SL1500_.', src)
-                    
-                    if any(domain in high_quality_url for domain in ["images-na.ssl-images-amazon.com", "m.media-amazon.com"]):
+                    high_quality_url = image_data.sl1500(src)
+
+                    if any(domain in high_quality_url for domain in IMAGE_DOMAINS):
                         images.append(high_quality_url)
                         seen_urls.add(src)
-                        print(f"✅ Found image {len(images)}: {high_quality_url[:60]}...", file=sys.stderr)
-    
+                        log.debug("✅ Found image %d: %.60s...", len(images), high_quality_url, extra=logs.SAMPLED)
+
     # Method 4: landingImage (main product image)
-    if len(images) < 7:
-        print("🎯 Trying landingImage method...", file=sys.stderr)
-        landing_image = soup.find("img", id="landingImage")
+    if len(images) < limit:
+        log.debug("🎯 Trying landingImage method...")
+        landing_image = page.region("landing_image")
         if landing_image:
             data_old_hires = landing_image.get("data-old-hires")
             if data_old_hires and data_old_hires not in seen_urls:
                 images.insert(0, data_old_hires)
                 seen_urls.add(data_old_hires)
-                print(f"✅ Found landing image: {data_old_hires[:60]}...", file=sys.stderr)
-    
-    print(f"✨ Total images extracted: {len(images)}", file=sys.stderr)
-    return images[:7]
+                log.debug("✅ Found landing image: %.60s...", data_old_hires)
+
+    log.debug("✨ Total images extracted: %d", len(images))
+    return images[:limit]
+
+def extract_image_candidates(page):
+    """The page's images, in order: up to image_probe.CANDIDATES for the probe stage, else just the 7 kept"""
+    return image_candidates(page, image_probe.CANDIDATES if image_probe.ENABLED else MAX_IMAGES)
+
+def extract_high_quality_images_universal(page):
+    """Extract EXACTLY 7 main high-quality product images (the first 7 candidates)"""
+    return page.values["image_candidates"][:MAX_IMAGES]
+
+# --- FIELD SPEC ---
+
+NO_DATA = {"status": "No data available"}
+
+FIELDS = [
+    FieldSpec("asin", extract_asin),
+    FieldSpec(
+        "title", text_of(extraction.PRODUCT_TITLE_SPAN, safe_extract),
+        regions=[extraction.PRODUCT_TITLE_SPAN, extraction.TITLE_H1],
+        fallbacks=[
+            text_of(extraction.TITLE_H1, safe_extract),
+            text_of(".product-title-word", safe_extract),
+            text_of("#titleSection h1", safe_extract),
+            text_of("#title_feature_div h1", safe_extract),
+        ],
+        default="N/A"),
+    FieldSpec(
+        "brand", text_of(extraction.BYLINE_LINK, safe_extract),
+        regions=[extraction.BYLINE_LINK, extraction.BYLINE, extraction.BRAND],
+        fallbacks=[
+            text_of("a[href*='/brand/']", safe_extract),
+            text_of(".a-link-normal[href*='/brand/']", safe_extract),
+            text_of(extraction.BYLINE, safe_extract),
+            text_of(extraction.BRAND, safe_extract),
+        ],
+        default="N/A"),
+    # Product Details Section 1 - ONLY from productFactsDesktopExpander
+    FieldSpec("product_facts", extract_product_facts_from_expander_only,
+              derived=[FACTS_HEADINGS], default=lambda: dict(NO_DATA)),
+    # About This Item (Feature Bullets)
+    FieldSpec("about_this_item", extract_about_this_item_universal,
+              regions=[extraction.FEATURE_BULLETS], derived=[FACTS_HEADINGS],
+              fallbacks=[about_this_item_from_expander], default=lambda: ["N/A"]),
+    # Additional Information (clean - no manufacturing, no rankings)
+    FieldSpec("additional_information", extract_additional_information_clean,
+              derived=[ADDITIONAL_ROWS], default=lambda: dict(NO_DATA)),
+    FieldSpec(
+        "product_description", text_of(extraction.PRODUCT_DESCRIPTION_DIV, safe_extract),
+        regions=[extraction.PRODUCT_DESCRIPTION_DIV, extraction.DESCRIPTION_AND_DETAILS,
+                 extraction.DESCRIPTION_FEATURE_DIV, extraction.FEATURE_BULLETS],
+        fallbacks=[
+            text_of(extraction.DESCRIPTION_AND_DETAILS, safe_extract),
+            text_of(extraction.DESCRIPTION_FEATURE_DIV, safe_extract),
+            text_of("div.a-section.description", safe_extract),
+            description_from_feature_bullets,
+        ],
+        default="N/A"),
+    # Product Details Section 2 (Detail Bullets - clean)
+    FieldSpec("detail_bullets", extract_detail_bullets_clean,
+              regions=[extraction.DETAIL_BULLETS_WRAPPER], derived=[DETAIL_BULLET_ROWS],
+              fallbacks=[detail_bullets_from_wrapper], default=lambda: dict(NO_DATA)),
+    FieldSpec("pricing", extract_pricing_info_universal, selectors=PRICE_SELECTORS + LIST_PRICE_SELECTORS),
+    # Manufacturing Details - ONLY Manufacturer, Packer, Importer, ASIN
+    FieldSpec("manufacturing_details", extract_manufacturing_details_only,
+              regions=[extraction.TECH_SPEC_SECTIONS], derived=[ADDITIONAL_ROWS, DETAIL_BULLET_ROWS],
+              needs=["asin"]),
+    # Image candidates are extracted once; the probe stage in scrape_amazon chooses among them
+    FieldSpec("image_candidates", extract_image_candidates,
+              regions=[extraction.SCRIPTS, extraction.DYNAMIC_IMAGES, extraction.IMAGES, extraction.LANDING_IMAGE]),
+    # High Quality Images - EXACTLY 7
+    FieldSpec("images", extract_high_quality_images_universal, needs=["image_candidates"]),
+]
+
+PLAN = extraction.compile_plan("amz_scraper", FIELDS)
+
 
 def format_scraped_data(raw_result):
     """
@@ -737,25 +680,45 @@ def format_scraped_data(raw_result):
     
     return formatted_result
 
+def serve_job(url, options, formatted=False):
+    """One --serve job; options may set "formatted" and "download" (default: download images)"""
+    raw_result = scrape_amazon(url, download=options.get("download", True))
+    if options.get("formatted", formatted):
+        return format_scraped_data(raw_result)
+    return raw_result
+
 def main():
-    if len(sys.argv) < 2:
+    parser = argparse.ArgumentParser(description="Scrape an Amazon product page (with images) and print it as JSON")
+    parser.add_argument("url", nargs="?", help="product URL (omit with --serve)")
+    parser.add_argument("-f", "--formatted", action="store_true", help="print the frontend's structured format")
+    parser.add_argument("--serve", "--jsonl", dest="serve", action="store_true",
+                        help="read URLs / JSON jobs from stdin, one per line, and write one JSON result per line")
+    parser.add_argument("-j", "--jobs", type=int, default=jsonl_serve.DEFAULT_JOBS,
+                        help="scrapes run in parallel with --serve")
+    parser.add_argument("--fields", help='sections to keep ("title,bullets") or drop ("-raw"); see serialization.py')
+    parser.add_argument("--pretty", action="store_true", help="indent the JSON output")
+    args = parser.parse_args()
+
+    if args.serve:
+        jsonl_serve.serve("amz_scraper", lambda url, options: serve_job(url, options, args.formatted),
+                          jobs=args.jobs, default_fields=args.fields)
+        return
+    if not args.url:
         error_result = {"success": False, "error": "URL parameter required"}
-        print(json.dumps(error_result, indent=2))
+        print(serialization.dumps(error_result, pretty=args.pretty))
         return
 
-    url = sys.argv[1]
-    
-    # Check if --formatted flag is provided
-    use_formatted = "--formatted" in sys.argv or "-f" in sys.argv
+    url = args.url
     
-    raw_result = scrape_amazon(url)
+    with tracing.from_environment("amz_scraper.cli", url=url):
+        raw_result = scrape_amazon(url)
     
-    if use_formatted:
+    if args.formatted:
         result = format_scraped_data(raw_result)
     else:
         result = raw_result
     
-    print(json.dumps(result, ensure_ascii=False, indent=2))
+    print(serialization.dumps(select_fields(result, args.fields), pretty=args.pretty))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,272 @@
+"""
+Authentication blueprint: login, password reset and password update
+- Users live in the UserCredentials Google Sheet, with FALLBACK_USERS when it is unreachable
+"""
+
+import uuid
+
+import requests
+from flask import Blueprint, request, jsonify
+
+import clients
+import logs
+import metrics
+from executors import run_in_pool
+
+auth_bp = Blueprint("auth", __name__)
+log = logs.get_logger("auth")
+
+
+def connect_to_sheet():
+    try:
+        client = clients.get_sheets_client()
+        with metrics.SHEETS_CALL_SECONDS.time(operation="open"):
+            sheet = client.open("UserCredentials").worksheet("Data")
+        log.info("✅ Connected to Google Sheet: UserCredentials → Data")
+        return sheet
+    except Exception as e:
+        log.error("❌ Error connecting to Google Sheets: %s", e)
+        return None  # Return None instead of raising
+
+
+def send_reset_email(email, token):
+    """
+    Sends reset email using Google Apps Script Web App.
+    """
+    try:
+        apps_script_url = "https://script.google.com/macros/s/AKfycbwILFRXaL-mo7Gr7IH5HujSkN3vxYytYr_4097xh26C4EsoK-nYHFThaHKx3T5oZmjk/exec"
+        payload = {"email": email, "token": token}
+
+        response = requests.post(apps_script_url, json=payload)
+        response.raise_for_status()
+
+        result = response.json()
+        if result.get("success"):
+            log.info("✅ Reset email sent successfully")
+        else:
+            log.warning("⚠️ Apps Script responded with error: %s", result.get('error'))
+    except Exception as e:
+        log.error("❌ Error sending reset email via Apps Script: %s", e)
+
+
+# Fallback user data when Google Sheets is not available
+FALLBACK_USERS = {
+    "admin@listro.com": {"password": "admin123", "first_time": False},
+    "test@listro.com": {"password": "test@listro.com", "first_time": True},  # First time user
+    "demo@listro.com": {"password": "demo123", "first_time": False}
+}
+
+# --- AUTHENTICATION ENDPOINTS ---
+
+@auth_bp.route("/login", methods=["POST"])
+@run_in_pool("auth")
+def login():
+    try:
+        data = request.get_json()
+        email = data.get("email", "").strip().lower()
+        password = data.get("password", "").strip()
+
+        if not email or not password:
+            return jsonify({"success": False, "error": "Email and password are required"}), 400
+
+        # Try to connect to Google Sheets first
+        sheet = connect_to_sheet()
+        
+        if sheet is not None:
+            # Google Sheets is available - use it
+            try:
+                with metrics.SHEETS_CALL_SECONDS.time(operation="get_all_records"):
+                    records = sheet.get_all_records()
+                log.debug("🔍 Google Sheets records found: %d", len(records))
+
+                # Find user by email (handle both lowercase and capitalized column names)
+                user_record = None
+                for record in records:
+                    # Try both 'email'/'Email' and handle different casing
+                    record_email = record.get("email", record.get("Email", "")).strip().lower()
+                    if record_email == email:
+                        user_record = record
+                        break
+
+                if not user_record:
+                    log.info("❌ No user found for login attempt")
+                    return jsonify({"success": False, "error": "Invalid email or password"}), 401
+
+                # Check if password matches (handle both lowercase and capitalized column names)
+                stored_password = str(user_record.get("password", user_record.get("Password", ""))).strip()
+                
+                if password != stored_password:
+                    return jsonify({"success": False, "error": "Invalid email or password"}), 401
+
+                # Check if it's first time login - check FirstLogin column or if password equals email
+                first_login_flag = user_record.get("FirstLogin", user_record.get("firstLogin", "")).strip().lower()
+                first_time = first_login_flag == "yes" or stored_password == email
+
+                return jsonify({
+                    "success": True, 
+                    "message": "Login successful",
+                    "first_time": first_time,
+                    "email": email
+                })
+            except Exception as sheets_error:
+                log.error("❌ Google Sheets error, falling back to local auth: %s", sheets_error)
+                # Fall through to fallback authentication
+        
+        # Fallback authentication when Google Sheets is not available
+        log.info("🔄 Using fallback authentication system")
+        
+        if email not in FALLBACK_USERS:
+            return jsonify({"success": False, "error": "Invalid email or password"}), 401
+        
+        user_data = FALLBACK_USERS[email]
+        if password != user_data["password"]:
+            return jsonify({"success": False, "error": "Invalid email or password"}), 401
+        
+        return jsonify({
+            "success": True, 
+            "message": "Login successful (fallback mode)",
+            "first_time": user_data["first_time"],
+            "email": email
+        })
+
+    except Exception as e:
+        log.exception("❌ Login error: %s", e)
+        return jsonify({"success": False, "error": "Server error during login"}), 500
+
+
+@auth_bp.route("/reset-password", methods=["POST"])
+@run_in_pool("auth")
+def reset_password():
+    try:
+        data = request.get_json()
+        email = data.get("email", "").strip().lower()
+
+        if not email:
+            return jsonify({"success": False, "error": "Email is required"}), 400
+
+        # Try to connect to Google Sheets first
+        sheet = connect_to_sheet()
+        
+        if sheet is not None:
+            # Google Sheets is available
+            try:
+                with metrics.SHEETS_CALL_SECONDS.time(operation="get_all_records"):
+                    records = sheet.get_all_records()
+                # Check both lowercase and capitalized column names
+                user_exists = any(
+                    record.get("email", record.get("Email", "")).strip().lower() == email 
+                    for record in records
+                )
+                
+                if not user_exists:
+                    return jsonify({"success": False, "error": "Email not found"}), 404
+
+                # Generate reset token and send email
+                reset_token = str(uuid.uuid4())
+                send_reset_email(email, reset_token)
+                
+                return jsonify({
+                    "success": True, 
+                    "message": "Reset link sent to your email",
+                    "pending_approval": False
+                })
+            except Exception as sheets_error:
+                log.error("❌ Google Sheets error, using fallback: %s", sheets_error)
+        
+        # Fallback mode
+        log.info("🔄 Using fallback password reset")
+        
+        if email not in FALLBACK_USERS:
+            return jsonify({"success": False, "error": "Email not found"}), 404
+        
+        # In fallback mode, just return success without actually sending email
+        return jsonify({
+            "success": True, 
+            "message": "Password reset simulated (fallback mode). Use demo credentials.",
+            "pending_approval": False
+        })
+
+    except Exception as e:
+        log.exception("❌ Reset password error: %s", e)
+        return jsonify({"success": False, "error": "Server error during password reset"}), 500
+
+
+@auth_bp.route("/update-password", methods=["POST"])
+@run_in_pool("auth")
+def update_password():
+    try:
+        data = request.get_json()
+        email = data.get("email", "").strip().lower()
+        new_password = data.get("password", "").strip()
+        token = data.get("token", "")  # Reset token (not implemented in this basic version)
+
+        if not email or not new_password:
+            return jsonify({"success": False, "error": "Email and password are required"}), 400
+
+        # Try to connect to Google Sheets first
+        sheet = connect_to_sheet()
+        
+        if sheet is not None:
+            # Google Sheets is available
+            try:
+                with metrics.SHEETS_CALL_SECONDS.time(operation="get_all_records"):
+                    records = sheet.get_all_records()
+
+                # Find user by email (handle both lowercase and capitalized column names)
+                user_record = None
+                row_index = None
+                for i, record in enumerate(records):
+                    record_email = record.get("email", record.get("Email", "")).strip().lower()
+                    if record_email == email:
+                        user_record = record
+                        row_index = i + 2  # +2 because enumerate starts at 0 and sheet rows start at 1, plus header
+                        break
+
+                if not user_record:
+                    return jsonify({"success": False, "error": "User not found"}), 404
+
+                # Update password in Google Sheets - find the Password column
+                # First, get the header row to find the correct column index
+                with metrics.SHEETS_CALL_SECONDS.time(operation="row_values"):
+                    header_row = sheet.row_values(1)
+                password_col = None
+                for col_idx, header in enumerate(header_row):
+                    if header.lower() == 'password':
+                        password_col = col_idx + 1  # gspread uses 1-based indexing
+                        break
+                
+                if password_col:
+                    with metrics.SHEETS_CALL_SECONDS.time(operation="update_cell"):
+                        sheet.update_cell(row_index, password_col, new_password)
+                    # Also update FirstLogin to 'No' if it exists
+                    for col_idx, header in enumerate(header_row):
+                        if header.lower() == 'firstlogin':
+                            with metrics.SHEETS_CALL_SECONDS.time(operation="update_cell"):
+                                sheet.update_cell(row_index, col_idx + 1, 'No')
+                            break
+                
+                return jsonify({
+                    "success": True, 
+                    "message": "Password updated successfully"
+                })
+            except Exception as sheets_error:
+                log.error("❌ Google Sheets error, using fallback: %s", sheets_error)
+        
+        # Fallback mode
+        log.info("🔄 Using fallback password update")
+        
+        if email not in FALLBACK_USERS:
+            return jsonify({"success": False, "error": "User not found"}), 404
+        
+        # In fallback mode, update the in-memory user data
+        FALLBACK_USERS[email]["password"] = new_password
+        FALLBACK_USERS[email]["first_time"] = False
+        
+        return jsonify({
+            "success": True, 
+            "message": "Password updated successfully (fallback mode)"
+        })
+
+    except Exception as e:
+        log.exception("❌ Update password error: %s", e)
+        return jsonify({"success": False, "error": "Server error during password update"}), 500
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Regenerate cleaner_seed.json, the strings cleaners.preseed() warms the cleaner memos with
+- Runs both scrapers' extraction over the benchmark corpus (plus any --pages directories of
+  saved product pages) and records what reached clean_key / clean_value / fix_text_corruption
+- Labels and other short text (up to --short characters) are kept; longer values only when
+  they occur on at least --min-pages pages, so one product's specifics don't take up entries
+- Prints each memo's hit rate over a second pass with the seed loaded
+
+Usage: python3 benchmarks/cleaner_seed.py [--pages DIR ...] [--short 40] [--min-pages 2] [--dry-run]
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+from collections import Counter
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+import amz_scraper  # noqa: E402
+import cleaners  # noqa: E402
+import metrics  # noqa: E402
+import scraper  # noqa: E402
+
+CORPUS_DIR = os.path.join(BENCH_DIR, "corpus")
+URL = "https://www.amazon.in/dp/B0SEED0000"
+
+
+class SavedResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+def extract(html):
+    amz_scraper.extract_product(html, URL)
+    scraper.scrape_amazon_content(SavedResponse(html), URL)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", nargs="*", default=[], help="extra directories of saved .html product pages")
+    parser.add_argument("--short", type=int, default=40, help="text up to this length is always seeded")
+    parser.add_argument("--min-pages", type=int, default=2, help="pages longer text must occur on to be seeded")
+    parser.add_argument("--dry-run", action="store_true", help="report without writing cleaner_seed.json")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(CORPUS_DIR, "*.html")))
+    for directory in args.pages:
+        paths += sorted(glob.glob(os.path.join(directory, "*.html")))
+    pages = []
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            pages.append(f.read())
+
+    seen = {memo.name: Counter() for memo in cleaners.MEMOS}
+    for html in pages:
+        for memo in cleaners.MEMOS:
+            memo.clear()
+        extract(html)
+        for memo in cleaners.MEMOS:
+            seen[memo.name].update(memo.keys())
+
+    seed = {}
+    for name, counts in seen.items():
+        seed[name] = sorted(text for text, pages_seen in counts.items()
+                            if len(text) <= args.short or pages_seen >= args.min_pages)
+
+    for memo in cleaners.MEMOS:
+        memo.clear()
+    metrics.CACHE_HITS.clear()
+    metrics.CACHE_MISSES.clear()
+    if not args.dry_run:
+        with open(cleaners.SEED_PATH, "w", encoding="utf-8") as f:
+            json.dump(seed, f, indent=1)
+            f.write("\n")
+        cleaners.preseed()
+    else:
+        for memo in cleaners.MEMOS:
+            for text in seed[memo.name]:
+                memo.seed(text)
+    for html in pages:
+        extract(html)
+
+    print(f"🌱 {len(pages)} pages, {'not written' if args.dry_run else cleaners.SEED_PATH}")
+    for memo in cleaners.MEMOS:
+        hits = metrics.CACHE_HITS.value(cache=memo.name)
+        misses = metrics.CACHE_MISSES.value(cache=memo.name)
+        rate = hits / (hits + misses) if hits + misses else 0
+        print(f"  {memo.name:<20} {len(seed[memo.name]):>5} seeded   hit rate {rate:6.1%} ({hits}/{hits + misses})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Offline extractor benchmark for scraper.py and amz_scraper.py
+- Runs both scrapers' extraction over the checked-in corpus (benchmarks/corpus, no network)
+- Reports soup parse time, per-extractor time (from the PARSE_SECONDS stopwatch laps),
+  total time, tracemalloc peak memory and parsed tree size per page, then the process peak RSS
+- --full-parse turns off region-restricted parsing to compare against whole-page trees
+- Compares every output with its golden (benchmarks/goldens) and the timings with
+  benchmarks/baseline.json; exits 1 on a golden mismatch or a regression past --threshold
+- Every timed run is paired with a calibration run (a fixed BeautifulSoup workload) and the
+  baseline stores cost relative to it, so a baseline recorded on one machine stays usable on
+  a slower or busier one
+
+Usage: python3 benchmarks/extractors.py [--runs 10] [--threshold 0.25] [--page NAME]
+       python3 benchmarks/extractors.py --update-goldens    # after an intended output change
+       python3 benchmarks/extractors.py --update-baseline   # after an intended speed change / new machine
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+CORPUS_DIR = os.path.join(BENCH_DIR, "corpus")
+GOLDENS_DIR = os.path.join(BENCH_DIR, "goldens")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+
+# Keep the scrapers' per-page info logs out of the report
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+sys.path.insert(0, BACKEND_DIR)
+
+import amz_scraper  # noqa: E402
+import extraction  # noqa: E402
+import metrics  # noqa: E402
+import scraper  # noqa: E402
+from bs4 import BeautifulSoup  # noqa: E402
+
+CALIBRATION_HTML = "<div class='a-section'><ul>" + "<li><span class='a-list-item'>item</span></li>" * 400 + "</ul></div>"
+
+
+class SavedResponse:
+    """Stands in for the requests.Response that scrape_amazon_content reads"""
+
+    def __init__(self, text):
+        self.text = text
+        self.status_code = 200
+
+
+def run_scraper(html, url):
+    return scraper.scrape_amazon_content(SavedResponse(html), url)
+
+
+def run_amz_scraper(html, url):
+    return amz_scraper.extract_product(html, url)
+
+
+SCRAPERS = {
+    "scraper": run_scraper,
+    "amz_scraper": run_amz_scraper,
+}
+
+
+def load_corpus(only=None):
+    with open(os.path.join(CORPUS_DIR, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    pages = []
+    for entry in manifest:
+        if only and entry["name"] not in only:
+            continue
+        with open(os.path.join(CORPUS_DIR, f"{entry['name']}.html"), encoding="utf-8") as f:
+            pages.append((entry, f.read()))
+    return pages
+
+
+def normalize(result):
+    """Round-trip through JSON so goldens and fresh results compare the same way"""
+    return json.loads(json.dumps(result, ensure_ascii=False))
+
+
+def golden_path(page, scraper_name):
+    return os.path.join(GOLDENS_DIR, f"{page}.{scraper_name}.json")
+
+
+def diff_keys(expected, actual):
+    if not isinstance(expected, dict) or not isinstance(actual, dict):
+        return ["<root>"]
+    keys = sorted(set(expected) | set(actual))
+    return [k for k in keys if expected.get(k) != actual.get(k)]
+
+
+def calibrate():
+    """Time (ms) of a fixed parse + search workload, the unit for relative costs"""
+    start = time.perf_counter()
+    BeautifulSoup(CALIBRATION_HTML, "html.parser").find_all("span", class_="a-list-item")
+    return (time.perf_counter() - start) * 1000
+
+
+def measure(run, html, url, scraper_name, runs):
+    """Time `runs` extractions after one warm-up; returns (result, stats)
+
+    The fastest run and the fastest neighbouring calibration are reported: they are the
+    least disturbed by other load on the machine.
+    """
+    result = run(html, url)  # warm-up: regex caches, lazy imports
+
+    metrics.PARSE_SECONDS.clear()
+    metrics.PARSE_NODES.clear()
+    totals = []
+    calibrations = []
+    for _ in range(runs):
+        calibrations.append(calibrate())
+        start = time.perf_counter()
+        run(html, url)
+        totals.append((time.perf_counter() - start) * 1000)
+
+    stages = {}
+    for (label_scraper, extractor), (count, total) in metrics.PARSE_SECONDS.series().items():
+        if label_scraper == scraper_name and count:
+            stages[extractor] = round(total / count * 1000, 3)
+
+    count, nodes = metrics.PARSE_NODES.snapshot(scraper=scraper_name)
+
+    tracemalloc.start()
+    run(html, url)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, {
+        "total_ms": round(min(totals), 3),
+        "relative": round(min(totals) / min(calibrations), 4),
+        "calibration_ms": round(min(calibrations), 3),
+        "parse_ms": stages.pop("soup", 0.0),
+        "extractors_ms": stages,
+        "peak_kib": round(peak / 1024, 1),
+        "nodes": round(nodes / count) if count else 0,
+    }
+
+
+def check_regression(key, stats, baseline, threshold, min_delta_ms):
+    """Return a list of human-readable regressions against the baseline entry"""
+    base = baseline.get(key)
+    if not base:
+        return []
+    problems = []
+    # Baseline cost expressed in this run's milliseconds
+    expected_ms = base["relative"] * stats["calibration_ms"]
+    if stats["relative"] > base["relative"] * (1 + threshold) and stats["total_ms"] - expected_ms > min_delta_ms:
+        problems.append(f"{stats['relative']:.2f}x calibration vs baseline {base['relative']:.2f}x "
+                        f"({stats['total_ms']:.1f} ms, expected ~{expected_ms:.1f} ms)")
+    if stats["peak_kib"] > base["peak_kib"] * (1 + threshold):
+        problems.append(f"peak {stats['peak_kib']:.0f} KiB vs baseline {base['peak_kib']:.0f} KiB")
+    return problems
+
+
+def print_row(key, stats, status):
+    slowest = sorted(stats["extractors_ms"].items(), key=lambda kv: kv[1], reverse=True)[:3]
+    slowest = ", ".join(f"{name} {ms:.1f}" for name, ms in slowest)
+    print(f"{status} {key:<42} best {stats['total_ms']:8.2f} ms ({stats['relative']:5.2f}x)  parse {stats['parse_ms']:7.2f} ms  "
+          f"peak {stats['peak_kib']:8.0f} KiB  {stats['nodes']:6d} nodes  | {slowest}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="timed runs per page (fastest is reported)")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown / memory growth, 0.25 = +25%%")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="ignore slowdowns smaller than this")
+    parser.add_argument("--page", action="append", help="only benchmark this corpus page (repeatable)")
+    parser.add_argument("--scraper", action="append", choices=sorted(SCRAPERS), help="only this scraper (repeatable)")
+    parser.add_argument("--update-goldens", action="store_true", help="rewrite goldens from the current outputs")
+    parser.add_argument("--update-baseline", action="store_true", help="rewrite baseline.json from this run")
+    parser.add_argument("--report", help="also write the full results as JSON to this path")
+    parser.add_argument("--full-parse", action="store_true", help="parse whole pages instead of the scrapers' regions")
+    args = parser.parse_args()
+    if args.full_parse:
+        extraction.RESTRICT_PARSE = False
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    os.makedirs(GOLDENS_DIR, exist_ok=True)
+    results = {}
+    failures = []
+
+    for entry, html in load_corpus(args.page):
+        for scraper_name in args.scraper or SCRAPERS:
+            key = f"{entry['name']}/{scraper_name}"
+            result, stats = measure(SCRAPERS[scraper_name], html, entry["url"], scraper_name, args.runs)
+            result = normalize(result)
+            path = golden_path(entry["name"], scraper_name)
+
+            if args.update_goldens or not os.path.exists(path):
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(result, f, ensure_ascii=False, indent=2)
+                    f.write("\n")
+                stats["golden"] = "written"
+            else:
+                with open(path, encoding="utf-8") as f:
+                    expected = json.load(f)
+                stats["golden"] = "ok" if expected == result else "mismatch"
+                if expected != result:
+                    failures.append(f"{key}: output differs from golden in {', '.join(diff_keys(expected, result))}")
+
+            regressions = [] if args.update_baseline else check_regression(
+                key, stats, baseline, args.threshold, args.min_delta_ms)
+            failures.extend(f"{key}: {problem}" for problem in regressions)
+
+            results[key] = stats
+            print_row(key, stats, "❌" if regressions or stats["golden"] == "mismatch" else "✅")
+
+    if args.update_baseline:
+        baseline.update({
+            key: {"relative": s["relative"], "total_ms": s["total_ms"], "peak_kib": s["peak_kib"]}
+            for key, s in results.items()
+        })
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(dict(sorted(baseline.items())), f, indent=2)
+            f.write("\n")
+        print(f"📝 Baseline updated: {BASELINE_PATH}")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    peak_rss = metrics.peak_rss_bytes()
+    if peak_rss is not None:
+        print(f"\n🧠 Process peak RSS: {peak_rss / 1024 / 1024:.1f} MiB")
+
+    if failures:
+        print("\n❌ Extractor benchmark failed:")
+        for failure in failures:
+            print(f"   - {failure}")
+        sys.exit(1)
+    print("\n✅ All outputs match goldens, no regressions past "
+          f"{args.threshold:.0%}" + (" (no baseline)" if not baseline else ""))
+
+
+if __name__ == "__main__":
+    main()
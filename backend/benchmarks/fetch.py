@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Fetch-and-decode benchmark: requests' response.text against fetcher.get
+- Serves the corpus from the local mock marketplace (no latency) with the charset declared in
+  the Content-Type header, only in the page's <meta>, or nowhere before the body
+- "text" is the old path: session.get then response.text, read as often as scraper.py did
+  (twice for the CAPTCHA check, once for extraction); requests re-decodes on every read and
+  falls back to ISO-8859-1 or a statistical guess when the header has no charset
+- "fetcher" is fetcher.get: one decode with the header / <meta> charset
+- Reports best-of-N milliseconds per page, the time saved, and whether the decoded text
+  matches the page's real UTF-8 text (a mismatch is mojibake the cleaners would have to patch)
+
+Usage: python3 benchmarks/fetch.py [--runs 20] [--reads 3] [--page NAME]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+import requests  # noqa: E402
+
+import fetcher  # noqa: E402
+import mock_amazon  # noqa: E402
+import scraper  # noqa: E402
+
+# What the scrapers sent before fetcher.ACCEPT_ENCODING
+OLD_HEADERS = dict(scraper.HEADERS, **{"Accept-Encoding": "gzip, deflate, br"})
+
+
+def read_text(session, url, reads):
+    response = session.get(url, headers=OLD_HEADERS, timeout=30)
+    text = None
+    for _ in range(reads):
+        text = response.text
+    return text
+
+
+def read_fetcher(session, url, reads):
+    return fetcher.get(url, headers=scraper.HEADERS, timeout=30, session=session).text
+
+
+def page_names():
+    """Corpus page names in manifest order (the order mock_amazon.load_pages serves them)"""
+    with open(os.path.join(mock_amazon.CORPUS_DIR, "manifest.json"), encoding="utf-8") as f:
+        return [entry["name"] for entry in json.load(f)]
+
+
+def best_ms(fn, runs):
+    best, result = None, None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20, help="fetches per page and path (best is reported)")
+    parser.add_argument("--reads", type=int, default=3, help="response.text reads per page on the old path")
+    parser.add_argument("--page", help="only this corpus page (manifest name)")
+    args = parser.parse_args()
+
+    faults = mock_amazon.Faults()
+    server = mock_amazon.start_server(faults)
+    session = requests.Session()
+    names = dict(zip((asin for asin, _, _ in server.pages), page_names()))
+
+    print(f"🚚 Accept-Encoding now sent: {fetcher.ACCEPT_ENCODING!r} (brotli decoder available: {fetcher.HAS_BROTLI})")
+    print(f"{'page':<30} {'charset in':<10} {'KiB':>6} {'text ms':>8} {'fetcher ms':>10} {'saved ms':>9}  text ok / fetcher ok")
+    for asin, body, _ in server.pages:
+        name = names[asin]
+        if args.page and name != args.page:
+            continue
+        truth = body.decode("utf-8")
+        url = f"{server.base_url}/dp/{asin}"
+        for charset_in in ("header", "meta", "none"):
+            faults.charset_in = charset_in
+            old_ms, old_text = best_ms(lambda: read_text(session, url, args.reads), args.runs)
+            new_ms, new_text = best_ms(lambda: read_fetcher(session, url, args.reads), args.runs)
+            print(f"{name:<30} {charset_in:<10} {len(body) // 1024:>6} {old_ms:>8.2f} {new_ms:>10.2f} "
+                  f"{old_ms - new_ms:>9.2f}  {'✅' if old_text == truth else '❌'} / {'✅' if new_text == truth else '❌'}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+End-to-end scraping load driver
+- Scrapes many product URLs concurrently against the local mock marketplace
+  (started in-process unless --base-url points at a running one)
+- Reports throughput (products/minute), latency percentiles, outcomes, the
+  retry / CAPTCHA counters the scrapers record in metrics.py, peak RSS and parsed tree size
+- Reports where the shared per-host rate limiter ended up (rate, breaker state, time waited)
+- The rate limiter's pacing and the scrapers' timeouts can be scaled down for quick runs;
+  the defaults measure the real behaviour
+- --via workers runs each scrape as a job on scrape_service's warm worker processes, the way
+  the scrape routes do, so pacing round trips over the job pipe, waits for a free worker and
+  worker restarts are part of the measurement; it also reports the pool's job outcomes and
+  restarts. Workers import their own scrapers, so --timeout-scale doesn't reach them: jobs keep
+  the real request timeouts and are bounded by --job-timeout instead
+
+Usage: python3 benchmarks/load.py [--products 200] [--concurrency 8] [--scraper scraper]
+                                  [--via workers] [--workers 4] [--max-jobs 50] [--job-timeout 90]
+                                  [--delay-scale 1.0] [--timeout-scale 1.0]
+                                  [--error-rate 0.05] [--captcha-rate 0.02] [--timeout-rate 0.01] ...
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+# Retries and CAPTCHAs are expected here; they are counted, not logged
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+import amz_scraper  # noqa: E402
+import metrics  # noqa: E402
+import mock_amazon  # noqa: E402
+import rate_limit  # noqa: E402
+import scrape_service  # noqa: E402
+import scraper  # noqa: E402
+
+
+def configure_scrapers(delay_scale, timeout_scale):
+    # Shorter pacing means proportionally higher rates and shorter breaker cool-downs
+    rate_limit.INITIAL_RATE /= delay_scale
+    rate_limit.MIN_RATE /= delay_scale
+    rate_limit.MAX_RATE /= delay_scale
+    rate_limit.RATE_STEP /= delay_scale
+    rate_limit.BREAKER_COOLDOWN *= delay_scale
+    rate_limit.MAX_COOLDOWN *= delay_scale
+    scraper.MAX_PACING_WAIT *= delay_scale
+    amz_scraper.MAX_PACING_WAIT *= delay_scale
+    scraper.BASE_TIMEOUT *= timeout_scale
+    scraper.TIMEOUT_STEP *= timeout_scale
+    amz_scraper.REQUEST_TIMEOUT *= timeout_scale
+
+
+SCRAPERS = {
+    "scraper": scraper.scrape_amazon,
+    "amz_scraper": lambda url: amz_scraper.scrape_amazon(url, download=False),
+}
+
+
+def worker_scrape(pool, job, timeout):
+    """A scrape function that runs each URL as a job on the warm worker pool"""
+    def scrape(url):
+        try:
+            return pool.run(job, url, timeout)
+        except (scrape_service.ScrapeTimeout, scrape_service.ScrapeFailed) as e:
+            return {"success": False, "error": str(e)}
+    return scrape
+
+
+def product_urls(base_url, count):
+    return [f"{base_url}/dp/B0{i:08d}" for i in range(1, count + 1)]
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def classify(result):
+    if result.get("success"):
+        return "success"
+    error = result.get("error", "").lower()
+    for marker, outcome in (("captcha", "captcha"), ("too long", "timeout"), ("status code", "http_error"),
+                            ("unable to connect", "network"), ("all attempts failed", "exhausted"),
+                            ("blocking requests", "circuit_open"), ("no scrape worker free", "no_worker"),
+                            ("timed out after", "job_timeout"), ("exited unexpectedly", "worker_crashed")):
+        if marker in error:
+            return outcome
+    return "error"
+
+
+def run_load(scrape, urls, concurrency):
+    """Scrape every URL; returns (wall seconds, [(latency seconds, outcome)])"""
+    def one(url):
+        start = time.perf_counter()
+        result = scrape(url)
+        return time.perf_counter() - start, classify(result)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="load") as pool:
+        samples = list(pool.map(one, urls))
+    return time.perf_counter() - start, samples
+
+
+def counter_by_reason(counter, scraper_name):
+    return {key[1]: value for key, value in counter.series().items() if key[0] == scraper_name}
+
+
+def parsed_nodes(scraper_name):
+    """Mean tags per parsed page"""
+    count, total = metrics.PARSE_NODES.snapshot(scraper=scraper_name)
+    return round(total / count) if count else 0
+
+
+def pacing():
+    """Each host's final rate-limiter state plus the time scrapes spent waiting for it"""
+    hosts = rate_limit.snapshot()
+    for host, state in hosts.items():
+        count, total = metrics.RATE_LIMIT_WAIT_SECONDS.snapshot(host=host)
+        state["waits"] = count
+        state["waited_seconds"] = round(total, 2)
+        state["breaker_opens"] = metrics.BREAKER_OPENS.value(host=host)
+    return hosts
+
+
+def worker_pool(pool, scraper_name):
+    """The pool's size plus its job outcomes and worker restarts, or None when scraping in-process"""
+    if pool is None:
+        return None
+    stats = pool.stats()
+    stats["jobs"] = {key[1]: value for key, value in metrics.SCRAPE_JOBS.series().items() if key[0] == scraper_name}
+    stats["restarts"] = {key[0]: value for key, value in metrics.SCRAPE_WORKER_RESTARTS.series().items()}
+    return stats
+
+
+def build_report(scraper_name, wall, samples, server_stats, pool=None):
+    latencies = sorted(latency for latency, _ in samples)
+    outcomes = {}
+    for _, outcome in samples:
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    succeeded = outcomes.get("success", 0)
+    peak_rss = metrics.peak_rss_bytes()
+    return {
+        "scraper": scraper_name,
+        "products": len(samples),
+        "wall_seconds": round(wall, 2),
+        "throughput_per_minute": round(succeeded / wall * 60, 1) if wall else 0.0,
+        "attempted_per_minute": round(len(samples) / wall * 60, 1) if wall else 0.0,
+        "success_rate": round(succeeded / len(samples), 3) if samples else 0.0,
+        "latency_seconds": {
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+            "max": round(latencies[-1], 3) if latencies else 0.0,
+        },
+        "outcomes": outcomes,
+        "retries": counter_by_reason(metrics.RETRIES, scraper_name),
+        "captcha_hits": metrics.CAPTCHA_HITS.value(scraper=scraper_name),
+        "pacing": pacing(),
+        "workers": worker_pool(pool, scraper_name),
+        "server": server_stats,
+        "peak_rss_mib": round(peak_rss / 1024 / 1024, 1) if peak_rss else None,
+        "parsed_nodes": parsed_nodes(scraper_name),
+    }
+
+
+def print_report(report):
+    lat = report["latency_seconds"]
+    print(f"\n📊 {report['scraper']}: {report['products']} products in {report['wall_seconds']}s")
+    print(f"   Throughput:  {report['throughput_per_minute']} products/min "
+          f"({report['attempted_per_minute']} attempted/min, {report['success_rate']:.1%} success)")
+    print(f"   Latency:     p50 {lat['p50']}s  p95 {lat['p95']}s  p99 {lat['p99']}s  max {lat['max']}s")
+    print(f"   Outcomes:    {report['outcomes']}")
+    print(f"   Retries:     {report['retries'] or 'none'}  (CAPTCHA hits: {report['captcha_hits']})")
+    for host, state in report["pacing"].items():
+        print(f"   Pacing:      {host} at {state['rate']}/s ({state['state']}), waited {state['waited_seconds']}s "
+              f"over {state['waits']} waits, breaker opened {state['breaker_opens']}x")
+    workers = report["workers"]
+    if workers is not None:
+        print(f"   Workers:     {workers['workers']} warm, {workers['spawned']} spawned, jobs {workers['jobs']}, "
+              f"restarts {workers['restarts'] or 'none'}")
+    if report["peak_rss_mib"] is not None:
+        print(f"   Memory:      peak RSS {report['peak_rss_mib']} MiB, {report['parsed_nodes']} tags per parsed page")
+    if report["server"] is not None:
+        print(f"   Server sent: {report['server']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=200, help="number of product URLs to scrape")
+    parser.add_argument("--concurrency", type=int, default=8, help="scrapes in flight at once")
+    parser.add_argument("--scraper", choices=sorted(SCRAPERS), default="scraper")
+    parser.add_argument("--via", choices=("process", "workers"), default="process",
+                        help="scrape in this process, or as jobs on scrape_service's worker pool")
+    parser.add_argument("--workers", type=int, default=scrape_service.WORKERS, help="worker processes with --via workers")
+    parser.add_argument("--max-jobs", type=int, default=scrape_service.MAX_JOBS_PER_WORKER,
+                        help="jobs before a worker is recycled with --via workers")
+    parser.add_argument("--job-timeout", type=float, default=90,
+                        help="per-job timeout with --via workers (the scrape routes use 90s)")
+    parser.add_argument("--base-url", help="use an already running mock marketplace instead of starting one")
+    parser.add_argument("--delay-scale", type=float, default=1.0, help="multiply the rate limiter's pacing (> 0; 0.01 = 100x the request rate)")
+    parser.add_argument("--timeout-scale", type=float, default=1.0, help="multiply the scrapers' request timeouts")
+    parser.add_argument("--json", help="also write the report as JSON to this path")
+    mock_amazon.add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    if args.delay_scale <= 0:
+        parser.error("--delay-scale must be > 0")
+    configure_scrapers(args.delay_scale, args.timeout_scale)
+
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        server = mock_amazon.start_server(mock_amazon.faults_from_args(args))
+        base_url = server.base_url
+
+    pool = None
+    scrape = SCRAPERS[args.scraper]
+    if args.via == "workers":
+        print(f"🔥 Starting {args.workers} scrape workers")
+        pool = scrape_service.WorkerPool(args.workers, args.max_jobs)
+        scrape = worker_scrape(pool, args.scraper, args.job_timeout)
+    print(f"🚚 Scraping {args.products} products from {base_url} with {args.scraper} "
+          f"(concurrency {args.concurrency}, via {args.via})")
+
+    wall, samples = run_load(scrape, product_urls(base_url, args.products), args.concurrency)
+    report = build_report(args.scraper, wall, samples, server.snapshot() if server else None, pool)
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if pool:
+        pool.shutdown()
+    if server:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,498 @@
+#!/usr/bin/env python3
+"""
+Generate the anonymized product-page corpus used by benchmarks/extractors.py
+- Pages follow the markup of real Amazon product pages (ids, classes, inline image scripts)
+  but every brand, ASIN, text and image id is synthetic
+- One page per layout the scrapers handle, at small / medium / large sizes
+- Output is deterministic, so regenerating only changes files when this script changes
+
+Usage: python3 benchmarks/make_corpus.py
+"""
+
+import json
+import os
+import random
+import string
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+
+RLM, LRM = "\u200f", "\u200e"
+IMG = "https://m.media-amazon.com/images/I/{}.{}.jpg"
+
+WORDS = (
+    "soft breathable cotton blend fabric durable stitching everyday comfort lightweight stretch "
+    "regular fit machine wash ribbed collar classic design moisture wicking quick dry travel "
+    "compact sturdy premium finish easy clean stainless steel bluetooth battery charging wireless "
+    "portable ergonomic grip adjustable strap gift pack warranty quality tested daily use"
+).split()
+
+
+class Page:
+    """Small helper around a seeded RNG that builds page fragments"""
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+
+    def words(self, n):
+        return " ".join(self.rng.choice(WORDS) for _ in range(n))
+
+    def sentence(self, n=12):
+        return self.words(n).capitalize() + "."
+
+    def paragraph(self, sentences=4):
+        return " ".join(self.sentence(self.rng.randint(8, 16)) for _ in range(sentences))
+
+    def image_id(self):
+        alphabet = string.ascii_letters + string.digits
+        return self.rng.choice("5678") + "1" + "".join(self.rng.choice(alphabet) for _ in range(8)) + "L"
+
+    def asin(self):
+        return "B0" + "".join(self.rng.choice(string.ascii_uppercase + string.digits) for _ in range(8))
+
+
+# --- FRAGMENTS ---
+
+def head(title):
+    return (
+        "<!doctype html><html lang=\"en-in\" class=\"a-no-js\"><head><meta charset=\"utf-8\">"
+        f"<title>{title} : Amazon.in</title>"
+        "<link rel=\"stylesheet\" href=\"https://m.media-amazon.com/images/I/11EIQ5IGqaL._RC_01ZTHTZObnL.css\">"
+        "</head><body class=\"a-m-in a-aui_72554-c\">"
+    )
+
+
+def nav():
+    sprite = "https://m.media-amazon.com/images/G/31/gno/sprites/nav-sprite-global-1x-reorg-privacy._CB587940754_.png"
+    return (
+        "<header id=\"navbar-main\"><div id=\"nav-belt\"><div id=\"nav-logo\">"
+        f"<a href=\"/ref=nav_logo\" class=\"nav-logo-link\"><span class=\"nav-sprite nav-logo-base\" "
+        f"style=\"background-image:url({sprite})\"></span></a></div>"
+        "<form id=\"nav-search-bar-form\"><input type=\"text\" id=\"twotabsearchtextbox\" name=\"field-keywords\"></form>"
+        "<a id=\"nav-cart\" href=\"/gp/cart/view.html\"><span id=\"nav-cart-count\">0</span></a></div></header>"
+    )
+
+
+def image_entries(page, count, hires_missing=()):
+    entries = []
+    for i in range(count):
+        image_id = page.image_id()
+        entries.append({
+            "hiRes": None if i in hires_missing else IMG.format(image_id, "_AC_SL1500_"),
+            "thumb": IMG.format(image_id, "_AC_US40_"),
+            "large": IMG.format(image_id, "_AC_"),
+            "main": {IMG.format(image_id, "_AC_UY879_"): [879, 659], IMG.format(image_id, "_AC_UY741_"): [741, 556]},
+            "variant": "MAIN" if i == 0 else f"PT0{i}",
+            "lowRes": None,
+            "shoppableScene": None,
+        })
+    return entries
+
+
+def image_block_script(entries):
+    data = json.dumps(entries, separators=(",", ":"))
+    return (
+        "<script type=\"text/javascript\">\n"
+        "P.when('A').register(\"ImageBlockATF\", function(A){\n"
+        "    var data = {\n"
+        "        'enableS2WithoutS1': false,\n"
+        "        'notShowVideoCount': false,\n"
+        f"        'colorImages': {{ 'initial': {data}}},\n"
+        "        'colorToAsin': {'initial': {}},\n"
+        "        'holderRatio': 1.0,\n"
+        "        'holderMaxHeight': 700,\n"
+        "        'heroImage': {'initial': []},\n"
+        "        'heroVideo': {'initial': []},\n"
+        "        'spin360ColorData': {'initial': {}},\n"
+        "        'airyConfigEnabled': false\n"
+        "    };\n"
+        "    A.trigger('P.AboveTheFold');\n"
+        "    return data;\n"
+        "});\n"
+        "</script>"
+    )
+
+
+def landing_image(entries):
+    first = entries[0]
+    hires = first["hiRes"] or first["large"]
+    dynamic = json.dumps(first["main"], separators=(",", ":")).replace('"', "&quot;")
+    return (
+        "<div id=\"imgTagWrapperId\" class=\"imgTagWrapper\">"
+        f"<img alt=\"Product image\" src=\"{first['large']}\" data-old-hires=\"{hires}\" "
+        f"id=\"landingImage\" data-a-dynamic-image=\"{dynamic}\" style=\"max-width:559px;max-height:700px;\">"
+        "</div>"
+    )
+
+
+def alt_images(entries):
+    items = "".join(
+        f"<li class=\"a-spacing-small item imageThumbnail a-declarative\"><span class=\"a-button-thumbnail\">"
+        f"<img alt=\"\" src=\"{entry['thumb']}\"></span></li>"
+        for entry in entries
+    )
+    return f"<div id=\"altImages\" class=\"a-fixed-left-grid-col a-col-left\"><ul class=\"a-unordered-list a-nostyle a-button-list a-vertical\">{items}</ul></div>"
+
+
+def title_block(title, brand):
+    return (
+        "<div id=\"titleSection\" class=\"a-section a-spacing-none\"><h1 id=\"title\" class=\"a-size-large a-spacing-none\">"
+        f"<span id=\"productTitle\" class=\"a-size-large product-title-word-break\">        {title}       </span></h1></div>"
+        f"<div id=\"bylineInfo_feature_div\"><a id=\"bylineInfo\" class=\"a-link-normal\" href=\"/stores/{brand.replace(' ', '')}/page/X\">"
+        f"Visit the {brand} Store</a></div>"
+    )
+
+
+def price_block(price, mrp):
+    return (
+        "<div id=\"corePriceDisplay_desktop_feature_div\"><div class=\"a-section a-spacing-none aok-align-center\">"
+        "<span class=\"a-price aok-align-center reinventPricePriceToPayMargin priceToPay\">"
+        f"<span class=\"a-offscreen\">₹{price}</span><span aria-hidden=\"true\"><span class=\"a-price-symbol\">₹</span>"
+        f"<span class=\"a-price-whole\">{price}<span class=\"a-price-decimal\">.</span></span></span></span>"
+        "<span class=\"a-size-small aok-offscreen\">M.R.P.:</span>"
+        f"<span class=\"a-price a-text-price\" data-a-strike=\"true\"><span class=\"a-offscreen\">₹{mrp}</span>"
+        f"<span aria-hidden=\"true\">₹{mrp}</span></span></div></div>"
+    )
+
+
+def feature_bullets(bullets):
+    items = "".join(f"<li class=\"a-spacing-mini\"><span class=\"a-list-item\"> {b} </span></li>" for b in bullets)
+    return (
+        "<div id=\"feature-bullets\" class=\"a-section a-spacing-medium a-spacing-top-small\">"
+        "<h1 class=\"a-size-base-plus a-text-bold\"> About this item </h1>"
+        f"<ul class=\"a-unordered-list a-vertical a-spacing-mini\">{items}</ul></div>"
+    )
+
+
+def fact_row(key, value):
+    return (
+        "<div class=\"a-fixed-left-grid product-facts-detail\"><div class=\"a-fixed-left-grid-inner\">"
+        f"<div class=\"a-fixed-left-grid-col a-col-left\"><span class=\"a-color-base\">{key}</span></div>"
+        f"<div class=\"a-fixed-left-grid-col a-col-right\"><span class=\"a-color-base\">{value}</span></div>"
+        "</div></div>"
+    )
+
+
+def product_facts_expander(details, about, additional):
+    details_html = "".join(fact_row(k, v) for k, v in details)
+    about_html = "".join(f"<li><span class=\"a-list-item a-size-base a-color-base\">{b}</span></li>" for b in about)
+    additional_html = "".join(fact_row(k, v) for k, v in additional)
+    return (
+        "<div id=\"productFactsDesktopExpander\" class=\"a-section a-spacing-none\">"
+        "<h3 class=\"product-facts-title\">Product details</h3>"
+        f"<div class=\"a-section a-spacing-small\">{details_html}</div>"
+        "<hr class=\"a-spacing-base a-divider-normal\">"
+        "<h3 class=\"product-facts-title\">About this item</h3>"
+        f"<ul class=\"a-unordered-list a-vertical a-spacing-small\">{about_html}</ul>"
+        "<hr class=\"a-spacing-base a-divider-normal\">"
+        "<h3 class=\"product-facts-title\">Additional Information</h3>"
+        f"{additional_html}"
+        "<hr class=\"a-spacing-base a-divider-normal\">"
+        "</div>"
+    )
+
+
+def detail_bullets(pairs, wrapper=True, li_class=""):
+    """Detail bullets with the &rlm; / &lrm; marks Amazon puts around the colon"""
+    li_attr = f" class=\"{li_class}\"" if li_class else ""
+    items = "".join(
+        f"<li{li_attr}><span class=\"a-list-item\"><span class=\"a-text-bold\">{k} {RLM}\n:\n{LRM}</span> "
+        f"<span>{v}</span></span></li>"
+        for k, v in pairs
+    )
+    inner = (
+        "<div id=\"detailBullets_feature_div\">"
+        f"<ul class=\"a-unordered-list a-nostyle a-vertical a-spacing-none detail-bullet-list\">{items}</ul></div>"
+    )
+    if not wrapper:
+        return inner
+    return f"<div id=\"detailBulletsWrapper_feature_div\" class=\"a-section feature detail-bullets-wrapper bucket\">{inner}</div>"
+
+
+def tech_spec_table(rows, section=1):
+    body = "".join(
+        f"<tr><th class=\"a-color-secondary a-size-base prodDetSectionEntry\"> {k} </th>"
+        f"<td class=\"a-size-base prodDetAttrValue\"> {LRM}{v} </td></tr>"
+        for k, v in rows
+    )
+    return (
+        "<div id=\"prodDetails\" class=\"a-section\"><h2>Product information</h2>"
+        f"<table id=\"productDetails_techSpec_section_{section}\" class=\"a-keyvalue prodDetTable\" role=\"presentation\">"
+        f"<tbody>{body}</tbody></table></div>"
+    )
+
+
+def description(text):
+    return (
+        "<div id=\"productDescription_feature_div\" class=\"celwidget\"><h2>Product description</h2>"
+        f"<div id=\"productDescription\" class=\"a-section a-spacing-small\"><p><span>{text}</span></p></div></div>"
+    )
+
+
+def reviews(page, count):
+    blocks = []
+    for i in range(count):
+        stars = page.rng.randint(1, 5)
+        blocks.append(
+            f"<div id=\"customer_review-R{i:04d}X{page.rng.randint(100, 999)}\" class=\"a-section review aok-relative\" data-hook=\"review\">"
+            "<div class=\"a-profile-content\"><span class=\"a-profile-name\">Amazon Customer</span></div>"
+            f"<i data-hook=\"review-star-rating\" class=\"a-icon a-icon-star a-star-{stars}\"><span class=\"a-icon-alt\">{stars}.0 out of 5 stars</span></i>"
+            f"<span data-hook=\"review-title\" class=\"a-size-base\">{page.words(5)}</span>"
+            "<span data-hook=\"review-date\" class=\"a-size-base a-color-secondary\">Reviewed in India on 3 March 2024</span>"
+            "<span data-hook=\"avp-badge\" class=\"a-size-mini a-color-state a-text-bold\">Verified Purchase</span>"
+            f"<div class=\"a-row a-spacing-small review-data\"><span data-hook=\"review-body\" class=\"a-size-base review-text\">"
+            f"<div class=\"a-expander-content reviewText\"><span>{page.paragraph(page.rng.randint(2, 6))}</span></div></span></div>"
+            f"<span data-hook=\"helpful-vote-statement\" class=\"a-size-base a-color-tertiary\">{page.rng.randint(2, 90)} people found this helpful</span>"
+            "</div>"
+        )
+    return f"<div id=\"cm-cr-dp-review-list\" class=\"a-section review-views\">{''.join(blocks)}</div>"
+
+
+def carousel(page, name, cards):
+    items = []
+    for _ in range(cards):
+        asin = page.asin()
+        items.append(
+            f"<li class=\"a-carousel-card\" role=\"listitem\"><div data-asin=\"{asin}\" class=\"a-section sp_offerVertical p13n-asin\">"
+            f"<a class=\"a-link-normal\" href=\"/dp/{asin}/ref=sspa_dk_detail\"><img alt=\"{page.words(6)}\" "
+            f"src=\"{IMG.format(page.image_id(), '_AC_UL320_')}\" height=\"160\" width=\"160\"></a>"
+            f"<div class=\"p13n-sc-truncated\">{page.words(10)}</div>"
+            f"<span class=\"a-price\"><span class=\"a-offscreen\">₹{page.rng.randint(199, 4999)}</span></span></div></li>"
+        )
+    return (
+        f"<div id=\"{name}\" class=\"a-begin a-carousel-container a-carousel-display-swap\">"
+        f"<ol class=\"a-carousel\" role=\"list\">{''.join(items)}</ol></div>"
+    )
+
+
+def inline_config_script(page, entries):
+    """Large non-image inline scripts (weblabs, metrics config), the bulk of a real page's bytes"""
+    config = {f"weblab_{i}": {"treatment": page.rng.choice("CT"), "id": page.asin(), "flags": page.words(6)} for i in range(entries)}
+    return (
+        "<script type=\"text/javascript\">\n"
+        "(function(){ var ue_t0 = ue_t0 || +new Date(); window.ueLogError = function(){};\n"
+        f"var config = {json.dumps(config, separators=(',', ':'))};\n"
+        "P.declare('dp-weblabs', config); })();\n"
+        "</script>"
+    )
+
+
+def twister_script(parent, current, sizes, colors, children, color_images):
+    """twister-js-init-dpx-data: the whole size/colour family of a parent page"""
+    data = {
+        "parentAsin": parent,
+        "currentAsin": current,
+        "dimensionToAsinMap": {f"{s}_{c}": asin for (s, c), asin in children.items()},
+        "dimensionValuesDisplayData": {asin: [sizes[s], colors[c]] for (s, c), asin in children.items()},
+        "dimensionsDisplay": ["Size", "Colour"],
+        "dimensions": ["size_name", "color_name"],
+        "variationValues": {"size_name": sizes, "color_name": colors},
+        "asinVariationValues": {asin: {"size_name": str(s), "color_name": str(c), "ASIN": asin}
+                                for (s, c), asin in children.items()},
+        "num_total_variations": len(children),
+        "landingAsinColor": colors[0],
+        "colorImages": color_images,
+    }
+    return (
+        "<script type=\"text/javascript\">\n"
+        "P.register('twister-js-init-dpx-data', function() {\n"
+        f"    var dataToReturn = {json.dumps(data, separators=(',', ' : '))};\n"
+        "    return dataToReturn;\n"
+        "});\n"
+        "</script>"
+    )
+
+
+def twister_buttons(name, label, values):
+    items = "".join(
+        f"<li id=\"{name}_{i}\" class=\"swatchAvailable\" title=\"Click to select {value}\">"
+        f"<span class=\"a-button a-button-toggle\"><span class=\"a-button-text\">{value}</span></span></li>"
+        for i, value in enumerate(values)
+    )
+    return (
+        f"<div id=\"variation_{name}\" class=\"a-section a-spacing-small\"><div class=\"a-row\">"
+        f"<label class=\"a-form-label\">{label}: </label><span class=\"selection\">{values[0]}</span></div>"
+        f"<ul class=\"a-unordered-list a-nostyle a-button-list a-horizontal\">{items}</ul></div>"
+    )
+
+
+def footer():
+    return "<div id=\"navFooter\" class=\"navLeftFooter nav-sprite-v1\"><a href=\"/gp/help/customer/display.html\">Help</a></div></body></html>"
+
+
+# --- PAGES ---
+
+def apparel_facts_small():
+    """New apparel layout: productFactsDesktopExpander plus colorImages script"""
+    page = Page(3101)
+    title = "Acme Apparel Men's Regular Fit Cotton Polo T-Shirt (Navy Blue, Medium)"
+    entries = image_entries(page, 6, hires_missing=(5,))
+    about = [page.sentence(14) for _ in range(5)]
+    return "".join([
+        head(title), nav(),
+        "<div id=\"dp\" class=\"apparel\"><div id=\"dp-container\">",
+        "<div id=\"leftCol\"><div id=\"imageBlock\">", alt_images(entries), landing_image(entries), "</div></div>",
+        image_block_script(entries),
+        "<div id=\"centerCol\">", title_block(title, "Acme Apparel"), price_block("499", "1,299"),
+        product_facts_expander(
+            details=[("Material composition", "60% Cotton, 40% Polyester"), ("Pattern", "Solid"),
+                     ("Fit type", "Regular Fit"), ("Sleeve type", "Short Sleeve"),
+                     ("Collar style", "Polo Collar"), ("Country of Origin", "India")],
+            about=about,
+            additional=[("Manufacturer", "Acme Apparel Pvt Ltd, Tiruppur"), ("Packer", "Acme Apparel Pvt Ltd"),
+                        ("Item Weight", "210 g"), ("Item Dimensions LxWxH", "30 x 25 x 2 Centimeters"),
+                        ("Net Quantity", "1.00 count"), ("Generic Name", "Polo T-Shirt")],
+        ),
+        "</div>",
+        detail_bullets([("Product Dimensions", "30 x 25 x 2 cm; 210 g"), ("Date First Available", "12 January 2024"),
+                        ("Manufacturer", "Acme Apparel Pvt Ltd, Tiruppur"), ("ASIN", "B0TESTAP01"),
+                        ("Item model number", "AA-POLO-NV-M"), ("Department", "Men"),
+                        ("Best Sellers Rank", "#1,234 in Clothing &amp; Accessories")]),
+        description(page.paragraph(3)),
+        "</div></div>", footer(),
+    ])
+
+
+def home_detailbullets_medium():
+    """Classic layout: feature-bullets, detail bullets wrapper, dynamic-image landing image, reviews"""
+    page = Page(3102)
+    title = "Northwind Home Stainless Steel Vacuum Insulated Water Bottle, 1 Litre, Silver"
+    entries = image_entries(page, 4)
+    bullets = [
+        "DOUBLE WALL INSULATION: keeps drinks cold for 24 hours and hot for 12 hours",
+        "FOOD GRADE STEEL: 304 stainless steel body with a durable powder coated finish",
+        "LEAK PROOF LID: twist cap with silicone seal, safe to carry in any travel bag",
+        "EASY CLEAN: wide mouth opening fits ice cubes and a cleaning brush",
+        "WARRANTY: 1 year warranty against manufacturing defects",
+    ]
+    return "".join([
+        head(title), nav(), inline_config_script(page, 60),
+        "<div id=\"dp\" class=\"kitchen\"><div id=\"dp-container\">",
+        "<div id=\"leftCol\"><div id=\"imageBlock\">", alt_images(entries), landing_image(entries), "</div></div>",
+        "<div id=\"centerCol\">", title_block(title, "Northwind Home"), price_block("749", "1,499"),
+        feature_bullets(bullets), "</div>",
+        detail_bullets([("Product Dimensions", "8 x 8 x 28 cm; 380 g"), ("Date First Available", "5 August 2023"),
+                        ("Manufacturer", "Northwind Home Products, Mumbai"), ("Packer", "Northwind Home Products"),
+                        ("Importer", "Northwind Imports LLP"), ("ASIN", "B0TESTHM02"),
+                        ("Item model number", "NW-BTL-1000"), ("Country of Origin", "China"),
+                        ("Item Weight", "380 g"), ("Customer Reviews", "4.3 out of 5 stars 2,314 ratings")],
+                       li_class="a-list-item"),
+        description(page.paragraph(5)),
+        carousel(page, "sp_detail", 24),
+        reviews(page, 40),
+        "</div></div>", footer(),
+    ])
+
+
+def electronics_techspec_large():
+    """Electronics layout: tech spec table, many gallery images, heavy carousels and reviews"""
+    page = Page(3103)
+    title = "Voltix Wireless Bluetooth Over Ear Headphones with 40H Playtime, Fast Charging, Black"
+    entries = image_entries(page, 9, hires_missing=(2, 6))
+    bullets = [page.sentence(18) for _ in range(6)]
+    return "".join([
+        head(title), nav(), inline_config_script(page, 900),
+        "<div id=\"dp\" class=\"electronics\"><div id=\"dp-container\">",
+        "<div id=\"leftCol\"><div id=\"imageBlock\">", alt_images(entries), landing_image(entries), "</div></div>",
+        image_block_script(entries),
+        "<div id=\"centerCol\">", title_block(title, "Voltix"), price_block("2,199", "5,999"),
+        feature_bullets(bullets), "</div>",
+        tech_spec_table([("Brand", "Voltix"), ("Manufacturer", "Voltix Electronics, Shenzhen"),
+                         ("Model", "VX-H400"), ("Colour", "Black"), ("Form Factor", "Over Ear"),
+                         ("Connector Type", "Wireless, USB-C"), ("Battery Life", "40 Hours"),
+                         ("Item Weight", "250 g"), ("Importer", "Voltix India Pvt Ltd"),
+                         ("Country of Origin", "China")]),
+        detail_bullets([("Date First Available", "20 February 2024"), ("Packer", "Voltix India Pvt Ltd"),
+                        ("Item part number", "VX-H400-BLK")], wrapper=False),
+        description(page.paragraph(8)),
+        "".join(carousel(page, f"sims-carousel-{i}", 40) for i in range(6)),
+        reviews(page, 160),
+        inline_config_script(page, 1200),
+        "</div></div>", footer(),
+    ])
+
+
+def sparse_fallbacks_small():
+    """Minimal page: no bullets or detail sections, images only as plain img tags"""
+    page = Page(3104)
+    title = "Generic Cotton Tote Bag for Shopping and Travel"
+    image_ids = [page.image_id() for _ in range(3)]
+    images = "".join(f"<img alt=\"Tote bag\" src=\"{IMG.format(i, '_SX300_SY300_')}\">" for i in image_ids)
+    return "".join([
+        head(title), nav(),
+        "<div id=\"dp\"><div id=\"titleSection\">",
+        f"<h1 id=\"title\" class=\"a-size-large\"><span class=\"product-title-word-break\">{title}</span></h1></div>",
+        f"<div id=\"imageBlock\">{images}</div>",
+        "<div id=\"descriptionAndDetails\">",
+        description(
+            "Durable cotton canvas tote with reinforced stitching on the handles. "
+            "The soft breathable fabric folds flat for travel and carries daily shopping with ease. "
+            "Machine wash cold and line dry to keep the material in shape for years of everyday use."
+        ),
+        "</div></div>", footer(),
+    ])
+
+
+def apparel_twister_medium():
+    """Apparel parent page: twister size/colour matrix with per-colour images, detail bullets, reviews"""
+    page = Page(3105)
+    title = "Acme Apparel Women's Straight Cotton Kurta (Indigo, Medium)"
+    sizes = ["S", "M", "L", "XL", "XXL"]
+    colors = ["Indigo", "Maroon", "Mustard Yellow", "Bottle Green"]
+    # One combination is out of the family, as on real pages
+    children = {(s, c): page.asin() for s in range(len(sizes)) for c in range(len(colors)) if (s, c) != (4, 3)}
+    color_images = {color: image_entries(page, 5) for color in colors}
+    entries = color_images[colors[0]]
+    bullets = [page.sentence(14) for _ in range(5)]
+    return "".join([
+        head(title), nav(), inline_config_script(page, 40),
+        "<div id=\"dp\" class=\"apparel\"><div id=\"dp-container\">",
+        "<div id=\"leftCol\"><div id=\"imageBlock\">", alt_images(entries), landing_image(entries), "</div></div>",
+        image_block_script(entries),
+        "<div id=\"centerCol\">", title_block(title, "Acme Apparel"), price_block("899", "2,499"),
+        "<div id=\"twister_feature_div\"><form id=\"twister\" class=\"a-spacing-small\">",
+        twister_buttons("size_name", "Size", sizes), twister_buttons("color_name", "Colour", colors),
+        "</form></div>",
+        feature_bullets(bullets), "</div>",
+        twister_script("B0TESTKP05", children[(1, 0)], sizes, colors, children, color_images),
+        detail_bullets([("Product Dimensions", "40 x 30 x 3 cm; 260 g"), ("Date First Available", "2 October 2023"),
+                        ("Manufacturer", "Acme Apparel Pvt Ltd, Jaipur"), ("ASIN", "B0TESTKP05"),
+                        ("Item model number", "AA-KRT-IND"), ("Department", "Women"),
+                        ("Country of Origin", "India")]),
+        description(page.paragraph(4)),
+        reviews(page, 30),
+        "</div></div>", footer(),
+    ])
+
+
+PAGES = [
+    ("apparel_facts_small", "B0TESTAP01", apparel_facts_small),
+    ("home_detailbullets_medium", "B0TESTHM02", home_detailbullets_medium),
+    ("electronics_techspec_large", "B0TESTEL03", electronics_techspec_large),
+    ("sparse_fallbacks_small", "B0TESTSP04", sparse_fallbacks_small),
+    ("apparel_twister_medium", "B0TESTKP05", apparel_twister_medium),
+]
+
+
+def main():
+    os.makedirs(CORPUS_DIR, exist_ok=True)
+    manifest = []
+    for name, asin, build in PAGES:
+        html = build()
+        path = os.path.join(CORPUS_DIR, f"{name}.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(html)
+        manifest.append({
+            "name": name,
+            "url": f"https://www.amazon.in/dp/{asin}",
+            "layout": build.__doc__.strip(),
+            "bytes": len(html.encode("utf-8")),
+        })
+        print(f"📄 {name}: {len(html) / 1024:.0f} KiB")
+
+    with open(os.path.join(CORPUS_DIR, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Local mock Amazon marketplace for load and fault-injection runs
+- Serves the benchmark corpus at /dp/<ASIN>; unknown ASINs map onto a corpus page,
+  so a load run can use as many distinct product URLs as it likes
+- Injects latency, 503s, CAPTCHA pages, slow bodies and hung requests at configurable rates
+- gzip-encodes pages for clients that accept it, like the real site
+- --charset-in picks where a page's charset is declared: the Content-Type header (like the
+  real site), only the page's <meta charset>, or nowhere the client can see before the body
+- GET /__stats returns how many responses of each kind were served
+
+Usage: python3 benchmarks/mock_amazon.py [--port 8080] [--latency-ms 150] [--error-rate 0.05]
+                                         [--captcha-rate 0.02] [--timeout-rate 0.01] [--charset-in header]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+
+ASIN_PATH = re.compile(r"/dp/([A-Z0-9]{10})")
+
+# Same markers scraper.py looks for on a robot-check page
+CAPTCHA_PAGE = (
+    "<!doctype html><html><head><title>Amazon.in</title></head><body>"
+    "<div class=\"a-container\"><h4>Enter the characters you see below</h4>"
+    "<p class=\"a-last\">Sorry, we just need to make sure you're not a robot. "
+    "Type the characters you see in this image.</p>"
+    "<form method=\"get\" action=\"/errors/validateCaptcha\"><input id=\"captchacharacters\" name=\"field-keywords\"></form>"
+    "<p>To discuss automated access to Amazon data please contact api-services-support@amazon.com.</p>"
+    "</div></body></html>"
+)
+UNAVAILABLE_PAGE = "<html><body><h1>503 Service Unavailable</h1></body></html>"
+
+# Content-Type sent with corpus pages for each --charset-in choice (the pages carry <meta charset="utf-8">)
+PAGE_CONTENT_TYPES = {
+    "header": "text/html;charset=UTF-8",
+    "meta": "text/html",
+    "none": None,
+}
+
+
+class Faults:
+    """Fault-injection settings; rates are probabilities per request"""
+
+    def __init__(self, latency_ms=0, jitter_ms=0, error_rate=0.0, captcha_rate=0.0,
+                 timeout_rate=0.0, hang_seconds=30.0, kib_per_second=0, charset_in="header", seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.captcha_rate = captcha_rate
+        self.timeout_rate = timeout_rate
+        self.hang_seconds = hang_seconds
+        self.kib_per_second = kib_per_second
+        self.charset_in = charset_in
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self):
+        """Pick the outcome for one request: ok, unavailable, captcha or hang"""
+        with self._lock:
+            roll = self._rng.random()
+            delay = max(0.0, self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+        for outcome, rate in (("hang", self.timeout_rate), ("unavailable", self.error_rate),
+                              ("captcha", self.captcha_rate)):
+            if roll < rate:
+                return outcome, delay
+            roll -= rate
+        return "ok", delay
+
+
+def load_pages():
+    """[(asin, html bytes, gzip bytes)] for every corpus page"""
+    with open(os.path.join(CORPUS_DIR, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    pages = []
+    for entry in manifest:
+        with open(os.path.join(CORPUS_DIR, f"{entry['name']}.html"), "rb") as f:
+            body = f.read()
+        asin = ASIN_PATH.search(entry["url"]).group(1)
+        pages.append((asin, body, gzip.compress(body, compresslevel=6)))
+    return pages
+
+
+class MockAmazon(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, faults):
+        super().__init__(address, MockAmazonHandler)
+        self.faults = faults
+        self.pages = load_pages()
+        self.by_asin = {asin: (body, gz) for asin, body, gz in self.pages}
+        self.stats = {}
+        self._stats_lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def page_for(self, asin):
+        if asin in self.by_asin:
+            return self.by_asin[asin]
+        _, body, gz = self.pages[sum(map(ord, asin)) % len(self.pages)]
+        return body, gz
+
+    def count(self, outcome):
+        with self._stats_lock:
+            self.stats[outcome] = self.stats.get(outcome, 0) + 1
+
+    def snapshot(self):
+        with self._stats_lock:
+            return dict(self.stats)
+
+    def handle_error(self, request, client_address):
+        # Clients that stop reading early (streaming fetches) reset the connection; that is expected
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+
+class MockAmazonHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, delayed ACKs add ~40 ms per response
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass  # the load driver reports results; per-request lines are noise
+
+    def do_GET(self):
+        if self.path.startswith("/__stats"):
+            return self._send(200, json.dumps(self.server.snapshot()).encode(), "application/json")
+
+        match = ASIN_PATH.search(self.path)
+        if not match:
+            self.server.count("not_found")
+            return self._send(404, b"<html><body>Page Not Found</body></html>")
+
+        faults = self.server.faults
+        outcome, delay = faults.draw()
+        self.server.count(outcome)
+        time.sleep(delay)
+
+        if outcome == "hang":
+            # Hold the connection open past the client's timeout, then drop it
+            time.sleep(faults.hang_seconds)
+            self.close_connection = True
+            return None
+        if outcome == "unavailable":
+            return self._send(503, UNAVAILABLE_PAGE.encode())
+        if outcome == "captcha":
+            return self._send(200, CAPTCHA_PAGE.encode())
+
+        body, gz = self.server.page_for(match.group(1))
+        content_type = PAGE_CONTENT_TYPES[faults.charset_in]
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            return self._send(200, gz, content_type, encoding="gzip")
+        return self._send(200, body, content_type)
+
+    def _send(self, status, body, content_type="text/html;charset=UTF-8", encoding=None):
+        try:
+            self.send_response(status)
+            if content_type:
+                self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            if encoding:
+                self.send_header("Content-Encoding", encoding)
+            self.end_headers()
+            self._write_body(body)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def _write_body(self, body):
+        rate = self.server.faults.kib_per_second
+        if not rate:
+            self.wfile.write(body)
+            return
+        # Trickle the body out to simulate a slow connection
+        chunk = 16 * 1024
+        for start in range(0, len(body), chunk):
+            self.wfile.write(body[start:start + chunk])
+            self.wfile.flush()
+            time.sleep(chunk / 1024 / rate)
+
+
+def add_fault_arguments(parser):
+    """Fault-injection flags shared by this server and benchmarks/load.py"""
+    group = parser.add_argument_group("mock marketplace faults")
+    group.add_argument("--latency-ms", type=float, default=150, help="time to first byte")
+    group.add_argument("--jitter-ms", type=float, default=50, help="uniform +/- jitter on the latency")
+    group.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 503")
+    group.add_argument("--captcha-rate", type=float, default=0.0, help="share of requests answered with a CAPTCHA page")
+    group.add_argument("--timeout-rate", type=float, default=0.0, help="share of requests that hang past the client timeout")
+    group.add_argument("--hang-seconds", type=float, default=30, help="how long a hung request is held open")
+    group.add_argument("--kib-per-second", type=float, default=0, help="throttle response bodies (0 = unlimited)")
+    group.add_argument("--charset-in", choices=sorted(PAGE_CONTENT_TYPES), default="header",
+                       help="where corpus pages declare their charset")
+    group.add_argument("--seed", type=int, help="seed for repeatable fault sequences")
+    return group
+
+
+def faults_from_args(args):
+    return Faults(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                  captcha_rate=args.captcha_rate, timeout_rate=args.timeout_rate,
+                  hang_seconds=args.hang_seconds, kib_per_second=args.kib_per_second,
+                  charset_in=args.charset_in, seed=args.seed)
+
+
+def start_server(faults, host="127.0.0.1", port=0):
+    """Run a mock marketplace on a background thread; port 0 picks a free port"""
+    server = MockAmazon((host, port), faults)
+    thread = threading.Thread(target=server.serve_forever, name="mock-amazon", daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockAmazon((args.host, args.port), faults_from_args(args))
+    print(f"🛒 Mock Amazon serving {len(server.pages)} corpus pages at {server.base_url}/dp/<ASIN>")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
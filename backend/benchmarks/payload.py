@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Scrape payload benchmark: size and serialization time of the scrapers' JSON output
+- Builds each corpus page's amz_scraper --formatted result and the merged /api/scrape-product
+  response offline (no network)
+- Compares the old output (json.dumps indent=2 for the CLI, Flask's sorted ASCII-escaped
+  jsonify for the API) with serialization.dumps, with and without fields="-raw"
+- Reports best-of-N microseconds and bytes per page
+
+Usage: python3 benchmarks/payload.py [--runs 200]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+import amz_scraper  # noqa: E402
+import scraper  # noqa: E402
+import serialization  # noqa: E402
+from scrape_routes import merge_scrape_results  # noqa: E402
+
+CORPUS_DIR = os.path.join(BENCH_DIR, "corpus")
+
+
+class SavedResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+def best_us(fn, runs):
+    best, out = None, None
+    for _ in range(runs):
+        start = time.perf_counter()
+        out = fn()
+        elapsed = (time.perf_counter() - start) * 1e6
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(out.encode("utf-8") if isinstance(out, str) else out)
+
+
+def variants(cli, merged):
+    return {
+        "cli  indent=2 (old)": lambda: json.dumps(cli, ensure_ascii=False, indent=2),
+        "cli  compact": lambda: serialization.dumps(cli),
+        "cli  fields=-raw": lambda: serialization.dumps(serialization.select_fields(cli, "-raw")),
+        "api  jsonify (old)": lambda: json.dumps(merged, ensure_ascii=True, sort_keys=True, separators=(",", ":")),
+        "api  compact": lambda: serialization.dumps_bytes(merged),
+        "api  fields=-raw": lambda: serialization.dumps_bytes(serialization.select_fields(merged, "-raw")),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=200, help="serializations per page and variant (best is reported)")
+    args = parser.parse_args()
+
+    with open(os.path.join(CORPUS_DIR, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    print(f"🧾 JSON backend: {'orjson' if serialization.orjson else 'json'}")
+    print(f"{'page':<30} {'variant':<22} {'µs':>8} {'bytes':>8}")
+    for entry in manifest:
+        with open(os.path.join(CORPUS_DIR, f"{entry['name']}.html"), encoding="utf-8") as f:
+            html = f.read()
+        cli = amz_scraper.format_scraped_data(amz_scraper.extract_product(html, entry["url"]))
+        text = scraper.scrape_amazon_content(SavedResponse(html), entry["url"])
+        merged = merge_scrape_results(text, cli)
+        for label, fn in variants(cli, merged).items():
+            micros, size = best_us(fn, args.runs)
+            print(f"{entry['name']:<30} {label:<22} {micros:>8.1f} {size:>8}")
+
+
+if __name__ == "__main__":
+    main()
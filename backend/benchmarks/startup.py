@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark for python-server.py
+- Loads the server module in a fresh interpreter with -X importtime
+- Reports wall time and the slowest top-level imports
+- Fails if startup exceeds the budget or a lazily-loaded library is imported eagerly
+
+Usage: python3 benchmarks/startup.py [--budget-ms 1500] [--top 15] [--runs 3]
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# These must only be imported on first use (see clients.py)
+LAZY_MODULES = [
+    "google.generativeai",
+    "google.cloud.storage",
+    "gspread",
+    "PIL.Image",
+]
+
+LOAD_SERVER = (
+    "import importlib.util, sys;"
+    "spec = importlib.util.spec_from_file_location('python_server', 'python-server.py');"
+    "module = importlib.util.module_from_spec(spec);"
+    "spec.loader.exec_module(module)"
+)
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def run_once():
+    """Load the server once and return (wall_ms, importtime rows)"""
+    env = dict(os.environ)
+    env.setdefault("GOOGLE_API_KEY", "startup-benchmark")
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", LOAD_SERVER],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    if proc.returncode != 0:
+        print(proc.stderr[-2000:], file=sys.stderr)
+        raise SystemExit(f"❌ Server module failed to load (exit {proc.returncode})")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            # importtime indents nested imports by two spaces per level
+            depth = (len(indent) - 1) // 2
+            rows.append((name, int(self_us), int(cumulative_us), depth))
+    return wall_ms, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark python-server.py startup")
+    parser.add_argument("--budget-ms", type=float, default=1500.0, help="fail if median wall time exceeds this")
+    parser.add_argument("--top", type=int, default=15, help="number of slowest imports to show")
+    parser.add_argument("--runs", type=int, default=3, help="number of cold starts to measure")
+    args = parser.parse_args()
+
+    walls = []
+    rows = []
+    for _ in range(args.runs):
+        wall_ms, rows = run_once()
+        walls.append(wall_ms)
+    walls.sort()
+    median_ms = walls[len(walls) // 2]
+
+    top_level = sorted((r for r in rows if r[3] == 0), key=lambda r: r[2], reverse=True)
+    total_import_ms = sum(r[2] for r in top_level) / 1000
+
+    print(f"🚀 Startup wall time (median of {args.runs}): {median_ms:.0f} ms  [budget {args.budget_ms:.0f} ms]")
+    print(f"📦 Total top-level import time: {total_import_ms:.0f} ms")
+    print(f"{'cumulative ms':>14}  {'self ms':>8}  module")
+    for name, self_us, cumulative_us, _ in top_level[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f}  {self_us / 1000:>8.1f}  {name}")
+
+    failures = []
+    imported = {r[0] for r in rows}
+    eager = [name for name in LAZY_MODULES if name in imported]
+    if eager:
+        failures.append(f"imported at startup but should be lazy: {', '.join(eager)}")
+    if median_ms > args.budget_ms:
+        failures.append(f"startup {median_ms:.0f} ms exceeds budget {args.budget_ms:.0f} ms")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ Startup within budget")
+
+
+if __name__ == "__main__":
+    main()
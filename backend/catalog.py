@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Local product catalog: every successful scrape, kept for analysis instead of re-scraping
+- SQLite (CATALOG_DB, default backend/catalog.db), normalized from format_scraped_data output
+  (or a merged /api/scrape-product result): products, attributes, images and one price
+  observation per scrape
+- Products are keyed by ASIN and indexed by brand (the name out of the byline, "Visit the
+  Acme Store" -> "Acme"). Each attribute carries key_norm, its alignment.py canonical key, so
+  "Material", "Fabric" and "Material composition" are all found by one indexed lookup
+- missing("Material") lists products without an attribute, optionally for one brand;
+  with_attribute() lists the values products have for one
+- export() writes each table as Parquet when pyarrow is installed (imported only then), or as
+  CSV otherwise, in batches so large catalogs stream instead of loading into memory
+- The scrape blueprint records amz_scraper results as they are scraped (CATALOG_STORE=0 turns
+  that off); `catalog.py import FILE` loads --serve / job output
+
+Usage: python3 catalog.py import FILE.jsonl | missing KEY [--brand B] | product ASIN | stats
+       python3 catalog.py export DIR [--format parquet|csv]
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+
+import alignment
+import logs
+import serialization
+
+log = logs.get_logger("catalog")
+
+DB_PATH = os.environ.get("CATALOG_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalog.db"))
+STORE_ENABLED = os.environ.get("CATALOG_STORE", "1") != "0"
+EXPORT_BATCH_ROWS = 10000
+MISSING = ("", "N/A", None)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    asin TEXT PRIMARY KEY,
+    url TEXT,
+    title TEXT,
+    brand TEXT,
+    description TEXT,
+    bullets TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    scrapes INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS products_brand ON products (brand);
+CREATE TABLE IF NOT EXISTS attributes (
+    asin TEXT NOT NULL,
+    section TEXT NOT NULL,
+    key TEXT NOT NULL,
+    key_norm TEXT NOT NULL,
+    value TEXT,
+    PRIMARY KEY (asin, section, key)
+);
+CREATE INDEX IF NOT EXISTS attributes_key ON attributes (key_norm, asin);
+CREATE TABLE IF NOT EXISTS images (
+    asin TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    PRIMARY KEY (asin, position)
+);
+CREATE TABLE IF NOT EXISTS prices (
+    asin TEXT NOT NULL,
+    observed_at REAL NOT NULL,
+    current_price REAL,
+    list_price REAL,
+    currency TEXT,
+    current_text TEXT,
+    list_text TEXT
+);
+CREATE INDEX IF NOT EXISTS prices_asin ON prices (asin, observed_at);
+"""
+
+TABLES = ("products", "attributes", "images", "prices")
+
+_PRICE = re.compile(r'\d[\d,]*(?:\.\d+)?')
+_BYLINE = re.compile(r'^(?:Visit the (.+?) Store|Brand:\s*(.+))$')
+
+_db = None
+_db_lock = threading.Lock()
+
+
+def _connect():
+    global _db
+    if _db is None:
+        _db = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None, timeout=30)
+        _db.row_factory = sqlite3.Row
+        _db.execute("PRAGMA journal_mode=WAL")
+        _db.executescript(SCHEMA)
+    return _db
+
+
+def parse_price(text):
+    """749.0 from "₹749." / "₹1,299.00"; None when there's no number"""
+    match = _PRICE.search(str(text or ""))
+    return float(match.group().replace(",", "")) if match else None
+
+
+def _known(value):
+    return None if value in MISSING else value
+
+
+def brand_name(byline):
+    """ "Acme" from the byline text amz_scraper keeps ("Visit the Acme Store", "Brand: Acme") """
+    byline = _known(byline)
+    if byline is None:
+        return None
+    match = _BYLINE.match(byline.strip())
+    return (match.group(1) or match.group(2)).strip() if match else byline.strip()
+
+
+def store(result, url=None, observed_at=None):
+    """Record one scrape result; returns its ASIN, or None when the result has no product to store"""
+    if not isinstance(result, dict) or not result.get("success"):
+        return None
+    product = result.get("product") or {}
+    asin = _known(product.get("asin"))
+    if not asin:
+        return None
+    now = observed_at or time.time()
+    bullets = (result.get("details") or {}).get("featureBullets") or product.get("aboutThisItem") or []
+    attributes = {}
+    for label, value, section in alignment.attributes_of(result):
+        if label and label != "status":
+            attributes[(section, label)] = (alignment.canonical_key(label)[0], str(value))
+    images = [image for image in product.get("images") or [] if isinstance(image, str)]
+    pricing = result.get("pricing") or {}
+
+    with _db_lock:
+        db = _connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute(
+                "INSERT INTO products (asin, url, title, brand, description, bullets, first_seen, last_seen) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (asin) DO UPDATE SET url = excluded.url, "
+                "title = excluded.title, brand = excluded.brand, description = excluded.description, "
+                "bullets = excluded.bullets, last_seen = excluded.last_seen, scrapes = scrapes + 1",
+                (asin, url or _known(product.get("url")), _known(product.get("title")), brand_name(product.get("brand")),
+                 _known(product.get("description")), serialization.dumps(bullets), now, now))
+            # Attributes and images describe the latest scrape; prices keep every observation
+            db.execute("DELETE FROM attributes WHERE asin = ?", (asin,))
+            db.executemany("INSERT INTO attributes (asin, section, key, key_norm, value) VALUES (?, ?, ?, ?, ?)",
+                           [(asin, section, label, key_norm, value)
+                            for (section, label), (key_norm, value) in attributes.items()])
+            db.execute("DELETE FROM images WHERE asin = ?", (asin,))
+            db.executemany("INSERT INTO images (asin, position, url) VALUES (?, ?, ?)",
+                           [(asin, position, image) for position, image in enumerate(images)])
+            if pricing:
+                db.execute(
+                    "INSERT INTO prices (asin, observed_at, current_price, list_price, currency, current_text, list_text) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (asin, now, parse_price(pricing.get("current_price")), parse_price(pricing.get("list_price")),
+                     pricing.get("currency"), _known(pricing.get("current_price")), _known(pricing.get("list_price"))))
+            db.execute("COMMIT")
+        except sqlite3.Error:
+            db.execute("ROLLBACK")
+            raise
+    return asin
+
+
+def record(result, url=None):
+    """store() for the scrape path: off with CATALOG_STORE=0, and a catalog error never fails a scrape"""
+    if not STORE_ENABLED:
+        return None
+    try:
+        return store(result, url)
+    except Exception as e:  # sqlite / disk errors, and result shapes store() doesn't expect
+        log.warning("⚠️ Could not add %s to the catalog: %s", url, e)
+        return None
+
+
+# --- QUERIES ---
+
+def missing(key, brand=None, limit=1000):
+    """Products without an attribute (any alias or spelling of `key`), optionally of one brand"""
+    query = ("SELECT asin, brand, title FROM products p WHERE NOT EXISTS "
+             "(SELECT 1 FROM attributes a WHERE a.key_norm = ? AND a.asin = p.asin)")
+    args = [alignment.canonical_key(key)[0]]
+    if brand:
+        query += " AND brand = ?"
+        args.append(brand)
+    with _db_lock:
+        rows = _connect().execute(query + " ORDER BY asin LIMIT ?", args + [limit]).fetchall()
+    return [dict(row) for row in rows]
+
+
+def with_attribute(key, limit=1000):
+    """[{asin, brand, key, value}] for products that have an attribute"""
+    with _db_lock:
+        rows = _connect().execute(
+            "SELECT a.asin, p.brand, a.key, a.value FROM attributes a JOIN products p ON p.asin = a.asin "
+            "WHERE a.key_norm = ? ORDER BY a.asin LIMIT ?", (alignment.canonical_key(key)[0], limit)).fetchall()
+    return [dict(row) for row in rows]
+
+
+def product(asin):
+    """One product with its attributes, images and price history; None if it isn't in the catalog"""
+    with _db_lock:
+        db = _connect()
+        row = db.execute("SELECT * FROM products WHERE asin = ?", (asin,)).fetchone()
+        if row is None:
+            return None
+        attributes = db.execute("SELECT section, key, value FROM attributes WHERE asin = ? ORDER BY rowid", (asin,)).fetchall()
+        images = db.execute("SELECT url FROM images WHERE asin = ? ORDER BY position", (asin,)).fetchall()
+        prices = db.execute("SELECT observed_at, current_price, list_price, currency FROM prices "
+                            "WHERE asin = ? ORDER BY observed_at", (asin,)).fetchall()
+    result = dict(row)
+    result["bullets"] = json.loads(row["bullets"] or "[]")
+    result["attributes"] = [dict(attribute) for attribute in attributes]
+    result["images"] = [image["url"] for image in images]
+    result["prices"] = [dict(price) for price in prices]
+    return result
+
+
+def stats():
+    with _db_lock:
+        db = _connect()
+        return {table: db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in TABLES}
+
+
+# --- EXPORT ---
+
+def _batches(table):
+    """([(column name, declared type)], row batches) for a whole table, EXPORT_BATCH_ROWS at a time"""
+    # A separate connection, so a long export doesn't hold the lock scrapes write through
+    db = sqlite3.connect(DB_PATH)
+    columns = [(row[1], row[2]) for row in db.execute(f"PRAGMA table_info({table})")]
+    cursor = db.execute(f"SELECT {', '.join(name for name, _ in columns)} FROM {table}")
+
+    def rows():
+        try:
+            while True:
+                batch = cursor.fetchmany(EXPORT_BATCH_ROWS)
+                if not batch:
+                    return
+                yield batch
+        finally:
+            db.close()
+    return columns, rows()
+
+
+def export(directory, format=None):
+    """Write every table to directory as <table>.parquet (pyarrow) or <table>.csv; returns {table: path}"""
+    _connect()  # make sure the tables exist
+    if format is None:
+        try:
+            import pyarrow  # noqa: F401
+            format = "parquet"
+        except ImportError:
+            format = "csv"
+    if format == "parquet":
+        try:
+            import pyarrow
+            import pyarrow.parquet as parquet
+        except ImportError:
+            raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow); use format csv without it") from None
+    elif format != "csv":
+        raise ValueError(f"Unknown export format {format!r}")
+
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for table in TABLES:
+        columns, batches = _batches(table)
+        path = os.path.join(directory, f"{table}.{format}")
+        if format == "parquet":
+            # Types come from the table, not the first batch, so every batch has the same schema
+            types = {"TEXT": pyarrow.string(), "REAL": pyarrow.float64(), "INTEGER": pyarrow.int64()}
+            schema = pyarrow.schema([(name, types[declared]) for name, declared in columns])
+            with parquet.ParquetWriter(path, schema) as writer:
+                for batch in batches:
+                    writer.write_table(pyarrow.Table.from_arrays(
+                        [pyarrow.array(values, type=field.type) for values, field in zip(zip(*batch), schema)],
+                        schema=schema))
+        else:
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                out = csv.writer(f)
+                out.writerow([name for name, _ in columns])
+                for batch in batches:
+                    out.writerows(batch)
+        paths[table] = path
+    log.info("📦 Exported the catalog as %s to %s", format, directory)
+    return paths
+
+
+def import_lines(lines):
+    """Store results from JSONL (--serve output lines or bare results); returns (stored, skipped)"""
+    stored = skipped = 0
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            skipped += 1
+            continue
+        result = entry.get("result", entry) if isinstance(entry, dict) else None
+        if store(result, entry.get("url") if isinstance(entry, dict) else None):
+            stored += 1
+        else:
+            skipped += 1
+    return stored, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    load = commands.add_parser("import", help="store scrape results from a JSONL file (- for stdin)")
+    load.add_argument("file")
+    lacking = commands.add_parser("missing", help="products without an attribute")
+    lacking.add_argument("key")
+    lacking.add_argument("--brand")
+    lacking.add_argument("--limit", type=int, default=1000)
+    show = commands.add_parser("product", help="one product with attributes, images and prices")
+    show.add_argument("asin")
+    dump = commands.add_parser("export", help="write every table to a directory")
+    dump.add_argument("directory")
+    dump.add_argument("--format", choices=("parquet", "csv"))
+    commands.add_parser("stats", help="row counts per table")
+    args = parser.parse_args()
+
+    if args.command == "import":
+        if args.file == "-":
+            stored, skipped = import_lines(sys.stdin)
+        else:
+            with open(args.file, encoding="utf-8") as f:
+                stored, skipped = import_lines(f)
+        print(serialization.dumps({"stored": stored, "skipped": skipped}))
+    elif args.command == "missing":
+        print(serialization.dumps(missing(args.key, args.brand, args.limit), pretty=True))
+    elif args.command == "product":
+        print(serialization.dumps(product(args.asin), pretty=True))
+    elif args.command == "export":
+        try:
+            print(serialization.dumps(export(args.directory, args.format), pretty=True))
+        except RuntimeError as e:
+            parser.error(str(e))
+    else:
+        print(serialization.dumps(stats(), pretty=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Text cleaners shared by the scrapers and the extraction engine
+- Fix the letter-dropping corruption Amazon's detail sections come with
+- Normalize keys/values of detail bullets and spec tables
+- Every regex is compiled once at import
+- fix_text_corruption / clean_key / clean_value are memoized per process: the same few hundred
+  labels and short values repeat on every page, so a repeat is a dict lookup instead of ~40
+  regex passes. Bounded (CLEANER_MEMO_SIZE entries per cleaner, text up to MEMO_MAX_LENGTH
+  characters); hit rates are in the cache_hits / cache_misses metrics; CLEANER_MEMO=0 turns it off
+- preseed() fills the memos from cleaner_seed.json (labels seen in the benchmark corpus,
+  regenerate with benchmarks/cleaner_seed.py)
+"""
+
+import json
+import os
+import re
+import threading
+
+import metrics
+
+MEMO_ENABLED = os.environ.get("CLEANER_MEMO", "1") != "0"
+MEMO_SIZE = int(os.environ.get("CLEANER_MEMO_SIZE", "4096"))
+# Longer text (descriptions, bullets) rarely repeats, so it is cleaned without the memo
+MEMO_MAX_LENGTH = 200
+SEED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cleaner_seed.json")
+
+# Comprehensive corruption fixes - covers ALL patterns (applied in this order)
+_CORRUPTION_FIXES = [(re.compile(pattern, re.IGNORECASE), fixed) for pattern, fixed in (
+    # Word-level fixes with space issues
+    (r'\bP\s*o\s*duct\b', 'Product'),
+    (r'\bDi\s*m?\s*ensions\b', 'Dimensions'),
+    (r'\bDate\s+Fi\s*r?\s*st\b', 'Date First'),
+    (r'\bAvai\s*l?\s*ab\s*l?\s*e\b', 'Available'),
+    (r'\bManufactu\s*e\b', 'Manufacturer'),
+    (r'\bIte\s*m?\s*\b', 'Item '),
+    (r'\bMode\s*l?\s*nNu\s*m?\s*be\s*r?\b', 'Model Number'),
+    (r'\bMode\s+l\b', 'Model'),
+    (r'\bNu\s*m?\s*be\s*r?\b', 'Number'),
+    (r'\bDepa\s*r?\s*t\s*m?\s*ent\b', 'Department'),
+    (r'\bPacke\s*r?\b', 'Packer'),
+    (r'\bI\s*m?\s*po\s*r?\s*te\s*r?\b', 'Importer'),
+    (r'\bGene\s*r?\s*ic\s+Na\s*m?\s*e\b', 'Generic Name'),
+    (r'\bBest\s+Se\s*l?\s*e\s*r?\s*s\s+Rank\b', 'Best Sellers Rank'),
+    (r'\bCusto\s*m?\s*e\s*r?\s+Reviews\b', 'Customer Reviews'),
+    (r'\bSe\s*l?\s*e\s*r?\s*s\b', 'Sellers'),
+
+    # Compound word fixes
+    (r'\bDi\s+Di\s+ensions\b', 'Dimensions'),
+    (r'\bIte\s+Mode\s+nNu\s+be\b', 'Item Model Number'),
+    (r'\bIte\s+Weight\b', 'Item Weight'),
+    (r'\bIte\s+Di\s+Di\s+ensions\b', 'Item Dimensions'),
+
+    # Single letter/syllable fixes
+    (r'\bens\b', 'Mens'),
+    (r'\bW\s*e?\s*ight\b', 'Weight'),
+    (r'\bNam\s*e?\b', 'Name'),
+    (r'\bR\s*a?\s*nk\b', 'Rank'),
+
+    # Common partial word corruption (a word missing its first letter; whole words are left alone)
+    (r'\bodel\s+nu', 'Model Nu'),
+    (r'\bensions', 'Dimensions'),
+    (r'\bepartm', 'Departm'),
+    (r'\bmport', 'Import'),
+    (r'\banufact', 'Manufact'),
+)]
+
+_WHITESPACE = re.compile(r'\s+')
+_DIRECTION_MARKS = re.compile(r'[\u200e\u200f]')
+# The LRM / RLM marks, as characters or as the &lrm; / &rlm; entities (never the letters r, l, m)
+_KEY_MARKS = re.compile(r'(?:[\u200f\u200e]|&(?:lrm|rlm);)+')
+_KEY_COLON = re.compile(r'\s*:\s*$')
+_VALUE_LEADING = re.compile(r'^(?:[:\s\u200f\u200e]|&(?:lrm|rlm);)+')
+_VALUE_TRAILING = re.compile(r'(?:[:\s\u200f\u200e]|&(?:lrm|rlm);)+$')
+
+# Keys dropped from every amz_scraper section (manufacturing keys have their own section)
+EXCLUDED_KEYWORDS = [
+    'best sellers rank',
+    'best seller rank',
+    'customer reviews',
+    'customer review',
+    'manufacturer',
+    'packer',
+    'importer',
+    'asin'  # ASIN handled separately
+]
+
+
+class _Memo:
+    """Bounded raw text -> cleaned text map in front of a pure cleaner; oldest entries go first"""
+
+    def __init__(self, name, clean, size=MEMO_SIZE):
+        self.name = name
+        self.clean = clean
+        self.size = size
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, text):
+        if not MEMO_ENABLED or not text or len(text) > MEMO_MAX_LENGTH:
+            return self.clean(text)
+        cleaned = self._cache.get(text)
+        metrics.record_cache(self.name, cleaned is not None)
+        if cleaned is None:
+            cleaned = self.seed(text)
+        return cleaned
+
+    def seed(self, text):
+        """Clean and remember text without counting a lookup"""
+        cleaned = self.clean(text)
+        with self._lock:
+            while len(self._cache) >= self.size:
+                del self._cache[next(iter(self._cache))]
+            self._cache[text] = cleaned
+        return cleaned
+
+    def __len__(self):
+        return len(self._cache)
+
+    def keys(self):
+        return list(self._cache)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+def _fix_text_corruption(text):
+    """Fix ALL text corruption issues comprehensively"""
+    if not text:
+        return text
+
+    for corrupted, fixed in _CORRUPTION_FIXES:
+        text = corrupted.sub(fixed, text)
+
+    # Remove extra spaces between words
+    text = _WHITESPACE.sub(' ', text)
+
+    return text.strip()
+
+
+def safe_extract(element, default="N/A"):
+    """Safely extract text from BeautifulSoup element"""
+    if element:
+        text = element.get_text(strip=True)
+        # Fix text corruption in extracted text
+        text = fix_text_corruption(text)
+        return text if text else default
+    return default
+
+
+def _clean_key(key):
+    """Clean key by removing special characters and fixing text corruption"""
+    if not key:
+        return key
+
+    # First, fix text corruption
+    key = _fix_text_corruption(key)
+
+    # Remove special characters
+    key = _KEY_MARKS.sub('', key)
+    key = _KEY_COLON.sub('', key)
+
+    # Clean up whitespace
+    key = _WHITESPACE.sub(' ', key).strip()
+
+    return key
+
+
+def _clean_value(value):
+    """Clean value text"""
+    if not value:
+        return value
+
+    # Fix text corruption
+    value = _fix_text_corruption(value)
+
+    # Remove special characters
+    value = _VALUE_LEADING.sub('', value)
+    value = _VALUE_TRAILING.sub('', value)
+
+    return value.strip()
+
+
+fix_text_corruption = _Memo("fix_text_corruption", _fix_text_corruption)
+clean_key = _Memo("clean_key", _clean_key)
+clean_value = _Memo("clean_value", _clean_value)
+MEMOS = (fix_text_corruption, clean_key, clean_value)
+
+
+def preseed(path=SEED_PATH):
+    """Clean every seeded string once so its first page is already a hit; returns entries added"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            seed = json.load(f)
+    except (OSError, ValueError):
+        return 0
+    before = sum(len(memo) for memo in MEMOS)
+    for memo in MEMOS:
+        for text in seed.get(memo.name, []):
+            if text and len(text) <= MEMO_MAX_LENGTH:
+                memo.seed(text)
+    return sum(len(memo) for memo in MEMOS) - before
+
+
+def should_exclude_key(key):
+    """Check if key should be excluded from all sections"""
+    if not key:
+        return True
+
+    key_lower = key.lower()
+    return any(excluded in key_lower for excluded in EXCLUDED_KEYWORDS)
+
+
+def normalize_spaces(text):
+    """Collapse whitespace and drop the LRM/RLM marks (scraper.py bullets)"""
+    return _DIRECTION_MARKS.sub('', _WHITESPACE.sub(' ', text))
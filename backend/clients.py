@@ -0,0 +1,165 @@
+"""
+Lazy Google client accessors for the Python server
+- Nothing heavy (genai, GCS, gspread) is imported until a client is first used
+- Every accessor is thread-safe and builds its client exactly once
+- warm_up() can build clients ahead of the first request
+"""
+
+import os
+import threading
+
+import logs
+
+log = logs.get_logger("clients")
+
+TEXT_MODEL_ID = "gemini-2.5-flash"
+IMAGE_MODEL_ID = "gemini-2.5-flash-image-preview"
+
+GCS_BUCKET_NAME = "amz-image-stores"
+
+SHEET_SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive"
+]
+
+
+class LazyClient:
+    """Build a client on first access and cache it for the process lifetime"""
+
+    def __init__(self, name, factory):
+        self.name = name
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._value = None
+        self._ready = False
+
+    @property
+    def initialized(self):
+        return self._ready
+
+    def get(self):
+        # Fast path without the lock once the client exists
+        if self._ready:
+            return self._value
+        with self._lock:
+            if not self._ready:
+                self._value = self._factory()
+                self._ready = True
+        return self._value
+
+    def reset(self):
+        with self._lock:
+            self._value = None
+            self._ready = False
+
+
+def _configure_genai():
+    import google.generativeai as genai
+
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        raise ValueError("Gemini API Key (GOOGLE_API_KEY) missing in .env file")
+    genai.configure(api_key=api_key)
+    return genai
+
+
+def _build_text_model():
+    try:
+        model = genai_module().GenerativeModel(TEXT_MODEL_ID)
+        log.info("✓ Gemini Text model initialized: %s", TEXT_MODEL_ID)
+        return model
+    except Exception as e:
+        log.error("✗ Text model initialization error: %s", e)
+        raise
+
+
+def _build_image_model():
+    try:
+        model = genai_module().GenerativeModel(IMAGE_MODEL_ID)
+        log.info("✓ Gemini Image model initialized: %s", IMAGE_MODEL_ID)
+        return model
+    except Exception as e:
+        log.error("✗ Image model initialization error: %s", e)
+        raise
+
+
+def _build_storage_client():
+    try:
+        from google.cloud import storage
+
+        client = storage.Client()
+        log.info("✓ Google Cloud Storage client initialized.")
+        return client
+    except Exception as e:
+        log.error("✗ GCS client initialization error: %s", e)
+        return None  # Fail gracefully, uploads are skipped
+
+
+def _build_sheets_client():
+    import gspread
+    from google.oauth2.service_account import Credentials
+
+    import metrics
+
+    creds = Credentials.from_service_account_file("service_account.json", scopes=SHEET_SCOPES)
+    with metrics.SHEETS_CALL_SECONDS.time(operation="authorize"):
+        return gspread.authorize(creds)
+
+
+_genai = LazyClient("genai", _configure_genai)
+_text_model = LazyClient("text_model", _build_text_model)
+_image_model = LazyClient("image_model", _build_image_model)
+_storage_client = LazyClient("storage_client", _build_storage_client)
+_sheets_client = LazyClient("sheets_client", _build_sheets_client)
+
+CLIENTS = {
+    client.name: client
+    for client in (_genai, _text_model, _image_model, _storage_client, _sheets_client)
+}
+
+
+def genai_module():
+    """Configured google.generativeai module"""
+    return _genai.get()
+
+
+def get_text_model():
+    return _text_model.get()
+
+
+def get_image_model():
+    return _image_model.get()
+
+
+def get_storage_client():
+    """GCS client, or None when credentials are unavailable"""
+    return _storage_client.get()
+
+
+def get_sheets_client():
+    """Authorized gspread client; raises if service_account.json is unusable"""
+    return _sheets_client.get()
+
+
+def warm_up(names=None, background=True):
+    """
+    Build clients ahead of the first request.
+    Failures are reported but never raised, so a missing credential
+    cannot stop the server from starting.
+    """
+    selected = [CLIENTS[name] for name in (names or CLIENTS)]
+
+    def run():
+        for client in selected:
+            try:
+                client.get()
+            except Exception as e:
+                log.warning("⚠️ Warm-up failed for %s: %s", client.name, e)
+
+    if not background:
+        run()
+        return None
+
+    thread = threading.Thread(target=run, name="client-warmup", daemon=True)
+    thread.start()
+    return thread
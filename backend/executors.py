@@ -0,0 +1,139 @@
+"""
+Per-subsystem worker pools with admission control
+- Each blueprint runs its views on its own bounded thread pool
+- When a pool's workers and queue are full the request is rejected with 429 + Retry-After
+  instead of waiting, so a burst on one subsystem never ties up the others
+"""
+
+import contextvars
+import functools
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import jsonify
+
+# (workers, queued requests) per subsystem, overridable with e.g. IMAGE_WORKERS / IMAGE_QUEUE
+POOL_SIZES = {
+    "auth": (8, 32),
+    "image": (2, 4),
+    "text": (4, 16),
+    "scrape": (4, 8),
+    "sheets": (4, 32),
+    "align": (2, 16),
+    "monitor": (2, 16),
+    "jobs": (4, 32),
+}
+
+
+class BoundedExecutor:
+    """Thread pool that refuses work instead of queueing without limit"""
+
+    def __init__(self, name, max_workers, max_queue):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-pool")
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._avg_seconds = 1.0  # EWMA of job duration, seeds Retry-After
+
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+    def try_submit(self, fn, *args, **kwargs):
+        """Return a Future, or None when the pool is at capacity"""
+        if not self._slots.acquire(blocking=False):
+            return None
+        with self._lock:
+            self._in_flight += 1
+
+        def run():
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self._in_flight -= 1
+                    self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * elapsed
+                self._slots.release()
+
+        try:
+            # Carry contextvars into the worker thread: Flask's request/g and the current trace span.
+            # The request context stays owned (and torn down) by the calling thread.
+            return self._executor.submit(contextvars.copy_context().run, run)
+        except Exception:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+            raise
+
+    def retry_after(self):
+        """Seconds until a slot is likely to free up"""
+        with self._lock:
+            waves = max(1, self._in_flight) / self.max_workers
+            return max(1, math.ceil(waves * self._avg_seconds))
+
+    def stats(self):
+        return {
+            "workers": self.max_workers,
+            "queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "avg_seconds": round(self._avg_seconds, 3),
+        }
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(name):
+    """Process-wide pool for a subsystem, created on first use"""
+    pool = _pools.get(name)
+    if pool:
+        return pool
+    with _pools_lock:
+        if name not in _pools:
+            workers, queue = POOL_SIZES[name]
+            workers = int(os.getenv(f"{name.upper()}_WORKERS", workers))
+            queue = int(os.getenv(f"{name.upper()}_QUEUE", queue))
+            _pools[name] = BoundedExecutor(name, workers, queue)
+        return _pools[name]
+
+
+def pool_stats():
+    return {name: pool.stats() for name, pool in _pools.items()}
+
+
+def overloaded_response(pool):
+    retry_after = pool.retry_after()
+    resp = jsonify({
+        "success": False,
+        "error": f"Server busy ({pool.name}). Please retry in {retry_after}s.",
+        "retry_after": retry_after
+    })
+    resp.status_code = 429
+    resp.headers["Retry-After"] = str(retry_after)
+    return resp
+
+
+def run_in_pool(name):
+    """Decorator: run a Flask view on the named subsystem pool"""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            pool = get_pool(name)
+            future = pool.try_submit(view, *args, **kwargs)
+            if future is None:
+                return overloaded_response(pool)
+            return future.result()
+        return wrapper
+    return decorator
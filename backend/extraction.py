@@ -0,0 +1,363 @@
+"""
+Declarative extraction engine shared by scraper.py and amz_scraper.py
+- A FieldSpec names the page regions it reads, an extractor, fallbacks tried in order
+  while the value is still empty, and a cleaner
+- Regions are located in ONE walk of the parsed tree; Derived values (parsed detail rows,
+  headings, ...) are computed at most once per page and shared between fields
+- compile_plan() resolves all of this once per process into a Plan;
+  Plan.run() executes it per page and times every field into PARSE_SECONDS
+- Pages are parsed restricted to the plan's allowlist (its regions plus the leftmost part of
+  every CSS selector it uses), so reviews, carousels and ads never become tree nodes.
+  RESTRICT_PARSE=0 parses whole pages; beautifulsoup4 < 4.13 always does
+"""
+
+import os
+import re
+
+from bs4 import BeautifulSoup
+
+import metrics
+
+try:
+    from bs4.filter import ElementFilter
+except ImportError:  # beautifulsoup4 < 4.13 has no parse-time tag filter
+    ElementFilter = None
+
+RESTRICT_PARSE = os.environ.get("RESTRICT_PARSE", "1") != "0"
+
+
+def is_empty(value):
+    """Default emptiness test that decides whether a field's fallbacks run"""
+    return value is None or value == "N/A" or (isinstance(value, (list, dict, str)) and not value)
+
+
+class Region:
+    """
+    A part of the page found during the tree walk.
+    Matches on tag name, exact id, id pattern and/or attribute presence;
+    many=True collects every match in document order, otherwise the first match is kept.
+    """
+
+    def __init__(self, name, tag=None, id=None, id_pattern=None, attr=None, many=False):
+        if id is None and id_pattern is None and attr is None and (tag is None or not many):
+            raise ValueError(f"Region {name!r} needs an id, id_pattern, attr or tag with many=True")
+        self.name = name
+        self.tag = tag
+        self.id = id
+        self.id_pattern = re.compile(id_pattern) if id_pattern else None
+        self.attr = attr
+        self.many = many
+
+    def matches(self, tag):
+        if self.tag is not None and tag.name != self.tag:
+            return False
+        if self.attr is not None and self.attr not in tag.attrs:
+            return False
+        if self.id_pattern is not None:
+            ident = tag.get("id")
+            return ident is not None and self.id_pattern.search(ident) is not None
+        return True
+
+
+class Derived:
+    """A value computed from regions (or other derived values) once per page"""
+
+    def __init__(self, name, compute, regions=(), derived=()):
+        self.name = name
+        self.compute = compute
+        self.regions = tuple(regions)
+        self.derived = tuple(derived)
+
+
+class FieldSpec:
+    """
+    One output field.
+    extract(page) produces the value; each fallback(page) runs while
+    empty(value) holds; clean(value) post-processes; default replaces a still-empty value.
+    needs lists fields whose values this one reads from page.values.
+    """
+
+    def __init__(self, name, extract, regions=(), derived=(), fallbacks=(), clean=None,
+                 default=None, empty=is_empty, needs=(), selectors=()):
+        self.name = name
+        self.extract = extract
+        self.regions = tuple(regions)
+        self.derived = tuple(derived)
+        self.fallbacks = tuple(fallbacks)
+        # CSS selectors the extractor/fallbacks pass to page.select_one (text_of ones are found automatically)
+        self.selectors = tuple(selectors)
+        self.clean = clean
+        self.default = default
+        self.empty = empty
+        self.needs = tuple(needs)
+
+    def run(self, page):
+        value = self.extract(page)
+        for fallback in self.fallbacks:
+            if not self.empty(value):
+                break
+            value = fallback(page)
+        if self.clean is not None:
+            value = self.clean(value)
+        if self.default is not None and self.empty(value):
+            value = self.default() if callable(self.default) else self.default
+        return value
+
+
+class Page:
+    """Everything a field can read: located regions, derived values and earlier fields"""
+
+    def __init__(self, plan, html, url, soup, regions):
+        self.plan = plan
+        self.html = html
+        self.url = url
+        self.soup = soup
+        self.values = {}
+        self._regions = regions
+        self._derived = {}
+        self._selected = {}
+
+    def region(self, name):
+        return self._regions[name]
+
+    def derived(self, name):
+        if name not in self._derived:
+            self._derived[name] = self.plan.derived[name].compute(self)
+        return self._derived[name]
+
+    def select_one(self, selector):
+        """Whole-page CSS lookup, memoized so shared selectors are evaluated once"""
+        if selector not in self._selected:
+            self._selected[selector] = self.soup.select_one(selector)
+        return self._selected[selector]
+
+
+def lookup(page, locator):
+    """Region -> its located element(s); CSS selector string -> first match on the page"""
+    if isinstance(locator, Region):
+        return page.region(locator.name)
+    return page.select_one(locator)
+
+
+def text_of(locator, get_text):
+    """Extractor/fallback returning get_text(element) for a locator, or None when absent"""
+    def extract(page):
+        element = lookup(page, locator)
+        return get_text(element) if element else None
+    extract.locator = locator
+    return extract
+
+
+_SELECTOR_ID = re.compile(r"#([\w-]+)")
+_SELECTOR_CLASS = re.compile(r"\.([\w-]+)")
+_SELECTOR_TAG = re.compile(r"[a-zA-Z][\w-]*")
+
+
+class Allowlist:
+    """
+    Tags that start a kept subtree when a page is parsed.
+    Every region is kept whole; for a CSS selector its leftmost compound is kept
+    (by id, else its last and usually most specific class, else tag), which holds every
+    descendant the selector can match.
+    """
+
+    def __init__(self, regions, selectors):
+        self.ids, self.tags, self.attrs, self.classes = set(), set(), set(), set()
+        self.id_patterns = []
+        for region in regions:
+            if region.id is not None:
+                self.ids.add(region.id)
+            elif region.id_pattern is not None:
+                self.id_patterns.append(region.id_pattern)
+            elif region.attr is not None:
+                self.attrs.add(region.attr)
+            else:
+                self.tags.add(region.tag)
+        for selector in selectors:
+            leftmost = selector.split()[0]
+            ident, classes, tag = _SELECTOR_ID.search(leftmost), _SELECTOR_CLASS.findall(leftmost), _SELECTOR_TAG.match(leftmost)
+            if ident:
+                self.ids.add(ident.group(1))
+            elif classes:
+                self.classes.add(classes[-1])
+            elif tag:
+                self.tags.add(tag.group(0))
+            else:
+                raise ValueError(f"Can't tell which part of the page selector {selector!r} needs")
+
+    def allows(self, name, attrs):
+        if name in self.tags:
+            return True
+        if not attrs:
+            return False
+        ident = attrs.get("id")
+        if ident is not None and (ident in self.ids or any(p.search(ident) for p in self.id_patterns)):
+            return True
+        if any(attr in attrs for attr in self.attrs):
+            return True
+        classes = attrs.get("class")
+        return bool(classes and self.classes and not self.classes.isdisjoint(classes.split()))
+
+    def parse_filter(self):
+        """A bs4 parse_only filter for this allowlist, or None when bs4 can't filter at parse time"""
+        if ElementFilter is None:
+            return None
+        return _ParseFilter(self)
+
+
+if ElementFilter is not None:
+    class _ParseFilter(ElementFilter):
+        def __init__(self, allowlist):
+            super().__init__()
+            self.allowlist = allowlist
+
+        def allow_tag_creation(self, nsprefix, name, attrs):
+            return self.allowlist.allows(name, attrs)
+
+        def allow_string_creation(self, string):
+            return False  # text outside every kept subtree
+
+
+class Plan:
+    """A compiled field spec: which regions to locate and in what order to run fields"""
+
+    def __init__(self, name, fields, regions, derived, selectors=()):
+        self.name = name
+        self.fields = fields
+        self.regions = regions
+        self.derived = derived
+        self.allowlist = Allowlist(regions, selectors)
+        self._parse_filter = self.allowlist.parse_filter()
+
+        # Lookup tables for the single tree walk
+        self._by_id = {}
+        self._by_tag = {}
+        self._scanned = []
+        for region in regions:
+            if region.id is not None:
+                self._by_id.setdefault(region.id, []).append(region)
+            elif region.id_pattern is None and region.attr is None:
+                self._by_tag.setdefault(region.tag, []).append(region)
+            else:
+                self._scanned.append(region)
+
+    def parse(self, html):
+        """Parse a page, restricted to the allowlist unless RESTRICT_PARSE is off"""
+        if RESTRICT_PARSE and self._parse_filter is not None:
+            return BeautifulSoup(html, "html.parser", parse_only=self._parse_filter)
+        return BeautifulSoup(html, "html.parser")
+
+    def locate(self, soup):
+        """Find every declared region in one pass over the tree"""
+        found = {region.name: [] if region.many else None for region in self.regions}
+        by_id, by_tag, scanned = self._by_id, self._by_tag, self._scanned
+
+        tags = soup.find_all(True)
+        metrics.PARSE_NODES.observe(len(tags), scraper=self.name)
+        for tag in tags:
+            ident = tag.get("id")
+            if ident is not None and ident in by_id:
+                for region in by_id[ident]:
+                    if region.matches(tag):
+                        if region.many:
+                            found[region.name].append(tag)
+                        elif found[region.name] is None:
+                            found[region.name] = tag
+            for region in by_tag.get(tag.name, ()):
+                found[region.name].append(tag)
+            for region in scanned:
+                if region.matches(tag):
+                    if region.many:
+                        found[region.name].append(tag)
+                    elif found[region.name] is None:
+                        found[region.name] = tag
+        return found
+
+    def run(self, html, url, soup=None):
+        """Extract every field from one page; returns {field name: value}"""
+        stopwatch = metrics.Stopwatch(metrics.PARSE_SECONDS, "extractor", scraper=self.name)
+        if soup is None:
+            soup = self.parse(html)
+            stopwatch.lap("soup")
+        page = Page(self, html, url, soup, self.locate(soup))
+        stopwatch.lap("regions")
+
+        for field in self.fields:
+            page.values[field.name] = field.run(page)
+            stopwatch.lap(field.name)
+        return page.values
+
+
+def compile_plan(name, fields):
+    """
+    Validate a field spec and resolve the regions and derived values it needs.
+    Raises ValueError for unknown names or a field that needs a later field.
+    """
+    regions, derived, selectors = {}, {}, []
+    seen_fields = set()
+
+    def add_regions(owner, wanted):
+        for region in wanted:
+            if not isinstance(region, Region):
+                raise ValueError(f"{owner}: regions must be Region objects, got {region!r}")
+            existing = regions.get(region.name)
+            if existing is not None and existing is not region:
+                raise ValueError(f"{owner}: two different regions are named {region.name!r}")
+            regions[region.name] = region
+
+    def add_derived(owner, wanted):
+        for item in wanted:
+            if not isinstance(item, Derived):
+                raise ValueError(f"{owner}: derived must be Derived objects, got {item!r}")
+            if item.name not in derived:
+                add_regions(item.name, item.regions)
+                add_derived(item.name, item.derived)
+                derived[item.name] = item
+
+    for field in fields:
+        missing = [need for need in field.needs if need not in seen_fields]
+        if missing:
+            raise ValueError(f"{field.name}: needs {missing} which must come earlier in the spec")
+        add_regions(field.name, field.regions)
+        add_derived(field.name, field.derived)
+        selectors.extend(field.selectors)
+        for step in (field.extract,) + field.fallbacks:
+            locator = getattr(step, "locator", None)
+            if isinstance(locator, Region):
+                add_regions(field.name, [locator])
+            elif isinstance(locator, str):
+                selectors.append(locator)
+        seen_fields.add(field.name)
+
+    return Plan(name, list(fields), list(regions.values()), derived, selectors)
+
+
+# --- REGIONS ---
+# Page areas the scrapers read, shared so both specs name them the same way
+
+PRODUCT_TITLE = Region("product_title", id="productTitle")
+PRODUCT_TITLE_SPAN = Region("product_title_span", tag="span", id="productTitle")
+TITLE_H1 = Region("title_h1", tag="h1", id="title")
+HEADINGS = Region("headings", tag="h1", many=True)
+BYLINE_LINK = Region("byline_link", tag="a", id="bylineInfo")
+BYLINE = Region("byline", id="bylineInfo")
+BRAND = Region("brand", id="brand")
+
+FEATURE_BULLETS = Region("feature_bullets", tag="div", id="feature-bullets")
+FACTS_EXPANDER = Region("facts_expander", tag="div", id="productFactsDesktopExpander")
+PRODUCT_DESCRIPTION = Region("product_description", id="productDescription")
+PRODUCT_DESCRIPTION_DIV = Region("product_description_div", tag="div", id="productDescription")
+DESCRIPTION_AND_DETAILS = Region("description_and_details", tag="div", id="descriptionAndDetails")
+DESCRIPTION_FEATURE_DIV = Region("description_feature_div", tag="div", id="productDescription_feature_div")
+
+DETAIL_BULLETS = Region("detail_bullets", tag="div", id="detailBullets_feature_div")
+DETAIL_BULLETS_WRAPPER = Region("detail_bullets_wrapper", tag="div", id="detailBulletsWrapper_feature_div")
+TECH_SPEC_TABLE = Region("tech_spec_table", tag="table", id="productDetails_techSpec_section_1")
+TECH_SPEC_SECTIONS = Region("tech_spec_sections", tag="div", id_pattern=r"productDetails_techSpec_section_\d+", many=True)
+
+LANDING_IMAGE = Region("landing_image", tag="img", id="landingImage")
+IMAGE_BLOCK = Region("image_block", tag="div", id="imageBlock")
+DYNAMIC_IMAGES = Region("dynamic_images", attr="data-a-dynamic-image", many=True)
+SCRIPTS = Region("scripts", tag="script", many=True)
+IMAGES = Region("images", tag="img", many=True)
+LISTS = Region("lists", tag="ul", many=True)
@@ -0,0 +1,224 @@
+"""
+Page fetch that can stop reading once the wanted sections have arrived
+- The body is streamed in chunks and fed to an incremental HTMLParser that notes when each
+  wanted element (by id) and each image <script> has closed
+- Reading stops as soon as every wanted section is complete, or when a tail landmark
+  (reviews, carousels, footer) opens while no wanted section is still open
+- A page that satisfies neither rule is read to the end, i.e. a full download
+- The body is decoded exactly once, with the charset from the Content-Type header or the page's
+  <meta charset> (never a statistical guess), and br is only advertised when it can be decoded
+"""
+
+import codecs
+import re
+from html.parser import HTMLParser
+
+import requests
+
+import logs
+import metrics
+
+# urllib3 only decodes Content-Encoding: br when one of the brotli packages is importable
+try:
+    import brotli  # noqa: F401
+    HAS_BROTLI = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        HAS_BROTLI = True
+    except ImportError:
+        HAS_BROTLI = False
+
+log = logs.get_logger("fetcher")
+
+CHUNK_SIZE = 16 * 1024
+
+# Never ask for an encoding the response can't be decoded from (the body would arrive as br bytes)
+ACCEPT_ENCODING = "gzip, deflate, br" if HAS_BROTLI else "gzip, deflate"
+
+# Amazon pages are UTF-8; used when neither the header nor the page names a charset
+DEFAULT_CHARSET = "utf-8"
+# How far into the body a <meta charset> is looked for (the HTML spec says within 1024 bytes)
+SNIFF_BYTES = 4096
+
+# Text only Amazon's robot-check page contains
+CAPTCHA_MARKERS = ("api-services-support@amazon.com", "Type the characters you see in this image")
+
+_META_CHARSET = re.compile(rb"""<meta\s[^>]*?charset\s*=\s*["']?\s*([\w.:-]+)""", re.IGNORECASE)
+
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+
+class Sections:
+    """
+    What a streaming fetch waits for.
+    ids: elements that must have closed; scripts: markers of <script> blocks that must have closed;
+    tail: id prefixes of page areas after everything wanted (anything not seen by then is absent).
+    """
+
+    def __init__(self, ids=(), scripts=(), tail=()):
+        self.ids = frozenset(ids)
+        self.scripts = tuple(scripts)
+        self.tail = tuple(tail)
+
+
+class SectionTracker(HTMLParser):
+    """Incremental parser that only tracks which wanted sections have opened and closed"""
+
+    def __init__(self, sections):
+        super().__init__(convert_charrefs=False)
+        self.sections = sections
+        self.complete = set()
+        self.open = {}  # id -> [tag name, nesting depth of that tag]
+        self.scripts_done = not sections.scripts
+        self.reached_tail = False
+        self._in_script = False
+        self._script_matched = False
+        self._carry = ""
+
+    @property
+    def done(self):
+        wants_any = self.sections.ids or self.sections.scripts
+        if wants_any and self.scripts_done and self.complete >= self.sections.ids:
+            return True
+        return self.reached_tail and not self.open
+
+    def handle_starttag(self, tag, attrs):
+        for state in self.open.values():
+            if state[0] == tag:
+                state[1] += 1
+
+        if tag == "script":
+            self._in_script, self._script_matched, self._carry = True, False, ""
+
+        ident = dict(attrs).get("id")
+        if not ident:
+            return
+        if ident in self.sections.ids and ident not in self.complete and ident not in self.open:
+            if tag in VOID_TAGS:
+                self.complete.add(ident)
+            else:
+                self.open[ident] = [tag, 1]
+        if not self.reached_tail and ident.startswith(self.sections.tail):
+            self.reached_tail = True
+
+    def handle_startendtag(self, tag, attrs):
+        ident = dict(attrs).get("id")
+        if ident in self.sections.ids:
+            self.complete.add(ident)
+        if ident and not self.reached_tail and ident.startswith(self.sections.tail):
+            self.reached_tail = True
+
+    def handle_endtag(self, tag):
+        if tag == "script" and self._in_script:
+            self._in_script = False
+            if self._script_matched:
+                self.scripts_done = True
+        for ident, state in list(self.open.items()):
+            if state[0] == tag:
+                state[1] -= 1
+                if state[1] == 0:
+                    del self.open[ident]
+                    self.complete.add(ident)
+
+    def handle_data(self, data):
+        if not self._in_script or self._script_matched:
+            return
+        # Script text can arrive in pieces; keep a tail so a marker split across them still matches
+        text = self._carry + data
+        if any(marker in text for marker in self.sections.scripts):
+            self._script_matched = True
+        self._carry = text[-64:]
+
+
+def _codec(name):
+    """Python's name for a charset label, or None if there is no such codec"""
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+
+def charset_of(content_type, head):
+    """
+    Charset to decode a body with: the Content-Type charset, else a byte-order mark or
+    <meta charset> / http-equiv in `head` (the first bytes of the body), else UTF-8
+    """
+    for param in (content_type or "").split(";")[1:]:
+        key, _, value = param.partition("=")
+        if key.strip().lower() == "charset":
+            charset = _codec(value.strip().strip("\"'"))
+            if charset:
+                return charset
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    match = _META_CHARSET.search(head[:SNIFF_BYTES])
+    if match:
+        charset = _codec(match.group(1).decode("ascii"))
+        if charset:
+            return charset
+    return DEFAULT_CHARSET
+
+
+def is_captcha(text):
+    """Amazon's robot-check page instead of the product"""
+    return any(marker in text for marker in CAPTCHA_MARKERS)
+
+
+class Fetched:
+    """The parts of a response the scrapers use"""
+
+    def __init__(self, status_code, text, bytes_read, stopped_early, encoding=DEFAULT_CHARSET):
+        self.status_code = status_code
+        self.text = text
+        self.bytes_read = bytes_read
+        self.stopped_early = stopped_early
+        self.encoding = encoding
+
+
+def get(url, headers=None, timeout=None, sections=None, scraper="fetcher", chunk_size=CHUNK_SIZE, session=None):
+    """
+    GET a page, reading it only as far as `sections` needs (None reads everything).
+    Pass a requests.Session to send its cookies. Raises the same requests exceptions as requests.get.
+    """
+    response = (session or requests).get(url, headers=headers, timeout=timeout, stream=True)
+    content_type = response.headers.get("Content-Type")
+    try:
+        if sections is None or response.status_code != 200:
+            body = response.content
+            encoding = charset_of(content_type, body[:SNIFF_BYTES])
+            return Fetched(response.status_code, body.decode(encoding, errors="replace"), len(body), False, encoding)
+
+        tracker = SectionTracker(sections)
+        decoder, encoding = None, None
+        pieces, bytes_read, stopped_early = [], 0, False
+
+        for chunk in response.iter_content(chunk_size):
+            if decoder is None:
+                encoding = charset_of(content_type, chunk[:SNIFF_BYTES])
+                decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+            bytes_read += len(chunk)
+            text = decoder.decode(chunk)
+            pieces.append(text)
+            if tracker is None:
+                continue
+            try:
+                tracker.feed(text)
+            except Exception as e:
+                log.warning("⚠️ Section tracking failed, reading the full page: %s", e)
+                tracker = None
+                continue
+            if tracker.done:
+                stopped_early = True
+                break
+        if decoder is None:
+            encoding = charset_of(content_type, b"")
+        else:
+            pieces.append(decoder.decode(b"", final=True))
+    finally:
+        response.close()
+
+    metrics.STREAM_FETCHES.inc(scraper=scraper, outcome="early" if stopped_early else "full")
+    if stopped_early:
+        log.info("✂️ Stopped reading after %d KiB, all wanted sections received", bytes_read // 1024)
+    return Fetched(response.status_code, "".join(pieces), bytes_read, stopped_early, encoding)
@@ -0,0 +1,230 @@
+"""
+Product image data embedded in Amazon's inline scripts
+- The colorImages 'initial' and imageGalleryData arrays are located once per script and
+  decoded with json (at most MAX_BLOCK_CHARS); only the text around them is regex-scanned
+- Every lookup returns URLs in the same order a regex over the whole script would
+- Size-code rewrites to the 1500px rendition are one compiled substitution each
+"""
+
+import json
+import re
+
+# Upper bound on the JSON decoded per block; a longer (or malformed) array is regex-scanned instead
+MAX_BLOCK_CHARS = 2_000_000
+
+MEDIA_PREFIX = "https://m.media-amazon.com/images/I/"
+
+# Where each decoded block starts: the array right after its key
+_BLOCK_STARTS = (
+    ("colorImages", re.compile(r"""['"]colorImages['"]\s*:\s*\{\s*['"]initial['"]\s*:\s*(?=\[)""")),
+    ("imageGalleryData", re.compile(r'"imageGalleryData":\s*(?=\[)')),
+)
+_DECODER = json.JSONDecoder()
+
+# Regexes for the text outside the decoded blocks
+_KEY_URLS = {}
+_MEDIA_URL = re.compile(r'https://m\.media-amazon\.com/images/I/[^"]+\._[A-Z0-9_]+\.[a-z]+')
+_MAIN_URL = re.compile(r'"main":\s*{[^}]*"(https://m\.media-amazon\.com/images/I/[^"]+?)"')
+_GALLERY_MAIN_URL = re.compile(r'"imageGalleryData":\s*\[\s*{[^}]*"mainUrl":"([^"]+)"')
+_ALT_IMAGE = re.compile(r'"altImages":\s*\[\s*"([^"]+)"')
+_MAIN_VARIANT_URL = re.compile(r'"variant":"MAIN"[^}]*"url":"([^"]+)"')
+
+_SIZE_CODE = re.compile(r'\._[A-Z0-9_]+\.')
+_SMALL_SL = re.compile(r'\._SL(?:75|100|150|200|500|800|1000)_')
+
+
+def sl1500(url):
+    """Replace any size code (._AC_SX342_. etc.) with ._SL1500_."""
+    return _SIZE_CODE.sub('._SL1500_.', url)
+
+
+def original(url):
+    """The image without a size code (the uploaded original), e.g. for a ._SL1500_. URL that 404s"""
+    return _SIZE_CODE.sub('.', url)
+
+
+def upscale_sl(url):
+    """Replace the small ._SL<n>_ renditions with ._SL1500_, leaving other size codes alone"""
+    return _SMALL_SL.sub('._SL1500_', url)
+
+
+def _events(value, out):
+    """Flatten decoded JSON into (kind, text) tokens in document order"""
+    if isinstance(value, dict):
+        out.append(("{", None))
+        for key, item in value.items():
+            out.append(("key", key))
+            _events(item, out)
+        out.append(("}", None))
+    elif isinstance(value, list):
+        out.append(("[", None))
+        for item in value:
+            _events(item, out)
+        out.append(("]", None))
+    elif isinstance(value, str):
+        out.append(("str", value))
+    else:
+        out.append(("scalar", None))
+    return out
+
+
+def _visible(events, start):
+    """Token indexes a [^}]* regex starting at events[start] can reach"""
+    for i in range(start, len(events)):
+        kind, text = events[i]
+        if kind == "}":
+            return
+        yield i
+        if text is not None and "}" in text:
+            return
+
+
+def _is(events, i, kind, text=None):
+    return i < len(events) and events[i][0] == kind and (text is None or events[i][1] == text)
+
+
+def _string_after(events, i):
+    """The non-empty string value at events[i], or None"""
+    if _is(events, i, "str") and events[i][1]:
+        return events[i][1]
+    return None
+
+
+def _last_member_value(events, start, key):
+    """Index of the last `key` member whose string value is visible from start, or None"""
+    last = None
+    for i in _visible(events, start):
+        if events[i] == ("key", key) and _string_after(events, i + 1) is not None:
+            last = i + 1
+    return last
+
+
+def _split(text):
+    """[plain text, block tokens, plain text, ...] for one script"""
+    blocks = []
+    for name, start in _BLOCK_STARTS:
+        match = start.search(text)
+        if match is None:
+            continue
+        begin = match.end()
+        try:
+            value, length = _DECODER.raw_decode(text[begin:begin + MAX_BLOCK_CHARS])
+        except ValueError:
+            continue
+        # The gallery's key sits just before the block, so keep it with the block's tokens
+        head = [("key", name)] if name == "imageGalleryData" else []
+        blocks.append((begin, begin + length, _events(value, head)))
+
+    segments, pos = [], 0
+    for begin, end, events in sorted(blocks, key=lambda block: block[0]):
+        if begin < pos:
+            continue  # nested inside an earlier block
+        segments.append(text[pos:begin])
+        segments.append(events)
+        pos = end
+    segments.append(text[pos:])
+    return segments
+
+
+class ImageScript:
+    """One inline script: decoded image-data blocks plus the plain text around them"""
+
+    def __init__(self, text):
+        self.segments = _split(text)
+
+    def _find(self, pattern, from_events):
+        found = []
+        for segment in self.segments:
+            if isinstance(segment, str):
+                found.extend(pattern.findall(segment))
+            else:
+                found.extend(from_events(segment))
+        return found
+
+    def key_urls(self, key):
+        """Values of "<key>":"https://..." members (hiRes, large, thumb, landing)"""
+        pattern = _KEY_URLS.get(key)
+        if pattern is None:
+            pattern = _KEY_URLS[key] = re.compile(f'"{re.escape(key)}":"(https://[^"]+)"')
+
+        def from_events(events):
+            urls = []
+            for i, token in enumerate(events):
+                if token == ("key", key):
+                    value = _string_after(events, i + 1)
+                    if value is not None and value.startswith("https://") and len(value) > 8:
+                        urls.append(value)
+            return urls
+        return self._find(pattern, from_events)
+
+    def media_urls(self):
+        """Every m.media-amazon.com image URL with a size code, keys included"""
+        def from_events(events):
+            urls = []
+            for kind, text in events:
+                if kind in ("key", "str"):
+                    urls.extend(_MEDIA_URL.findall(text))
+            return urls
+        return self._find(_MEDIA_URL, from_events)
+
+    def main_urls(self):
+        """The last media URL inside each "main": {...} object"""
+        def from_events(events):
+            urls, i = [], 0
+            while i < len(events):
+                if events[i] == ("key", "main") and _is(events, i + 1, "{"):
+                    last = None
+                    for j in _visible(events, i + 2):
+                        kind, text = events[j]
+                        if kind in ("key", "str") and text.startswith(MEDIA_PREFIX) and len(text) > len(MEDIA_PREFIX):
+                            last = j
+                    if last is not None:
+                        urls.append(events[last][1])
+                        i = last + 1
+                        continue
+                i += 1
+            return urls
+        return self._find(_MAIN_URL, from_events)
+
+    def gallery_main_urls(self):
+        """mainUrl of the first imageGalleryData entry"""
+        def from_events(events):
+            urls, i = [], 0
+            while i < len(events):
+                if (events[i] == ("key", "imageGalleryData") and _is(events, i + 1, "[")
+                        and _is(events, i + 2, "{")):
+                    last = _last_member_value(events, i + 3, "mainUrl")
+                    if last is not None:
+                        urls.append(events[last][1])
+                        i = last + 1
+                        continue
+                i += 1
+            return urls
+        return self._find(_GALLERY_MAIN_URL, from_events)
+
+    def alt_image_urls(self):
+        """First URL of each "altImages": [...] list"""
+        def from_events(events):
+            urls = []
+            for i, token in enumerate(events):
+                if token == ("key", "altImages") and _is(events, i + 1, "["):
+                    value = _string_after(events, i + 2)
+                    if value is not None:
+                        urls.append(value)
+            return urls
+        return self._find(_ALT_IMAGE, from_events)
+
+    def main_variant_urls(self):
+        """url member of each object whose variant is MAIN"""
+        def from_events(events):
+            urls, i = [], 0
+            while i < len(events):
+                if events[i] == ("key", "variant") and _is(events, i + 1, "str", "MAIN"):
+                    last = _last_member_value(events, i + 2, "url")
+                    if last is not None:
+                        urls.append(events[last][1])
+                        i = last + 1
+                        continue
+                i += 1
+            return urls
+        return self._find(_MAIN_VARIANT_URL, from_events)
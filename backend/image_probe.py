@@ -0,0 +1,198 @@
+"""
+Header-only probing of candidate product image URLs
+- Each candidate gets one GET for its first PROBE_BYTES bytes (a Range request; the body is
+  abandoned after that many bytes if the CDN ignores the range), and its width and height are
+  read from the JPEG / PNG / GIF / WebP header in those bytes; no image is downloaded in full
+- Candidates are probed concurrently (IMAGE_PROBE_WORKERS threads, IMAGE_PROBE_TIMEOUT seconds
+  each) and results are cached per URL (IMAGE_PROBE_CACHE entries for IMAGE_PROBE_TTL seconds);
+  network errors are not cached
+- best() keeps up to 7: one rendition per image id (the largest), in page order, dropping
+  URLs that don't resolve to an image, images under IMAGE_MIN_SIDE pixels (sprites, swatches)
+  and renditions that 404 (a ._SL1500_. upgrade falls back to the size-less original); a
+  candidate whose probe got no response (timeout, reset) is unknown, not bad, and is kept
+- When nothing survives (offline, CDN down, every probe refused with 403 / 503) best() returns
+  the caller's fallback list unchanged; IMAGE_PROBE=0 turns probing off
+"""
+
+import os
+import re
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import image_data
+import logs
+import metrics
+from scrape_cache import TTLCache
+
+log = logs.get_logger("image_probe")
+
+ENABLED = os.environ.get("IMAGE_PROBE", "1") != "0"
+CANDIDATES = int(os.environ.get("IMAGE_PROBE_CANDIDATES", "14"))
+PROBE_BYTES = int(os.environ.get("IMAGE_PROBE_BYTES", "16384"))
+TIMEOUT = float(os.environ.get("IMAGE_PROBE_TIMEOUT", "3"))
+WORKERS = int(os.environ.get("IMAGE_PROBE_WORKERS", "8"))
+MIN_SIDE = int(os.environ.get("IMAGE_MIN_SIDE", "300"))
+MAX_IMAGES = 7
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "image/avif,image/webp,image/*,*/*;q=0.8",
+}
+
+_IMAGE_ID = re.compile(r'/images/I/([^./]+)')
+_TOTAL_SIZE = re.compile(r'/(\d+)$')
+
+probes = TTLCache("image_probes", size=int(os.environ.get("IMAGE_PROBE_CACHE", "4096")),
+                  ttl=float(os.environ.get("IMAGE_PROBE_TTL", "86400")))
+
+_session = requests.Session()
+_executor = None
+_executor_lock = threading.Lock()
+
+
+# --- IMAGE HEADERS ---
+
+def _jpeg_size(data):
+    i = 2
+    while i + 9 < len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if 0xD0 <= marker <= 0xD9 or marker == 0x01:  # markers without a length
+            i += 2
+            continue
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):  # start of frame
+            height, width = struct.unpack(">HH", data[i + 5:i + 9])
+            return width, height
+        i += 2 + struct.unpack(">H", data[i + 2:i + 4])[0]
+    return None
+
+
+def image_size(data):
+    """(format, width, height) from the first bytes of an image; width / height are None when the
+    dimensions lie past `data`; None when it isn't a JPEG, PNG, GIF or WebP"""
+    if data[:3] == b"\xff\xd8\xff":
+        return ("jpeg",) + (_jpeg_size(data) or (None, None))
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and len(data) >= 24:
+        return ("png",) + struct.unpack(">II", data[16:24])
+    if data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+        return ("gif",) + struct.unpack("<HH", data[6:10])
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP" and len(data) >= 30:
+        chunk = data[12:16]
+        if chunk == b"VP8 ":
+            width, height = struct.unpack("<HH", data[26:30])
+            return "webp", width & 0x3FFF, height & 0x3FFF
+        if chunk == b"VP8L":
+            bits = int.from_bytes(data[21:25], "little")
+            return "webp", (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk == b"VP8X":
+            return "webp", int.from_bytes(data[24:27], "little") + 1, int.from_bytes(data[27:30], "little") + 1
+        return "webp", None, None
+    return None
+
+
+# --- PROBES ---
+
+def _fetch_head(url):
+    """{url, status, format, width, height, bytes} for one URL, from at most PROBE_BYTES of its body"""
+    result = {"url": url, "status": None, "format": None, "width": None, "height": None, "bytes": None}
+    with _session.get(url, headers={**HEADERS, "Range": f"bytes=0-{PROBE_BYTES - 1}"},
+                      timeout=TIMEOUT, stream=True) as response:
+        result["status"] = response.status_code
+        if response.status_code not in (200, 206):
+            return result
+        total = _TOTAL_SIZE.search(response.headers.get("Content-Range", ""))
+        length = total.group(1) if total else response.headers.get("Content-Length")
+        result["bytes"] = int(length) if length and length.isdigit() else None
+        data = b""
+        for chunk in response.iter_content(chunk_size=PROBE_BYTES):
+            data += chunk
+            if len(data) >= PROBE_BYTES:
+                break
+    size = image_size(data)
+    if size is not None:
+        result["format"], result["width"], result["height"] = size
+    return result
+
+
+def probe(url):
+    """Cached probe of one URL; status None means the request itself failed"""
+    cached = probes.get(url)
+    if cached is not None:
+        return cached[0]
+    try:
+        result = _fetch_head(url)
+    except requests.RequestException as e:
+        metrics.IMAGE_PROBES.inc(outcome="error")
+        log.debug("Image probe failed for %s: %s", url, e)
+        return {"url": url, "status": None, "format": None, "width": None, "height": None, "bytes": None}
+    metrics.IMAGE_PROBES.inc(outcome="image" if result["format"] else "missing" if result["status"] >= 400 else "not_image")
+    probes.put(url, result)
+    return result
+
+
+def _pool():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="image-probe")
+        return _executor
+
+
+def probe_all(urls):
+    """Probe many URLs concurrently; results in the same order"""
+    return list(_pool().map(probe, urls))
+
+
+def _usable(result):
+    if result["status"] is None:
+        return True  # no answer: nothing says it isn't a good image
+    if not result["format"]:
+        return False
+    return result["width"] is None or min(result["width"], result["height"]) >= MIN_SIDE
+
+
+def _area(result):
+    return (result["width"] or 0) * (result["height"] or 0)
+
+
+def best(candidates, fallback=None, limit=MAX_IMAGES):
+    """Up to `limit` usable image URLs from candidates (see module docstring)"""
+    candidates = list(dict.fromkeys(candidates))
+    unprobed = list(fallback if fallback is not None else candidates[:limit])
+    results = probe_all(candidates)
+    if all(result["status"] is None for result in results):
+        log.warning("⚠️ No image could be probed; keeping the unprobed images")
+        return unprobed
+
+    # A missing upgraded rendition gets one more chance as the original upload
+    retries = {}
+    for index, result in enumerate(results):
+        if result["status"] == 404:
+            original = image_data.original(result["url"])
+            if original != result["url"]:
+                retries[index] = original
+    for index, result in zip(retries, probe_all(list(retries.values()))):
+        results[index] = result
+
+    chosen = {}  # image id -> best result, in order of first appearance
+    for result in results:
+        if not _usable(result):
+            continue
+        match = _IMAGE_ID.search(result["url"])
+        image_id = match.group(1) if match else result["url"]
+        if image_id not in chosen or _area(result) > _area(chosen[image_id]):
+            chosen[image_id] = result
+    kept = [result["url"] for result in chosen.values()][:limit]
+    if not kept:
+        log.warning("⚠️ No probed image was usable (statuses %s); keeping the unprobed images",
+                    sorted({result["status"] for result in results}, key=str))
+        return unprobed
+    log.info("🔎 Probed %d image candidates, kept %d", len(candidates), len(kept))
+    return kept
@@ -0,0 +1,289 @@
+"""
+Image blueprint: Nano Baana image generation, GCS upload and generated image serving
+"""
+
+import io
+import json
+import os
+import re
+import uuid
+
+from flask import Blueprint, request, jsonify, send_file
+
+import clients
+import logs
+import metrics
+import tracing
+from executors import run_in_pool
+
+image_bp = Blueprint("image", __name__)
+log = logs.get_logger("image")
+
+OUTPUT_DIR = "generated_images"
+os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+GCS_BUCKET_NAME = clients.GCS_BUCKET_NAME
+
+
+def upload_to_gcs(local_file_path, destination_blob_name):
+   """
+   Uploads a file to GCS, makes it public, and returns the public URL.
+   """
+   from google.cloud.exceptions import Forbidden
+
+   storage_client = clients.get_storage_client()
+   if not storage_client:
+       raise Exception("GCS client not available")
+
+
+   bucket = storage_client.bucket(GCS_BUCKET_NAME)
+   blob = bucket.blob(destination_blob_name)
+   try:
+       log.debug("Uploading %s to gs://%s/%s", local_file_path, GCS_BUCKET_NAME, destination_blob_name)
+       with metrics.GCS_UPLOAD_SECONDS.time():
+           blob.upload_from_filename(local_file_path)
+       gcs_public_url = blob.public_url
+       log.info("✓ Uploaded to GCS. Public URL: %s", gcs_public_url)
+       return gcs_public_url
+   except Forbidden:
+       error_message = f"GCS Permission Denied (403): Ensure ADC user has 'Storage Admin' role for bucket '{GCS_BUCKET_NAME}'."
+       log.error("✗ GCS upload failed: %s", error_message)
+       raise Exception(error_message)
+   except Exception as e:
+       error_message = f"GCS Upload Failed: {type(e).__name__} - {str(e)}"
+       log.error("✗ GCS upload failed: %s", error_message)
+       raise Exception(error_message)
+
+
+# ===============================================================
+# NANO BAANA - PROMPT FUNCTIONS FOR IMAGE GENERATION (Final Version with Reference Rules)
+# ===============================================================
+
+def get_prompt_amazon_main_image():
+    return (
+        "High-quality professional fashion product photo for an Amazon main listing image. "
+        "Important Rule for Nano Baana: Completely ignore the crop, zoom, or framing of the uploaded image. "
+        "Use the reference ONLY for product color, fabric, and design details — never copy its proportions or background. "
+        "ALWAYS show a complete, full-body model from head to toe standing upright, centered, and visible entirely inside the frame. "
+        "Do not crop any part of the body including feet or head — there must be clear space above the head and below the feet. "
+        "Generate in a 4:5 aspect ratio (portrait) suitable for e-commerce main product display. "
+        "Pure white background (#FFFFFF), even lighting, realistic shadows, and natural skin tone. "
+        "Do NOT hallucinate or alter the product’s original design, pattern, or color. "
+        "No props, accessories, packaging, logos, or watermarks. "
+        "Product should occupy around 75% of the frame without touching edges. "
+        "Ensure crisp focus, natural human pose, and professional composition. "
+        "Category: [Category], Gender: [Gender], Age Group: [AgeGroup], Style: [Style], Subcategory: [SubCategory]"
+    )
+
+
+def get_prompt_amazon_product_only_image():
+    return (
+        "Amazon fashion category compliant product-only image. "
+        "Important Rule for Nano Baana: No human model, mannequin, or body parts should appear. "
+        "If the uploaded image has a model or background noise, use it only as a reference — "
+        "Do NOT hallucinate, crop, or retain human parts. Extract and display only the product clearly. "
+        "Show the complete product on a pure white background (RGB 255,255,255, hex #FFFFFF). "
+        "The product must fill 85% of the frame but not touch the edges. "
+        "Strictly preserve product color, pattern, and design. "
+        "No text, graphics, logos, or watermarks. "
+        "Sharp focus, true-to-color, high-resolution (minimum 1600x1600px). "
+        "Category: [Category], Gender: [Gender], Age Group: [AgeGroup], Style: [Style], Subcategory: [SubCategory]"
+    )
+
+
+def get_prompt_amazon_lifestyle_image():
+    return (
+        "Lifestyle or gallery image for Amazon fashion. "
+        "Important Rule for Nano Baana: Must include a full-body human model (head-to-toe visible, not cropped). "
+        "If the reference image shows only a half-body or unclear background, use it only as a reference for the outfit — "
+        "Do NOT hallucinate new designs or modify the product. "
+        "Show the model wearing the same product in a realistic lifestyle setting (studio, boutique, outdoor, or event). "
+        "The product must remain the focus, fully visible, and unchanged. "
+        "No watermarks, no random props, no over-editing. "
+        "Professional, realistic lighting. White background not required. "
+        "Category: [Category], Gender: [Gender], Age Group: [AgeGroup], Style: [Style], Subcategory: [SubCategory]"
+    )
+
+
+def get_prompt_amazon_angle_image():
+    return (
+        "Amazon-compliant angle view image (left, right, or back). "
+        "Important Rule for Nano Baana: Always show a complete human model from head to toe — no cropping or zooming. "
+        "If the user image is half-body or low quality, use it as a color/pattern reference only. "
+        "Do NOT change the outfit design or hallucinate missing parts. Follow this prompt as the final rule. "
+        "Product must fill around 85% of the frame, not touch borders. "
+        "No text, packaging, graphics, or watermarks. "
+        "Clean studio background allowed (not white). "
+        "Category: [Category], Gender: [Gender], Age Group: [AgeGroup], Style: [Style], Subcategory: [SubCategory]"
+    )
+
+
+def get_prompt_amazon_infographic():
+    return (
+        "Amazon-compliant model image showing a left, right, or back view. "
+        "Important Rule for Nano Baana: Always generate a full-body human model from head to toe, no matter how cropped or partial the reference image is. "
+        "Ignore the framing, crop, or zoom of the uploaded photo — use it only for color, pattern, and texture reference. "
+        "Model must stand naturally, visible from head to toe with space above and below. "
+        "Product must fill about 85% of the frame, not touching borders. "
+        "Strictly preserve original design details — do not change fabric, color, or cut. "
+        "No text, graphics, packaging, badges, or watermarks. "
+        "Clean, minimal indoor or studio background allowed. "
+        "Professional lighting and realistic proportions, minimum 1600x1600px resolution. "
+        "Category: [Category], Gender: [Gender], Age Group: [AgeGroup], Style: [Style], Subcategory: [SubCategory]"
+    )
+
+
+PROMPT_FUNCTIONS = [
+    get_prompt_amazon_main_image,         # ✅ Full human model, head-to-toe
+    get_prompt_amazon_product_only_image, # 🚫 No model
+    get_prompt_amazon_lifestyle_image,    # ✅ Full human model
+    get_prompt_amazon_angle_image,        # ✅ Full human model
+    get_prompt_amazon_infographic         # 🚫 No model
+]
+
+
+
+def replace_placeholders(prompt: str, attributes: dict) -> str:
+   pattern = r"\[(\w+)\]"
+   def replacer(match):
+       key = match.group(1)
+       return attributes.get(key, f"[{key}]")
+   return re.sub(pattern, replacer, prompt)
+
+
+# --- IMAGE GENERATION ENDPOINT ---
+
+
+@image_bp.route("/generate-image", methods=["POST"])
+@run_in_pool("image")
+def generate_image_api():
+   if "image" not in request.files:
+       return jsonify({"error": "No image uploaded"}), 400
+
+
+   from PIL import Image
+
+   file = request.files["image"]
+   img_stream = io.BytesIO(file.read())
+   img_stream.seek(0)
+   try:
+       uploaded_image = Image.open(img_stream).convert("RGB")
+   except Exception as e:
+       return jsonify({"error": f"Invalid image file: {str(e)}"}), 400
+
+
+   try:
+       style_index = int(request.form.get("style_index", -1))
+   except ValueError:
+       return jsonify({"error": "Invalid style_index"}), 400
+
+
+   if not (0 <= style_index < len(PROMPT_FUNCTIONS)):
+       return jsonify({"error": "style_index out of range"}), 400
+
+
+   attributes_str = request.form.get("attributes", "{}")
+   try:
+       attributes = json.loads(attributes_str)
+   except json.JSONDecodeError:
+       return jsonify({"error": "Invalid attributes JSON"}), 400
+
+
+   prompt_template = PROMPT_FUNCTIONS[style_index]()
+   final_prompt = replace_placeholders(prompt_template, attributes)
+
+
+   try:
+       full_prompt = (
+           "Transform this photo photorealistically for premium e-commerce quality. "
+           f"Instructions: {final_prompt} Avoid distortion, blur, watermarks, or cropping."
+       )
+
+
+       genai = clients.genai_module()
+       image_model = clients.get_image_model()
+       with metrics.GEMINI_SECONDS.time(model="image"):
+           response = image_model.generate_content(
+               [uploaded_image, full_prompt],
+               generation_config=genai.types.GenerationConfig(
+                   temperature=0.6, top_p=0.9, top_k=40
+               ),
+           )
+
+
+       found_image = False
+       for part in response.candidates[0].content.parts:
+           if hasattr(part, "inline_data") and part.inline_data and part.inline_data.mime_type.startswith("image/"):
+               image_bytes = part.inline_data.data
+               img = Image.open(io.BytesIO(image_bytes))
+               unique_filename = f"generated_{uuid.uuid4().hex}.jpg"
+               local_path = os.path.join(OUTPUT_DIR, unique_filename)
+               with tracing.span("image.save", filename=unique_filename):
+                   img.save(local_path, format='JPEG', quality=95, optimize=True)
+
+
+               gcs_url = None
+               try:
+                   if clients.get_storage_client():
+                       gcs_blob_name = f"generated/{unique_filename}"
+                       gcs_url = upload_to_gcs(local_path, gcs_blob_name)
+                   else:
+                       log.warning("⚠ GCS client not available, skipping upload")
+               except Exception as gcs_error:
+                   log.warning("⚠ GCS upload failed: %s", gcs_error)
+
+
+               preview_url = request.host_url.rstrip('/') + '/generated_images/' + unique_filename
+
+
+               found_image = True
+               return jsonify({
+                   "success": True,
+                   "filename": unique_filename,
+                   "gcs_url": gcs_url,
+                   "preview_url": preview_url,
+                   "file_size": os.path.getsize(local_path),
+                   "image_size": f"{img.width}x{img.height}",
+                   "style_index": style_index
+               }), 200
+
+
+       if not found_image:
+           return jsonify({"error": "No image returned from model."}), 500
+   except Exception as e:
+       log.exception("Image generation failed")
+       return jsonify({"error": f"Generation/Upload failed: {str(e)}"}), 500
+
+
+@image_bp.route("/generated_images/<filename>")
+def serve_generated_image(filename):
+   """Serve generated images securely"""
+   try:
+       file_path = os.path.join(OUTPUT_DIR, filename)
+       if not os.path.exists(file_path):
+           return jsonify({"error": "Image file not found"}), 404
+       return send_file(file_path, mimetype='image/jpeg')
+   except Exception as e:
+       return jsonify({"error": f"Error serving image: {str(e)}"}), 500
+
+
+@image_bp.route("/api/debug-images")
+def debug_images():
+   """Debug endpoint to list generated images info"""
+   try:
+       files = os.listdir(OUTPUT_DIR)
+       file_info = []
+       for file in files:
+           file_path = os.path.join(OUTPUT_DIR, file)
+           file_info.append({
+               'name': file,
+               'size': os.path.getsize(file_path) if os.path.exists(file_path) else 0,
+               'exists': os.path.exists(file_path)
+           })
+       return jsonify({
+           "output_dir": OUTPUT_DIR,
+           "absolute_path": os.path.abspath(OUTPUT_DIR),
+           "files": file_info
+       })
+   except Exception as e:
+       return jsonify({"error": str(e)}), 500
@@ -0,0 +1,261 @@
+"""
+Durable scrape job queue in SQLite, so large crawls survive restarts
+- One row per job (JOB_QUEUE_DB, default backend/jobs.db): pending -> running -> done | failed,
+  with its batch, attempt count, next run time and the result or last error
+- Workers lease a job for JOB_VISIBILITY_SECONDS (default 300); a job whose lease runs out
+  (its worker or the whole process died) counts as a failed attempt and is retried like one,
+  so nothing is lost on restart and a job that keeps killing its worker still ends up failed
+- A failed attempt is retried after JOB_RETRY_SECONDS * 2^(attempt - 1) (default 30s, +-20%
+  jitter) until the job's max_attempts (default JOB_MAX_ATTEMPTS, 3) are used up
+- Completing or failing a job checks the lease is still the caller's, so a worker that
+  overran its lease can't overwrite the attempt that replaced it
+- Workers: JOB_WORKERS loop threads (default: one per two scrape processes, as each job runs
+  both scrapers at once) started with start_workers(handler); handler(url, options) returns
+  (result, error)
+"""
+
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+
+import logs
+import metrics
+import serialization
+import tracing
+
+log = logs.get_logger("job_queue")
+
+DB_PATH = os.environ.get("JOB_QUEUE_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "jobs.db"))
+VISIBILITY_SECONDS = float(os.environ.get("JOB_VISIBILITY_SECONDS", "300"))
+RETRY_SECONDS = float(os.environ.get("JOB_RETRY_SECONDS", "30"))
+MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", "3"))
+WORKERS = int(os.environ.get("JOB_WORKERS", str(max(1, int(os.environ.get("SCRAPER_PROCESSES", "4")) // 2))))
+JITTER = 0.2
+IDLE_POLL_SECONDS = 1.0
+
+STATUSES = ("pending", "running", "done", "failed")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    batch TEXT NOT NULL,
+    url TEXT NOT NULL,
+    options TEXT NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    next_run REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    created REAL NOT NULL,
+    updated REAL NOT NULL,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_leasable ON jobs (status, next_run);
+CREATE INDEX IF NOT EXISTS jobs_batch ON jobs (batch, id);
+"""
+
+_db = None
+_db_lock = threading.Lock()
+
+
+def _connect():
+    global _db
+    if _db is None:
+        # timeout: another process (e.g. the reloader's twin) may hold the write lock briefly
+        _db = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None, timeout=30)
+        _db.row_factory = sqlite3.Row
+        _db.execute("PRAGMA journal_mode=WAL")
+        _db.executescript(SCHEMA)
+    return _db
+
+
+def submit(urls, options=None, max_attempts=None, batch=None):
+    """Queue one job per URL under a batch id (new unless given); returns the batch id"""
+    batch = batch or uuid.uuid4().hex[:12]
+    now = time.time()
+    rows = [(batch, url, serialization.dumps(options or {}), max_attempts or MAX_ATTEMPTS, now, now, now)
+            for url in urls]
+    with _db_lock:
+        db = _connect()
+        db.execute("BEGIN IMMEDIATE")
+        db.executemany("INSERT INTO jobs (batch, url, options, max_attempts, next_run, created, updated) "
+                       "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        db.execute("COMMIT")
+    metrics.QUEUE_JOBS.inc(len(rows), outcome="submitted")
+    log.info("📥 Queued %d jobs in batch %s", len(rows), batch)
+    _wake.set()
+    return batch
+
+
+def lease(owner, now=None):
+    """The next runnable job (pending and due), now leased to owner; or None. Expired leases are failed first."""
+    now = now or time.time()
+    with _db_lock:
+        db = _connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            expired = _expire_leases(db, now)
+            row = db.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_owner = ?, "
+                "lease_expires = ?, updated = ? WHERE id = ("
+                "  SELECT id FROM jobs WHERE status = 'pending' AND next_run <= ? ORDER BY next_run, id LIMIT 1"
+                ") RETURNING *",
+                (owner, now + VISIBILITY_SECONDS, now, now)).fetchone()
+            db.execute("COMMIT")
+        except sqlite3.Error:
+            db.execute("ROLLBACK")
+            raise
+    if expired:
+        metrics.QUEUE_JOBS.inc(expired, outcome="lease_expired")
+        log.warning("⌛ %d job leases expired; counted as failed attempts", expired)
+    return row
+
+
+def _expire_leases(db, now):
+    """Turn running jobs whose lease ran out into failed attempts (inside the caller's transaction)"""
+    error = "Lease expired: the worker died or overran JOB_VISIBILITY_SECONDS"
+    dead = db.execute(
+        "UPDATE jobs SET status = 'failed', error = ?, lease_owner = NULL, lease_expires = NULL, updated = ? "
+        "WHERE status = 'running' AND lease_expires <= ? AND attempts >= max_attempts",
+        (error, now, now)).rowcount
+    retried = db.execute(
+        "UPDATE jobs SET status = 'pending', error = ?, next_run = ? + ? * (1 << (attempts - 1)), "
+        "lease_owner = NULL, lease_expires = NULL, updated = ? "
+        "WHERE status = 'running' AND lease_expires <= ?",
+        (error, now, RETRY_SECONDS, now, now)).rowcount
+    return dead + retried
+
+
+def complete(job_id, owner, result):
+    """Mark a leased job done; False when the lease was lost to another worker"""
+    return _finish(job_id, owner, "status = 'done', result = ?, error = NULL", (serialization.dumps(result),))
+
+
+def fail(job_id, owner, error):
+    """Record a failed attempt: retry later with backoff, or mark the job failed once out of attempts"""
+    with _db_lock:
+        row = _connect().execute("SELECT attempts, max_attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if row is None:
+        return False
+    if row["attempts"] >= row["max_attempts"]:
+        return _finish(job_id, owner, "status = 'failed', error = ?", (error,))
+    delay = RETRY_SECONDS * 2 ** (row["attempts"] - 1) * random.uniform(1 - JITTER, 1 + JITTER)
+    return _finish(job_id, owner, "status = 'pending', error = ?, next_run = ?", (error, time.time() + delay))
+
+
+def _finish(job_id, owner, assignments, args):
+    with _db_lock:
+        updated = _connect().execute(
+            f"UPDATE jobs SET {assignments}, lease_owner = NULL, lease_expires = NULL, updated = ? "
+            "WHERE id = ? AND status = 'running' AND lease_owner = ?",
+            args + (time.time(), job_id, owner)).rowcount
+    if not updated:
+        log.warning("⌛ Lease on job %d expired before %s finished it", job_id, owner)
+    return bool(updated)
+
+
+def retry_failed(batch):
+    """Give a batch's failed jobs a fresh set of attempts; returns how many were requeued"""
+    with _db_lock:
+        requeued = _connect().execute(
+            "UPDATE jobs SET status = 'pending', attempts = 0, next_run = ?, updated = ? "
+            "WHERE batch = ? AND status = 'failed'", (time.time(), time.time(), batch)).rowcount
+    if requeued:
+        _wake.set()
+    return requeued
+
+
+# --- INSPECTION ---
+
+def _job(row, with_result=False):
+    job = {"id": row["id"], "url": row["url"], "status": row["status"], "attempts": row["attempts"],
+           "maxAttempts": row["max_attempts"], "nextRun": row["next_run"], "updated": row["updated"],
+           "error": row["error"]}
+    if with_result:
+        job["result"] = json.loads(row["result"]) if row["result"] else None
+    return job
+
+
+def batch_status(batch, with_results=False, status=None, after=0, limit=1000):
+    """Counts per status plus the batch's jobs (id > after, optionally one status); None for an unknown batch"""
+    with _db_lock:
+        db = _connect()
+        counts = dict(db.execute("SELECT status, COUNT(*) FROM jobs WHERE batch = ? GROUP BY status", (batch,)).fetchall())
+        if not counts:
+            return None
+        query, args = "SELECT * FROM jobs WHERE batch = ? AND id > ?", [batch, after]
+        if status:
+            query += " AND status = ?"
+            args.append(status)
+        rows = db.execute(query + " ORDER BY id LIMIT ?", args + [limit]).fetchall()
+    counts = {name: counts.get(name, 0) for name in STATUSES}
+    return {"batch": batch, "total": sum(counts.values()), "counts": counts,
+            "finished": counts["pending"] == 0 and counts["running"] == 0,
+            "jobs": [_job(row, with_results) for row in rows]}
+
+
+def stats():
+    """Job counts per status across all batches, plus the worker loops"""
+    with _db_lock:
+        counts = dict(_connect().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+    return {"counts": {name: counts.get(name, 0) for name in STATUSES},
+            "workers": len(_workers), "visibility_seconds": VISIBILITY_SECONDS}
+
+
+# --- WORKERS ---
+
+_workers = []
+_workers_lock = threading.Lock()
+_wake = threading.Event()
+
+
+def _work(owner, handler):
+    while True:
+        try:
+            row = lease(owner)
+        except sqlite3.Error as e:
+            log.error("❌ Could not lease a job: %s", e)
+            row = None
+        if row is None:
+            _wake.wait(IDLE_POLL_SECONDS)
+            _wake.clear()
+            continue
+
+        with tracing.span("job_queue.job", job_id=row["id"], batch=row["batch"], attempt=row["attempts"]):
+            try:
+                result, error = handler(row["url"], json.loads(row["options"]))
+            except Exception as e:
+                log.exception("❌ Job %d crashed: %s", row["id"], e)
+                result, error = None, str(e)
+        try:
+            if error is None:
+                if complete(row["id"], owner, result):
+                    metrics.QUEUE_JOBS.inc(outcome="done")
+            else:
+                log.warning("⚠️ Job %d attempt %d failed: %s", row["id"], row["attempts"], error)
+                if fail(row["id"], owner, error):
+                    metrics.QUEUE_JOBS.inc(outcome="failed_attempt")
+        except sqlite3.Error as e:
+            # The lease still runs out, so the job is retried as an expired attempt
+            log.error("❌ Could not record the outcome of job %d: %s", row["id"], e)
+
+
+def start_workers(handler, count=WORKERS):
+    """Start the worker loops once per process; jobs left running by a previous process are picked up when their leases expire"""
+    with _workers_lock:
+        if _workers:
+            return
+        # Lease owners are unique per process, so a restarted server never mistakes an old lease for its own
+        process_id = uuid.uuid4().hex[:8]
+        for index in range(count):
+            owner = f"{process_id}-{index}"
+            thread = threading.Thread(target=_work, args=(owner, handler), name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            _workers.append(thread)
+    log.info("👷 Started %d job workers", count)
@@ -0,0 +1,104 @@
+"""
+Scrape job blueprint: submit large batches to the durable job queue and follow their progress
+- POST /api/scrape-jobs {"urls": [...], "fields": "-raw", "maxAttempts": 3} queues one job per
+  URL and returns {"batch": id, "queued": n, "rejected": [urls that aren't Amazon URLs]}
+- GET /api/scrape-jobs/<batch> returns counts per status and the jobs (?status=failed to filter,
+  ?after=<job id>&limit= to page, ?results=1 to include each finished job's merged result)
+- POST /api/scrape-jobs/<batch>/retry requeues the batch's failed jobs
+- GET /api/scrape-jobs returns counts across every batch
+- Each job runs both scrapers, like /api/scrape-product, through the same cache and warm workers;
+  the workers start with the first batch or at startup, which resumes whatever a restart interrupted
+"""
+
+from flask import Blueprint, request, jsonify
+
+import job_queue
+import logs
+import scrape_cache
+from executors import run_in_pool
+from scrape_routes import merge_scrape_results, normalize_amazon_url, run_scrapers
+from serialization import select_fields
+
+jobs_bp = Blueprint("jobs", __name__)
+log = logs.get_logger("jobs")
+
+MAX_URLS = 10000
+MAX_PAGE = 1000
+
+
+def scrape_job(url, options):
+    """Job queue handler: (merged result, None), or (None, error) so the queue retries it"""
+    (scraper_data, scraper_error), (amz_data, amz_error) = run_scrapers(url, fresh=bool(options.get("fresh")))
+    # A scraper that ran but was blocked (CAPTCHA, 503) returns success: false rather than raising
+    if not (scraper_data or {}).get("success") and not (amz_data or {}).get("success"):
+        errors = [scraper_error or (scraper_data or {}).get("error"), amz_error or (amz_data or {}).get("error")]
+        return None, "; ".join(str(error) for error in errors if error) or "Both scrapers failed"
+    merged = merge_scrape_results(scraper_data, amz_data, scraper_error, amz_error)
+    return select_fields(merged, options.get("fields")), None
+
+
+def resume():
+    """Start the job workers, picking up jobs a previous process left pending or running"""
+    job_queue.start_workers(scrape_job)
+
+
+@jobs_bp.route("/api/scrape-jobs", methods=["POST"])
+@run_in_pool("jobs")
+def submit_batch():
+    data = request.get_json(silent=True) or {}
+    urls = data.get("urls")
+    max_attempts = data.get("maxAttempts")
+    if not isinstance(urls, list) or not urls:
+        return jsonify({"success": False, "error": 'Send a non-empty "urls" list'}), 400
+    if len(urls) > MAX_URLS:
+        return jsonify({"success": False, "error": f"At most {MAX_URLS} URLs per batch"}), 400
+    if max_attempts is not None and (not isinstance(max_attempts, int) or not 1 <= max_attempts <= 10):
+        return jsonify({"success": False, "error": "maxAttempts must be between 1 and 10"}), 400
+
+    accepted, rejected, seen = [], [], set()
+    for url in urls:
+        normalized = normalize_amazon_url(url) if isinstance(url, str) else None
+        if not normalized:
+            rejected.append(url)
+            continue
+        key = scrape_cache.product_key(normalized)
+        if key not in seen:  # one job per product, however its URLs are spelled
+            seen.add(key)
+            accepted.append(normalized)
+    if not accepted:
+        return jsonify({"success": False, "error": "No valid Amazon product URLs", "rejected": rejected}), 400
+
+    options = {key: data[key] for key in ("fields", "fresh") if data.get(key)}
+    batch = job_queue.submit(accepted, options, max_attempts)
+    resume()
+    return jsonify({"success": True, "batch": batch, "queued": len(accepted), "rejected": rejected})
+
+
+@jobs_bp.route("/api/scrape-jobs/<batch>", methods=["GET"])
+@run_in_pool("jobs")
+def batch_status(batch):
+    status = request.args.get("status")
+    if status and status not in job_queue.STATUSES:
+        return jsonify({"success": False, "error": f"status must be one of {', '.join(job_queue.STATUSES)}"}), 400
+    report = job_queue.batch_status(
+        batch, with_results=request.args.get("results") in ("1", "true"), status=status,
+        after=request.args.get("after", default=0, type=int),
+        limit=min(request.args.get("limit", default=MAX_PAGE, type=int), MAX_PAGE))
+    if report is None:
+        return jsonify({"success": False, "error": f"Unknown batch {batch}"}), 404
+    return jsonify({"success": True, **report})
+
+
+@jobs_bp.route("/api/scrape-jobs/<batch>/retry", methods=["POST"])
+@run_in_pool("jobs")
+def retry_batch(batch):
+    requeued = job_queue.retry_failed(batch)
+    if requeued:
+        resume()
+    return jsonify({"success": True, "requeued": requeued})
+
+
+@jobs_bp.route("/api/scrape-jobs", methods=["GET"])
+@run_in_pool("jobs")
+def queue_stats():
+    return jsonify({"success": True, **job_queue.stats()})
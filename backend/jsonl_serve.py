@@ -0,0 +1,97 @@
+"""
+JSONL daemon mode shared by the scraper CLIs (--serve / --jsonl)
+- Reads one job per stdin line: a bare URL, or a JSON object with "url", an optional "id"
+  and per-job options (e.g. {"url": "...", "id": 7, "formatted": true, "download": false,
+  "fields": "-raw"})
+- Runs up to `jobs` scrapes in parallel in one warm process and writes one compact JSON line
+  per job as it finishes: {"id": ..., "url": ..., "result": {...}}, or {"id": ..., "error": ...}
+  for a line that isn't a job; "id" defaults to the line number
+- A job may carry "traceparent" / "request_id" to join the caller's trace
+- Ends when stdin closes, after every started job has been written
+"""
+
+import json
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import cleaners
+import logs
+import serialization
+import tracing
+
+log = logs.get_logger("jsonl_serve")
+
+DEFAULT_JOBS = 4
+
+
+def parse_job(line, line_number):
+    """(id, url, options) for one input line; raises ValueError for a line that isn't a job"""
+    line = line.strip()
+    if not line.startswith("{"):
+        return line_number, line, {}
+    try:
+        job = json.loads(line)
+    except ValueError as e:
+        raise ValueError(f"invalid JSON: {e}") from None
+    if not isinstance(job, dict) or not isinstance(job.get("url"), str) or not job["url"]:
+        raise ValueError('a JSON job needs a "url" string')
+    options = {key: value for key, value in job.items() if key not in ("id", "url")}
+    return job.get("id", line_number), job["url"], options
+
+
+class _Writer:
+    """One whole line per result, flushed at once so readers see results as they finish"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def write(self, record):
+        line = serialization.dumps(record)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+def serve(name, run, jobs=DEFAULT_JOBS, stdin=None, stdout=None, default_fields=None):
+    """
+    Serve JSONL jobs until stdin closes.
+    run(url, options) returns the result dict for one job; `name` labels its trace spans.
+    A job's "fields" option trims its result (serialization.select_fields).
+    """
+    stdin = stdin or sys.stdin
+    writer = _Writer(stdout or sys.stdout)
+    # Bounds how many lines are read ahead of the running jobs
+    slots = threading.BoundedSemaphore(jobs * 2)
+
+    def one(job_id, url, options):
+        context = {"TRACEPARENT": options.pop("traceparent", None), "REQUEST_ID": options.pop("request_id", None)}
+        fields = options.pop("fields", default_fields)
+        try:
+            with tracing.continued(f"{name}.jsonl", context, url=url):
+                result = serialization.select_fields(run(url, options), fields)
+        except Exception as e:
+            log.exception("❌ Job %s failed: %s", job_id, e)
+            result = {"success": False, "error": str(e)}
+        try:
+            writer.write({"id": job_id, "url": url, "result": result})
+        finally:
+            slots.release()
+
+    cleaners.preseed()
+    log.info("🚀 Serving %s jobs from stdin (%d in parallel)", name, jobs)
+    served = 0
+    with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix=f"{name}-jsonl") as pool:
+        for line_number, line in enumerate(stdin, start=1):
+            if not line.strip():
+                continue
+            try:
+                job_id, url, options = parse_job(line, line_number)
+            except ValueError as e:
+                writer.write({"id": line_number, "error": str(e)})
+                continue
+            slots.acquire()
+            pool.submit(one, job_id, url, options)
+            served += 1
+    log.info("🏁 Served %d %s jobs", served, name)
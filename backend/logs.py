@@ -0,0 +1,124 @@
+"""
+Structured, leveled logging for the server and scrapers
+- JSON lines on stderr (LOG_FORMAT=text for human-readable output)
+- LOG_LEVEL picks the level (default INFO); debug calls cost one level check when disabled
+- Records are handed to a background thread through a queue, so request and
+  scrape threads never block on stderr writes
+- Per-item messages pass extra=SAMPLED and only 1 in LOG_SAMPLE_EVERY is emitted
+
+Use %-style arguments (log.debug("Found %s", url)), never f-strings, so nothing
+is formatted unless the record is actually written.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+SAMPLED = {"sampled": True}
+
+# Attributes every LogRecord has; anything else came from extra= and is emitted as a field
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "sampled"}
+
+_configured = False
+_configure_lock = threading.Lock()
+_listener = None
+_context_providers = []
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue the record unformatted so message formatting happens on the listener thread"""
+
+    def prepare(self, record):
+        # Runs on the caller's thread, the only place request context is visible
+        for provider in _context_providers:
+            fields = provider()
+            if fields:
+                record.__dict__.update(fields)
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """Keep 1 in `every` records flagged with extra=SAMPLED, counted per message template"""
+
+    def __init__(self, every):
+        super().__init__()
+        self.every = max(1, every)
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if not getattr(record, "sampled", False) or self.every == 1:
+            return True
+        with self._lock:
+            count = self._counts.get(record.msg, 0)
+            self._counts[record.msg] = count + 1
+        return count % self.every == 0
+
+
+def configure(level=None, fmt=None, stream=None):
+    """Install the queued stderr handler on the root logger (idempotent)"""
+    global _configured, _listener
+    with _configure_lock:
+        if _configured:
+            return
+        level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+        fmt = (fmt or os.getenv("LOG_FORMAT", "json")).lower()
+
+        output = logging.StreamHandler(stream or sys.stderr)
+        if fmt == "text":
+            output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+        else:
+            output.setFormatter(JsonFormatter())
+
+        records = queue.SimpleQueue()
+        queue_handler = DeferredQueueHandler(records)
+        queue_handler.addFilter(SamplingFilter(int(os.getenv("LOG_SAMPLE_EVERY", "10"))))
+
+        root = logging.getLogger()
+        root.setLevel(level)
+        root.addHandler(queue_handler)
+
+        _listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown)
+        _configured = True
+
+
+def shutdown():
+    """Flush queued records; called automatically at exit"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def register_context(provider):
+    """Add a callable returning extra fields (e.g. trace ids) for every record"""
+    _context_providers.append(provider)
+
+
+def get_logger(name):
+    configure()
+    return logging.getLogger(name)
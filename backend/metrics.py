@@ -0,0 +1,312 @@
+"""
+Minimal Prometheus-style metrics for the server and scrapers
+- Counters and histograms with labels, safe to update from any thread
+- render() produces the Prometheus text exposition format for /metrics
+- All metrics are declared at the bottom of this file so names stay in one place
+- drain() / merge() move counter and histogram updates from a worker process into the
+  server's registry (scrape_service sends them back with each job's result)
+"""
+
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+import tracing
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# Latency buckets in seconds: fast extractors up to slow image generations
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_registry = []
+
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = []
+    for name, value in pairs:
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        escaped.append(f'{name}="{value}"')
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series = {}
+        _registry.append(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def drain(self):
+        """This metric's series, then reset to empty"""
+        with self._lock:
+            series, self._series = self._series, {}
+        return series
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            series = sorted(self._series.items())
+            lines.extend(self._render_series(series))
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._series.get(self._key(labels), 0)
+
+    def series(self):
+        """{label values (in labelnames order): count} for every recorded label set"""
+        with self._lock:
+            return dict(self._series)
+
+    def merge(self, series):
+        with self._lock:
+            for key, value in series.items():
+                self._series[key] = self._series.get(key, 0) + value
+
+    def _render_series(self, series):
+        for key, value in series:
+            yield f"{self.name}_total{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = value
+
+    def value(self, **labels):
+        return self._series.get(self._key(labels), 0)
+
+    def _render_series(self, series):
+        for key, value in series:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, span=None):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # Optional tracing span name template, e.g. "sheets.{operation}"
+        self.span = span
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._series.get(key)
+            if state is None:
+                state = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            counts = state[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        traced = tracing.span(self.span.format(**labels)) if self.span else nullcontext()
+        start = time.perf_counter()
+        try:
+            with traced:
+                yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self, **labels):
+        """(count, sum) for one label set"""
+        state = self._series.get(self._key(labels))
+        return (state[2], state[1]) if state else (0, 0.0)
+
+    def series(self):
+        """{label values (in labelnames order): (count, sum)} for every recorded label set"""
+        with self._lock:
+            items = list(self._series.items())
+        return {key: (state[2], state[1]) for key, state in items}
+
+    def merge(self, series):
+        with self._lock:
+            for key, (counts, total, count) in series.items():
+                state = self._series.get(key)
+                if state is None:
+                    state = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+                state[0] = [a + b for a, b in zip(state[0], counts)]
+                state[1] += total
+                state[2] += count
+
+    def _render_series(self, series):
+        for key, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(float(bound))))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+class Stopwatch:
+    """Record consecutive stages of one function into a histogram with a stage label"""
+
+    def __init__(self, histogram, stage_label, **labels):
+        self.histogram = histogram
+        self.stage_label = stage_label
+        self.labels = labels
+        self._last = time.perf_counter()
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        labels = {self.stage_label: stage, **self.labels}
+        self.histogram.observe(now - self._last, **labels)
+        if self.histogram.span:
+            tracing.record_span(self.histogram.span.format(**labels), now - self._last)
+        self._last = now
+
+
+def record_cache(cache, hit):
+    (CACHE_HITS if hit else CACHE_MISSES).inc(cache=cache)
+
+
+def drain():
+    """{metric name: series} of every counter and histogram updated since the last drain, which
+    are reset; gauges are per-process state and stay put"""
+    payload = {}
+    for metric in _registry:
+        if isinstance(metric, (Counter, Histogram)):
+            series = metric.drain()
+            if series:
+                payload[metric.name] = series
+    return payload
+
+
+def merge(payload):
+    """Add a drain() payload from another process to this process's metrics"""
+    by_name = {metric.name: metric for metric in _registry}
+    for name, series in payload.items():
+        metric = by_name.get(name)
+        if metric is not None:
+            metric.merge(series)
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process, or None where it can't be read"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux reports KiB
+
+
+def render():
+    peak_rss = peak_rss_bytes()
+    if peak_rss is not None:
+        PEAK_RSS.set(peak_rss)
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# --- METRICS ---
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Flask request latency", ["blueprint", "endpoint", "status"])
+
+FETCH_SECONDS = Histogram(
+    "scrape_fetch_duration_seconds", "Amazon page fetch latency", ["scraper"],
+    span="fetch.{scraper}")
+PARSE_SECONDS = Histogram(
+    "scrape_parse_duration_seconds", "HTML parse and per-extractor time", ["scraper", "extractor"],
+    span="parse.{extractor}")
+PARSE_NODES = Histogram(
+    "scrape_parse_nodes", "Tags in the parsed page tree", ["scraper"],
+    buckets=(100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000))
+CAPTCHA_HITS = Counter(
+    "scrape_captcha_hits", "CAPTCHA pages returned by Amazon", ["scraper"])
+RETRIES = Counter(
+    "scrape_retries", "Scrape attempts retried", ["scraper", "reason"])
+STREAM_FETCHES = Counter(
+    "scrape_stream_fetches", "Streaming page fetches by whether they stopped early", ["scraper", "outcome"])
+SCRAPE_RATE = Gauge(
+    "scrape_rate_limit_requests_per_second", "Current adaptive request rate per host", ["host"])
+RATE_LIMIT_WAIT_SECONDS = Histogram(
+    "scrape_rate_limit_wait_seconds", "Time a scrape waited for its host's rate limiter", ["host"])
+BREAKER_OPENS = Counter(
+    "scrape_circuit_breaker_opens", "Times a host's circuit breaker opened", ["host"])
+SCRAPE_JOBS = Counter(
+    "scrape_worker_jobs", "Jobs run on the warm scrape workers by outcome", ["job", "outcome"])
+SCRAPE_WORKER_RESTARTS = Counter(
+    "scrape_worker_restarts", "Scrape workers replaced, by reason", ["reason"])
+PREFETCH_JOBS = Counter(
+    "scrape_prefetch_jobs", "Speculative product prefetches by outcome", ["outcome"])
+PREFETCH_HITS = Counter(
+    "scrape_prefetch_hits", "Scrape jobs answered from a prefetched cache entry", ["job"])
+IMAGE_PROBES = Counter(
+    "image_probes", "Image URL header probes by outcome", ["outcome"])
+QUEUE_JOBS = Counter(
+    "scrape_queue_jobs", "Queued scrape jobs submitted, finished, failed (per attempt) and lost to expired leases", ["outcome"])
+
+GEMINI_SECONDS = Histogram(
+    "gemini_request_duration_seconds", "Gemini generate_content latency", ["model"],
+    span="gemini.{model}")
+GCS_UPLOAD_SECONDS = Histogram(
+    "gcs_upload_duration_seconds", "Google Cloud Storage upload latency",
+    span="gcs.upload")
+SHEETS_CALL_SECONDS = Histogram(
+    "sheets_call_duration_seconds", "Google Sheets API call latency", ["operation"],
+    span="sheets.{operation}")
+SHEET_REFRESHES = Counter(
+    "sheet_snapshot_refreshes", "Sheet snapshot refreshes by outcome", ["sheet", "outcome"])
+SHEET_ROWS = Gauge("sheet_snapshot_rows", "Rows in the current sheet snapshot", ["sheet"])
+ALIGNED_ATTRIBUTES = Counter(
+    "aligned_attributes", "Golden attributes aligned with a scraped product, by how they matched", ["match"])
+
+PEAK_RSS = Gauge("process_peak_resident_memory_bytes", "Peak resident set size of this process")
+
+CACHE_HITS = Counter("cache_hits", "Cache hits", ["cache"])
+CACHE_MISSES = Counter("cache_misses", "Cache misses", ["cache"])
@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+Re-scrape monitor for tracked products: catches price and attribute changes without
+re-running the whole pipeline on pages that didn't change
+- Persistent schedule in SQLite (MONITOR_DB, default backend/monitor.db): tracked products,
+  their last field values and the change log survive restarts
+- Adaptive intervals per product: MONITOR_INTERVAL seconds to start (default 6h), halved after
+  a change down to MONITOR_MIN_INTERVAL (1h), stretched 1.5x after each unchanged check up to
+  MONITOR_MAX_INTERVAL (72h), with +-10% jitter so products added together spread out
+- Section hashing on the raw HTML: each page section (title, pricing, detail bullets, ...) is
+  sliced from its element id to the next known id and hashed before anything is parsed. A page
+  whose hashes all match is done without parsing; otherwise only the amz_scraper fields fed by
+  the changed sections are extracted, with a plan whose narrower allowlist parses less
+- Every MONITOR_FULL_EVERY checks (default 12) a product is fully re-extracted, so changes the
+  section slices can't see (e.g. prices picked up outside the price block) are caught late,
+  not never
+- A failed or crashed check is retried after FAILURE_RETRY_SECONDS (15 min), doubling while the
+  product keeps failing up to MONITOR_MAX_INTERVAL; the error is kept in last_error and the loop
+  moves on to the next product
+- Change log: one row per changed field with a compact diff (dicts: changed / added / removed
+  keys; lists: added / removed items; scalars: [old, new]); the first check only records a
+  baseline. Read it with `changes --since ID` as a feed
+
+Usage: python3 monitor.py add URL [--interval SECONDS]
+       python3 monitor.py remove ASIN | list | run [--once] | changes [--since ID] [--asin ASIN] [--limit N]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+
+import logs
+import scrape_cache
+import serialization
+import tracing
+
+log = logs.get_logger("monitor")
+
+DB_PATH = os.environ.get("MONITOR_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "monitor.db"))
+DEFAULT_INTERVAL = float(os.environ.get("MONITOR_INTERVAL", str(6 * 3600)))
+MIN_INTERVAL = float(os.environ.get("MONITOR_MIN_INTERVAL", "3600"))
+MAX_INTERVAL = float(os.environ.get("MONITOR_MAX_INTERVAL", str(72 * 3600)))
+FULL_EVERY = int(os.environ.get("MONITOR_FULL_EVERY", "12"))
+JITTER = 0.1
+FAILURE_RETRY_SECONDS = 900
+FAILURE_PAUSE_SECONDS = 10
+IDLE_POLL_SECONDS = 60
+
+# (section, element ids it starts at, <script> markers it covers, amz_scraper fields it feeds)
+SECTIONS = (
+    ("title", ("productTitle", "titleSection", "title"), (), ("title",)),
+    ("brand", ("bylineInfo", "brand"), (), ("brand",)),
+    ("pricing", ("corePriceDisplay_desktop_feature_div", "corePrice_feature_div", "apex_desktop",
+                 "priceblock_ourprice", "priceblock_dealprice"), (), ("pricing",)),
+    ("product_facts", ("productFactsDesktopExpander",), (),
+     ("product_facts", "about_this_item", "additional_information", "manufacturing_details")),
+    ("feature_bullets", ("feature-bullets",), (), ("about_this_item", "product_description")),
+    ("description", ("productDescription_feature_div", "productDescription", "descriptionAndDetails"), (),
+     ("product_description",)),
+    ("detail_bullets", ("detailBulletsWrapper_feature_div", "detailBullets_feature_div"), (),
+     ("detail_bullets", "manufacturing_details")),
+    ("tech_spec", ("prodDetails",), (), ("manufacturing_details",)),
+    ("images", ("imageBlock", "landingImage", "altImages"), ("colorImages", "ImageBlockATF"), ("images",)),
+)
+
+# Page areas after the product sections; a slice never runs past one of these
+TAIL_IDS = ("sp_detail", "sims-", "customer-reviews", "reviewsMedley", "cm-cr-dp-review-list", "navFooter")
+
+# Sections whose fields also read selectors from anywhere on the page (pricing's ".a-price-whole"):
+# when the section's ids are missing there is nothing to hash, so the fields are always extracted
+UNANCHORED_ALWAYS = frozenset({"pricing"})
+
+MONITORED_FIELDS = frozenset(field for _, _, _, fields in SECTIONS for field in fields)
+
+_SECTION_OF_ID = {ident: name for name, ids, _, _ in SECTIONS for ident in ids}
+_SECTION_OF_MARKER = {marker: name for name, _, markers, _ in SECTIONS for marker in markers}
+_IDS = re.compile(r'id=["\']([^"\']+)["\']')  # a literal prefix keeps the scan fast; attribute names are checked below
+_SPACE = re.compile(r"\s+")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    host TEXT NOT NULL,
+    asin TEXT NOT NULL,
+    url TEXT NOT NULL,
+    interval_seconds REAL NOT NULL,
+    next_due REAL NOT NULL,
+    last_checked REAL,
+    last_error TEXT,
+    checks INTEGER NOT NULL DEFAULT 0,
+    skipped INTEGER NOT NULL DEFAULT 0,
+    changed INTEGER NOT NULL DEFAULT 0,
+    section_hashes TEXT,
+    PRIMARY KEY (host, asin)
+);
+CREATE INDEX IF NOT EXISTS products_due ON products (next_due);
+CREATE TABLE IF NOT EXISTS field_values (
+    host TEXT NOT NULL,
+    asin TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (host, asin, field)
+);
+CREATE TABLE IF NOT EXISTS changes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    host TEXT NOT NULL,
+    asin TEXT NOT NULL,
+    field TEXT NOT NULL,
+    at REAL NOT NULL,
+    diff TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS changes_asin ON changes (asin, id);
+"""
+
+_db = None
+_db_lock = threading.Lock()
+
+
+def _connect():
+    global _db
+    if _db is None:
+        # timeout: another process (e.g. the reloader's twin) may hold the write lock briefly
+        _db = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None, timeout=30)
+        _db.row_factory = sqlite3.Row
+        _db.execute("PRAGMA journal_mode=WAL")
+        _db.executescript(SCHEMA)
+    return _db
+
+
+# --- SECTION HASHES ---
+
+def section_hashes(html):
+    """
+    {section: short hash} for the sections present on a page; a section's text runs from each of
+    its ids to the next known id (or from each of its script markers to the end of that script),
+    with whitespace collapsed so reformatting alone isn't a change
+    """
+    anchors = []
+    for match in _IDS.finditer(html):
+        ident = match.group(1)
+        if match.start() and html[match.start() - 1].isspace():
+            if ident in _SECTION_OF_ID:
+                anchors.append((match.start(), _SECTION_OF_ID[ident]))
+            elif ident.startswith(TAIL_IDS):
+                anchors.append((match.start(), None))
+    slices = {}
+    for i, (start, name) in enumerate(anchors):
+        if name is not None:
+            end = anchors[i + 1][0] if i + 1 < len(anchors) else len(html)
+            slices.setdefault(name, []).append(html[start:end])
+    for marker, name in _SECTION_OF_MARKER.items():
+        start = html.find(marker)
+        while start >= 0:
+            end = html.find("</script>", start)
+            end = end if end >= 0 else len(html)
+            slices.setdefault(name, []).append(html[start:end])
+            start = html.find(marker, end)
+
+    hashes = {}
+    for name, parts in slices.items():
+        text = _SPACE.sub(" ", "\x00".join(parts))
+        hashes[name] = hashlib.sha1(text.encode("utf-8", "surrogatepass")).hexdigest()[:16]
+    return hashes
+
+
+def fields_to_extract(old_hashes, new_hashes):
+    """amz_scraper fields fed by a section whose hash changed (appearing and disappearing count)"""
+    wanted = set()
+    for name, _, _, fields in SECTIONS:
+        new = new_hashes.get(name)
+        if new != old_hashes.get(name) or (new is None and name in UNANCHORED_ALWAYS):
+            wanted.update(fields)
+    return wanted
+
+
+@lru_cache(maxsize=64)
+def plan_for(fields):
+    """Extraction plan for a frozenset of amz_scraper fields plus the fields they need"""
+    # Loaded on first use so the server's monitor routes don't import bs4 and the field spec
+    import amz_scraper
+    import extraction
+
+    wanted = set(fields)
+    for field in reversed(amz_scraper.FIELDS):
+        if field.name in wanted:
+            wanted.update(field.needs)
+    specs = [field for field in amz_scraper.FIELDS if field.name in wanted]
+    return extraction.compile_plan("amz_scraper", specs)
+
+
+# --- DIFFS ---
+
+def diff(old, new):
+    """Compact description of how a field changed, or None when it didn't"""
+    if old == new:
+        return None
+    if isinstance(old, dict) and isinstance(new, dict):
+        result = {
+            "changed": {key: [old[key], new[key]] for key in old if key in new and old[key] != new[key]},
+            "added": {key: new[key] for key in new if key not in old},
+            "removed": [key for key in old if key not in new],
+        }
+        return {kind: items for kind, items in result.items() if items}
+    if isinstance(old, list) and isinstance(new, list):
+        old_items = [serialization.dumps(item) for item in old]
+        new_items = [serialization.dumps(item) for item in new]
+        result = {
+            "added": [item for item, key in zip(new, new_items) if key not in old_items],
+            "removed": [item for item, key in zip(old, old_items) if key not in new_items],
+        }
+        return {kind: items for kind, items in result.items() if items} or {"reordered": True}
+    return [old, new]
+
+
+# --- SCHEDULE ---
+
+def _jittered(seconds):
+    return seconds * random.uniform(1 - JITTER, 1 + JITTER)
+
+
+def next_interval(interval, changed):
+    if changed:
+        return max(MIN_INTERVAL, interval / 2)
+    return min(MAX_INTERVAL, interval * 1.5)
+
+
+def failure_delay(row):
+    """Seconds until a failed product is retried: doubles the previous wait while it keeps failing"""
+    if row["last_error"] and row["last_checked"]:
+        return min(MAX_INTERVAL, max(FAILURE_RETRY_SECONDS, 2 * (row["next_due"] - row["last_checked"])))
+    return FAILURE_RETRY_SECONDS
+
+
+def track(url, interval=None):
+    """Start (or keep) monitoring a product page; returns its row. Raises ValueError for a URL without an ASIN."""
+    host, asin = scrape_cache.product_key(url)
+    if not re.fullmatch(r"[A-Z0-9]{10}", asin):
+        raise ValueError(f"Not a product URL: {url}")
+    interval = min(MAX_INTERVAL, max(MIN_INTERVAL, float(interval or DEFAULT_INTERVAL)))
+    with _db_lock:
+        db = _connect()
+        db.execute(
+            "INSERT INTO products (host, asin, url, interval_seconds, next_due) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (host, asin) DO UPDATE SET url = excluded.url, interval_seconds = excluded.interval_seconds",
+            (host, asin, url, interval, time.time()))
+        row = db.execute("SELECT * FROM products WHERE host = ? AND asin = ?", (host, asin)).fetchone()
+    log.info("👀 Monitoring %s every %.0fs", asin, interval)
+    return _product(row)
+
+
+def untrack(asin):
+    """Stop monitoring an ASIN (on every host) and drop its values and change log; returns rows removed"""
+    with _db_lock:
+        db = _connect()
+        db.execute("BEGIN")
+        removed = db.execute("DELETE FROM products WHERE asin = ?", (asin,)).rowcount
+        db.execute("DELETE FROM field_values WHERE asin = ?", (asin,))
+        db.execute("DELETE FROM changes WHERE asin = ?", (asin,))
+        db.execute("COMMIT")
+    return removed
+
+
+def _product(row):
+    product = {key: row[key] for key in row.keys() if key != "section_hashes"}
+    product["sections"] = sorted(json.loads(row["section_hashes"] or "{}"))
+    return product
+
+
+def products():
+    with _db_lock:
+        rows = _connect().execute("SELECT * FROM products ORDER BY next_due").fetchall()
+    return [_product(row) for row in rows]
+
+
+def changes(since=0, asin=None, limit=100):
+    """Change log entries after id `since`, oldest first"""
+    query, args = "SELECT * FROM changes WHERE id > ?", [since]
+    if asin:
+        query += " AND asin = ?"
+        args.append(asin)
+    query += " ORDER BY id LIMIT ?"
+    args.append(limit)
+    with _db_lock:
+        rows = _connect().execute(query, args).fetchall()
+    return [{"id": row["id"], "host": row["host"], "asin": row["asin"], "field": row["field"],
+             "at": row["at"], "diff": json.loads(row["diff"])} for row in rows]
+
+
+def due(limit=50, now=None):
+    with _db_lock:
+        return _connect().execute("SELECT * FROM products WHERE next_due <= ? ORDER BY next_due LIMIT ?",
+                                  (now or time.time(), limit)).fetchall()
+
+
+# --- CHECKS ---
+
+def check(row):
+    """Re-scrape one tracked product; returns "baseline", "skipped", "unchanged", "changed" or "failed" """
+    import amz_scraper
+
+    host, asin, url = row["host"], row["asin"], row["url"]
+    now = time.time()
+    with tracing.span("monitor.check", asin=asin) as span:
+        try:
+            html, error = amz_scraper.fetch_page(url)
+        except Exception as e:  # rate_limit.CircuitOpen / PacingTimeout, connection errors
+            html, error = None, {"error": str(e)}
+        if error is not None:
+            log.warning("⚠️ Monitor check of %s failed: %s", asin, error.get("error"))
+            _record_failure(row, error.get("error"), now)
+            span.set(outcome="failed")
+            return "failed"
+
+        old_hashes = json.loads(row["section_hashes"] or "{}")
+        new_hashes = section_hashes(html)
+        full = not old_hashes or (FULL_EVERY > 0 and (row["checks"] + 1) % FULL_EVERY == 0)
+        wanted = set(MONITORED_FIELDS) if full else fields_to_extract(old_hashes, new_hashes)
+
+        field_diffs = {}
+        if wanted:
+            values = plan_for(frozenset(wanted)).run(html, url)
+            with _db_lock:
+                stored = {r["field"]: json.loads(r["value"]) for r in _connect().execute(
+                    "SELECT field, value FROM field_values WHERE host = ? AND asin = ?", (host, asin))}
+            for field in wanted:
+                if field in stored:
+                    change = diff(stored[field], values[field])
+                    if change is not None:
+                        field_diffs[field] = change
+            updates = [(host, asin, field, serialization.dumps(values[field])) for field in wanted
+                       if field not in stored or field in field_diffs]
+        else:
+            updates = []
+
+        if not old_hashes:
+            outcome = "baseline"
+        else:
+            outcome = "changed" if field_diffs else "unchanged" if wanted else "skipped"
+        interval = next_interval(row["interval_seconds"], bool(field_diffs))
+        with _db_lock:
+            db = _connect()
+            db.execute("BEGIN")
+            try:
+                db.executemany("INSERT OR REPLACE INTO field_values (host, asin, field, value) VALUES (?, ?, ?, ?)", updates)
+                db.executemany("INSERT INTO changes (host, asin, field, at, diff) VALUES (?, ?, ?, ?, ?)",
+                               [(host, asin, field, now, serialization.dumps(change)) for field, change in field_diffs.items()])
+                db.execute(
+                    "UPDATE products SET interval_seconds = ?, next_due = ?, last_checked = ?, last_error = NULL, "
+                    "checks = checks + 1, skipped = skipped + ?, changed = changed + ?, section_hashes = ? "
+                    "WHERE host = ? AND asin = ?",
+                    (interval, now + _jittered(interval), now, outcome == "skipped", outcome == "changed",
+                     serialization.dumps(new_hashes), host, asin))
+                db.execute("COMMIT")
+            except sqlite3.Error:
+                db.execute("ROLLBACK")
+                raise
+        span.set(outcome=outcome, fields=len(wanted))
+
+    if field_diffs:
+        log.info("🔔 %s changed: %s", asin, ", ".join(sorted(field_diffs)))
+    else:
+        log.info("💤 %s %s (%d fields re-extracted), next check in %.0fs", asin, outcome, len(wanted), interval)
+    return outcome
+
+
+def _record_failure(row, message, now):
+    """Keep the error and push the product back by failure_delay()"""
+    with _db_lock:
+        _connect().execute(
+            "UPDATE products SET next_due = ?, last_checked = ?, last_error = ?, checks = checks + 1 "
+            "WHERE host = ? AND asin = ?",
+            (now + _jittered(failure_delay(row)), now, message, row["host"], row["asin"]))
+
+
+def _check_safely(row):
+    """check() that never raises: a crash is recorded against the product like a failed fetch.
+    None when even that couldn't be written."""
+    try:
+        return check(row)
+    except Exception as e:  # parser bugs, sqlite errors, anything a page can trigger
+        log.exception("❌ Monitor check of %s crashed: %s", row["asin"], e)
+        message = f"{type(e).__name__}: {e}"
+    try:
+        _record_failure(row, message, time.time())
+    except sqlite3.Error as e:
+        log.error("❌ Could not record the failed check of %s: %s", row["asin"], e)
+        return None
+    return "failed"
+
+
+def run(once=False):
+    """Check due products one at a time (paced by the per-host rate limiter); once=True stops when none are due"""
+    while True:
+        try:
+            rows = due()
+            stuck = None in [_check_safely(row) for row in rows]
+        except sqlite3.Error as e:
+            log.error("❌ Could not read the monitor schedule: %s", e)
+            rows, stuck = [], True
+        if stuck:
+            # The database is refusing writes: the same rows are still due, so don't spin on them
+            time.sleep(FAILURE_PAUSE_SECONDS)
+            continue
+        if rows:
+            continue
+        if once:
+            return
+        try:
+            with _db_lock:
+                next_due = _connect().execute("SELECT MIN(next_due) FROM products").fetchone()[0]
+        except sqlite3.Error:
+            next_due = None
+        time.sleep(min(IDLE_POLL_SECONDS, max(1.0, (next_due or 0) - time.time())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("add", help="start monitoring a product URL")
+    add.add_argument("url")
+    add.add_argument("--interval", type=float, help="starting interval in seconds")
+    remove = commands.add_parser("remove", help="stop monitoring an ASIN")
+    remove.add_argument("asin")
+    commands.add_parser("list", help="print the tracked products")
+    run_parser = commands.add_parser("run", help="check products as they fall due")
+    run_parser.add_argument("--once", action="store_true", help="stop when nothing is due")
+    feed = commands.add_parser("changes", help="print the change log")
+    feed.add_argument("--since", type=int, default=0, help="only entries after this id")
+    feed.add_argument("--asin")
+    feed.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    if args.command == "add":
+        try:
+            print(serialization.dumps(track(args.url, args.interval), pretty=True))
+        except ValueError as e:
+            parser.error(str(e))
+    elif args.command == "remove":
+        print(serialization.dumps({"removed": untrack(args.asin)}))
+    elif args.command == "list":
+        print(serialization.dumps(products(), pretty=True))
+    elif args.command == "run":
+        run(once=args.once)
+    else:
+        print(serialization.dumps(changes(args.since, args.asin, args.limit), pretty=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Monitor blueprint: track products for scheduled re-scrapes and read the change feed
+- POST /api/monitor/track {"url": "...", "interval": seconds} starts monitoring a product
+- DELETE /api/monitor/products/<asin> stops it
+- GET /api/monitor/products lists tracked products with their schedule and check counts
+- GET /api/monitor/changes?since=<id>&asin=&limit= returns change log entries after an id,
+  oldest first; pass the last id back as since= to poll it as a feed
+- The checks themselves run in `python3 monitor.py run`, outside the server
+"""
+
+from flask import Blueprint, request, jsonify
+
+import logs
+import monitor
+from executors import run_in_pool
+
+monitor_bp = Blueprint("monitor", __name__)
+log = logs.get_logger("monitor")
+
+MAX_CHANGES = 1000
+
+
+@monitor_bp.route("/api/monitor/track", methods=["POST"])
+@run_in_pool("monitor")
+def track_product():
+    data = request.get_json(silent=True) or {}
+    url = data.get("url")
+    interval = data.get("interval")
+    if not isinstance(url, str) or not url:
+        return jsonify({"success": False, "error": "URL is required"}), 400
+    if interval is not None and (not isinstance(interval, (int, float)) or interval <= 0):
+        return jsonify({"success": False, "error": "interval must be a positive number of seconds"}), 400
+    try:
+        product = monitor.track(url, interval)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    return jsonify({"success": True, "product": product})
+
+
+@monitor_bp.route("/api/monitor/products/<asin>", methods=["DELETE"])
+@run_in_pool("monitor")
+def untrack_product(asin):
+    removed = monitor.untrack(asin)
+    if not removed:
+        return jsonify({"success": False, "error": f"{asin} is not monitored"}), 404
+    return jsonify({"success": True, "removed": removed})
+
+
+@monitor_bp.route("/api/monitor/products")
+@run_in_pool("monitor")
+def tracked_products():
+    return jsonify({"success": True, "products": monitor.products()})
+
+
+@monitor_bp.route("/api/monitor/changes")
+@run_in_pool("monitor")
+def change_feed():
+    since = request.args.get("since", default=0, type=int)
+    limit = min(request.args.get("limit", default=100, type=int), MAX_CHANGES)
+    entries = monitor.changes(since, request.args.get("asin"), limit)
+    return jsonify({"success": True, "changes": entries, "last": entries[-1]["id"] if entries else since})
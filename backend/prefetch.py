@@ -0,0 +1,142 @@
+"""
+Speculative prefetch of a scraped product's variants and related products
+- Off unless SCRAPE_PREFETCH=1. After an interactive scrape, the variant ASINs and carousel
+  ASINs scraper.py found on the page are queued and scraped in the background into
+  scrape_cache (and amz_scraper results into the catalog, like an interactive scrape), so the
+  user's next scrape of a sibling is answered from memory
+- Low priority: one background thread, which only takes a scrape worker while at least
+  PREFETCH_MIN_IDLE workers (at most all of them) are idle; the shared per-host rate limiter paces it together
+  with every interactive scrape, so it never adds to the request budget
+- Capped: PREFETCH_PER_PAGE ASINs per page (variants first), PREFETCH_DEPTH hops from the
+  page the user scraped (default 1: neighbours only), PREFETCH_QUEUE queued products
+- A failed prefetch pauses prefetching for PREFETCH_BACKOFF seconds (blocks, CAPTCHAs)
+"""
+
+import os
+import queue
+import threading
+import time
+
+import logs
+import metrics
+import scrape_cache
+import scrape_service
+import tracing
+
+log = logs.get_logger("prefetch")
+
+ENABLED = os.environ.get("SCRAPE_PREFETCH", "0") == "1"
+PER_PAGE = int(os.environ.get("PREFETCH_PER_PAGE", "5"))
+MAX_DEPTH = int(os.environ.get("PREFETCH_DEPTH", "1"))
+MAX_QUEUED = int(os.environ.get("PREFETCH_QUEUE", "50"))
+MIN_IDLE = int(os.environ.get("PREFETCH_MIN_IDLE", "2"))
+BACKOFF_SECONDS = float(os.environ.get("PREFETCH_BACKOFF", "120"))
+JOB_TIMEOUT = 90
+IDLE_POLL_SECONDS = 0.5
+
+JOBS = ("scraper", "amz_scraper")
+
+_queue = queue.Queue(maxsize=MAX_QUEUED)
+_pending = set()  # product keys queued or running
+_pending_lock = threading.Lock()
+_thread = None
+_thread_lock = threading.Lock()
+_paused_until = 0.0
+
+
+def neighbours(data):
+    """Variant then related ASINs from one scraper.py result, without the page's own ASIN"""
+    asins = [variant["asin"] for variant in ((data.get("variants") or {}).get("variants") or [])]
+    asins += data.get("relatedAsins") or []
+    own = data.get("asin")
+    return [asin for asin in dict.fromkeys(asins) if asin != own]
+
+
+def after_scrape(url, data, depth=0):
+    """Queue the neighbours of a scraped page; returns how many were queued"""
+    if not ENABLED or depth >= MAX_DEPTH or not isinstance(data, dict) or not data.get("success"):
+        return 0
+    queued = 0
+    for asin in neighbours(data):
+        if queued >= PER_PAGE:
+            break
+        target = scrape_cache.product_url(url, asin)
+        key = scrape_cache.product_key(target)
+        if all(scrape_cache.has(job, target) for job in JOBS):
+            continue
+        with _pending_lock:
+            if key in _pending:
+                continue
+            try:
+                _queue.put_nowait((target, depth + 1))
+            except queue.Full:
+                metrics.PREFETCH_JOBS.inc(outcome="dropped")
+                break
+            _pending.add(key)
+        queued += 1
+    if queued:
+        metrics.PREFETCH_JOBS.inc(queued, outcome="queued")
+        _start()
+    return queued
+
+
+def _start():
+    global _thread
+    with _thread_lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_run_forever, name="prefetch", daemon=True)
+            _thread.start()
+
+
+def _wait_for_capacity():
+    """Block until prefetching is not paused and enough scrape workers are idle"""
+    while True:
+        pool_stats = scrape_service.stats()
+        if (time.monotonic() >= _paused_until and pool_stats
+                and pool_stats["idle"] >= min(MIN_IDLE, pool_stats["workers"])):
+            return
+        time.sleep(IDLE_POLL_SECONDS)
+
+
+def _prefetch(url, depth):
+    global _paused_until
+    scraper_data = None
+    with tracing.span("prefetch", url=url, depth=depth):
+        for job in JOBS:
+            if scrape_cache.has(job, url):
+                continue
+            _wait_for_capacity()
+            try:
+                data = scrape_service.run(job, url, JOB_TIMEOUT)
+            except (scrape_service.ScrapeTimeout, scrape_service.ScrapeFailed) as e:
+                data = {"success": False, "error": str(e)}
+            if not data.get("success"):
+                _paused_until = time.monotonic() + BACKOFF_SECONDS
+                metrics.PREFETCH_JOBS.inc(outcome="failed")
+                log.warning("⏸️ Prefetch of %s failed (%s); pausing for %ds", url, data.get("error"), BACKOFF_SECONDS)
+                return
+            scrape_service.keep(job, url, data, source="prefetch")
+            if job == "scraper":
+                scraper_data = data
+    metrics.PREFETCH_JOBS.inc(outcome="done")
+    log.info("🔮 Prefetched %s (depth %d)", url, depth)
+    if scraper_data is not None:
+        after_scrape(url, scraper_data, depth)
+
+
+def _run_forever():
+    while True:
+        url, depth = _queue.get()
+        try:
+            _prefetch(url, depth)
+        except Exception as e:
+            log.exception("❌ Prefetch of %s crashed: %s", url, e)
+        finally:
+            with _pending_lock:
+                _pending.discard(scrape_cache.product_key(url))
+
+
+def stats():
+    return {"enabled": ENABLED, "queued": _queue.qsize(),
+            "paused_seconds": round(max(0.0, _paused_until - time.monotonic()), 1),
+            "cache": scrape_cache.results.stats()}
@@ -0,0 +1,207 @@
+"""
+Adaptive per-host request pacing shared by every scrape in the process
+- One token bucket per host: its rate climbs additively while responses come back clean and
+  is cut multiplicatively on a block signal (503 / 429 / CAPTCHA page)
+- BREAKER_THRESHOLD block signals in a row open a circuit breaker: nothing is sent to the
+  host for a cool-down, then a single probe goes out; a clean probe closes the breaker, a
+  blocked one reopens it with twice the cool-down. A probe whose outcome is never recorded
+  (its worker was killed, it crashed) is given up on after a cool-down and another goes out
+- A caller that would have to wait longer than its max_wait gets CircuitOpen instead, or
+  PacingTimeout when the breaker is closed and the wait is only the host's queue of requests
+- Scrape worker processes delegate acquire() / record() to the server process (delegate()),
+  so a host has one bucket and one breaker however many processes scrape it
+- Rates are requests per second; override the defaults with SCRAPE_RATE, SCRAPE_RATE_MIN,
+  SCRAPE_RATE_MAX and SCRAPE_BREAKER_COOLDOWN
+"""
+
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+import logs
+import metrics
+
+log = logs.get_logger("rate_limit")
+
+INITIAL_RATE = float(os.environ.get("SCRAPE_RATE", "1"))
+MIN_RATE = float(os.environ.get("SCRAPE_RATE_MIN", "0.05"))
+MAX_RATE = float(os.environ.get("SCRAPE_RATE_MAX", "4"))
+# Additive increase per clean response, multiplicative decrease per block signal
+RATE_STEP = 0.25
+BACKOFF = 0.5
+# Tokens a quiet host accumulates, i.e. how many requests may go out back to back
+BURST = 2
+
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN = float(os.environ.get("SCRAPE_BREAKER_COOLDOWN", "30"))
+MAX_COOLDOWN = 600
+
+OK, BLOCKED, ERROR = "ok", "blocked", "error"
+
+
+class CircuitOpen(Exception):
+    """The host's breaker is open for longer than the caller is willing to wait"""
+
+    def __init__(self, host, retry_after):
+        super().__init__(f"{host} is blocking requests, retry in {retry_after:.0f}s")
+        self.host = host
+        self.retry_after = retry_after
+
+
+class PacingTimeout(Exception):
+    """The host is reachable, but this request would queue behind others for longer than the caller will wait"""
+
+    def __init__(self, host, retry_after):
+        super().__init__(f"{host} has too many requests queued, retry in {retry_after:.0f}s")
+        self.host = host
+        self.retry_after = retry_after
+
+
+class HostLimiter:
+    """Token bucket plus circuit breaker for one host"""
+
+    def __init__(self, host, rate=None, min_rate=None, max_rate=None, cooldown=None, clock=time.monotonic):
+        self.host = host
+        self.rate = INITIAL_RATE if rate is None else rate
+        self.min_rate = MIN_RATE if min_rate is None else min_rate
+        self.max_rate = MAX_RATE if max_rate is None else max_rate
+        self.base_cooldown = BREAKER_COOLDOWN if cooldown is None else cooldown
+        self.cooldown = self.base_cooldown
+        self.state = "closed"  # closed -> open -> half_open -> closed / open
+        self.blocked_in_a_row = 0
+        self._clock = clock
+        self._tokens = float(BURST)
+        self._updated = clock()
+        self._open_until = 0.0
+        self._probing = False
+        self._probe_until = 0.0
+        self._lock = threading.Lock()
+        metrics.SCRAPE_RATE.set(self.rate, host=host)
+
+    def _take(self):
+        """Take a token now (0) or say how long to wait before trying again"""
+        now = self._clock()
+        self._tokens = min(BURST, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+        if self.state == "open":
+            if now < self._open_until:
+                return self._open_until - now
+            self.state = "half_open"
+        if self.state == "half_open" and self._probing:
+            if now < self._probe_until:
+                return min(self.cooldown / 10, self._probe_until - now)  # wait for the probe's verdict
+            self._probing = False  # the probe never reported back; send another
+
+        if self._tokens < 1:
+            return (1 - self._tokens) / self.rate
+        self._tokens -= 1
+        if self.state == "half_open":
+            self._probing = True
+            self._probe_until = now + self.cooldown
+        return 0.0
+
+    def acquire(self, max_wait=None):
+        """Block until a request may go out; returns the seconds waited"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                delay = self._take()
+                state = self.state
+            if delay <= 0:
+                if waited:
+                    metrics.RATE_LIMIT_WAIT_SECONDS.observe(waited, host=self.host)
+                return waited
+            if max_wait is not None and waited + delay > max_wait:
+                if state == "closed":
+                    raise PacingTimeout(self.host, delay)
+                raise CircuitOpen(self.host, delay)
+            time.sleep(delay)
+            waited += delay
+
+    def record(self, outcome):
+        """Feed back how a request went: OK, BLOCKED, or ERROR (network trouble, no rate change)"""
+        with self._lock:
+            if outcome == OK:
+                self.blocked_in_a_row = 0
+                self.rate = min(self.max_rate, self.rate + RATE_STEP)
+                if self.state == "half_open":
+                    self._close()
+            elif outcome == BLOCKED:
+                self.blocked_in_a_row += 1
+                self.rate = max(self.min_rate, self.rate * BACKOFF)
+                self._tokens = min(self._tokens, 0.0)
+                if self.state == "half_open":
+                    self._open(min(MAX_COOLDOWN, self.cooldown * 2))
+                elif self.state == "closed" and self.blocked_in_a_row >= BREAKER_THRESHOLD:
+                    self._open(self.cooldown)
+            elif self.state == "half_open":
+                self._probing = False  # the probe told us nothing; let another one go
+            metrics.SCRAPE_RATE.set(self.rate, host=self.host)
+
+    def _open(self, cooldown):
+        self.state, self.cooldown, self._probing = "open", cooldown, False
+        self._open_until = self._clock() + cooldown
+        metrics.BREAKER_OPENS.inc(host=self.host)
+        log.warning("🚧 %s keeps blocking us, pausing requests for %.0fs (rate now %.2f/s)",
+                    self.host, cooldown, self.rate)
+
+    def _close(self):
+        self.state, self.cooldown, self._probing = "closed", self.base_cooldown, False
+        log.info("✅ %s answered the probe, resuming at %.2f requests/s", self.host, self.rate)
+
+    def snapshot(self):
+        with self._lock:
+            return {"rate": round(self.rate, 3), "state": self.state, "blocked_in_a_row": self.blocked_in_a_row}
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+_delegate = None
+
+
+def delegate(call):
+    """Send this process's acquire() / record() to call(kind, url, arg) instead of pacing here"""
+    global _delegate
+    _delegate = call
+
+
+def host_of(url):
+    return urlparse(url).netloc.lower()
+
+
+def for_url(url):
+    """The shared limiter for a URL's host"""
+    host = host_of(url)
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = _limiters[host] = HostLimiter(host)
+        return limiter
+
+
+def acquire(url, max_wait=None):
+    if _delegate is not None:
+        return _delegate("acquire", url, max_wait)
+    return for_url(url).acquire(max_wait)
+
+
+def record(url, outcome):
+    if _delegate is not None:
+        _delegate("record", url, outcome)
+        return
+    for_url(url).record(outcome)
+
+
+def snapshot():
+    """{host: {rate, state, blocked_in_a_row}} for every host seen so far"""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.host: limiter.snapshot() for limiter in limiters}
+
+
+def reset():
+    """Forget every host's state (benchmarks)"""
+    with _limiters_lock:
+        _limiters.clear()
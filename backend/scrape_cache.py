@@ -0,0 +1,111 @@
+"""
+Scrape result cache shared by interactive scrapes and the prefetcher
+- Successful scraper / amz_scraper results keyed by (job, host, ASIN), so /dp/, /gp/product/
+  and tracking-parameter variants of one product share an entry
+- LRU bounded at SCRAPE_CACHE_SIZE entries (default 256), each kept SCRAPE_CACHE_TTL seconds
+  (default 900); SCRAPE_CACHE_SIZE=0 turns it off
+- Entries remember whether the prefetcher stored them, so prefetch hits can be counted
+"""
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+import metrics
+
+SIZE = int(os.environ.get("SCRAPE_CACHE_SIZE", "256"))
+TTL_SECONDS = float(os.environ.get("SCRAPE_CACHE_TTL", "900"))
+
+_ASIN_IN_PATH = re.compile(r"/(?:dp|gp/product|gp/aw/d)/([A-Z0-9]{10})(?:[/?]|$)")
+
+
+def product_key(url):
+    """(host, ASIN) for a product URL, or (host, path) when it has no ASIN"""
+    parsed = urlparse(url)
+    host = parsed.netloc.lower()
+    match = _ASIN_IN_PATH.search(parsed.path + "/")
+    return host, match.group(1) if match else parsed.path
+
+
+def product_url(page_url, asin):
+    """/dp/ URL of another product on the same site as page_url"""
+    parsed = urlparse(page_url)
+    return f"{parsed.scheme or 'https'}://{parsed.netloc}/dp/{asin}"
+
+
+class TTLCache:
+    """LRU map whose entries also expire; get() records hits and misses under `name`"""
+
+    def __init__(self, name, size=SIZE, ttl=TTL_SECONDS):
+        self.name = name
+        self.size = size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, value, source)
+        self._lock = threading.Lock()
+
+    def _live(self, key):
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+        return entry
+
+    def get(self, key):
+        """(value, source) or None"""
+        with self._lock:
+            entry = self._live(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        metrics.record_cache(self.name, entry is not None)
+        return entry[1:] if entry is not None else None
+
+    def contains(self, key):
+        """Whether a live entry exists, without counting a lookup"""
+        with self._lock:
+            return self._live(key) is not None
+
+    def put(self, key, value, source="scrape"):
+        if self.size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value, source)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            sources = [entry[2] for entry in self._entries.values()]
+        return {"entries": len(sources), "prefetched": sources.count("prefetch"),
+                "size": self.size, "ttl_seconds": self.ttl}
+
+
+results = TTLCache("scrape_results")
+
+
+def get(job, url):
+    """A cached result for one scraper job on this product, or None"""
+    entry = results.get((job,) + product_key(url))
+    if entry is None:
+        return None
+    value, source = entry
+    if source == "prefetch":
+        metrics.PREFETCH_HITS.inc(job=job)
+    return value
+
+
+def has(job, url):
+    return results.contains((job,) + product_key(url))
+
+
+def put(job, url, value, source="scrape"):
+    """Cache a successful result (failures are never cached)"""
+    if isinstance(value, dict) and value.get("success"):
+        results.put((job,) + product_key(url), value, source)
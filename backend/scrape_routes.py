@@ -0,0 +1,184 @@
+"""
+Scrape blueprint: dual scraper integration
+- amz_scraper.py supplies images, scraper.py supplies text and details (same merge as server.js)
+- Both run on the warm worker processes in scrape_service.py, not as fresh CLI processes
+- "fields" in the body or query string trims the response (e.g. "-raw"; see serialization.py)
+- Results are served from scrape_cache when a recent scrape or the prefetcher already has
+  them; "fresh": true in the body skips the cache
+- Fresh amz_scraper results are added to the product catalog (catalog.py)
+"""
+
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from flask import Blueprint, request, jsonify
+
+import logs
+import prefetch
+import scrape_cache
+import scrape_service
+import tracing
+from executors import get_pool, run_in_pool
+from serialization import select_fields
+
+scrape_bp = Blueprint("scrape", __name__)
+log = logs.get_logger("scrape")
+
+SCRAPE_TIMEOUT = 90  # seconds per scraper job
+
+# One thread per scrape view thread, to wait on the second scraper's job
+_dispatch = ThreadPoolExecutor(max_workers=get_pool("scrape").max_workers, thread_name_prefix="scrape-dispatch")
+
+
+def normalize_amazon_url(url):
+    """Add a scheme if missing; return None if it is not an Amazon URL"""
+    url = (url or "").strip()
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+        log.info("🔧 Fixed URL scheme: %s", url)
+    if 'amazon.' not in url:
+        return None
+    return url
+
+
+def _run_job(job, url, fresh=False):
+    """(data, error) for one scraper run on the warm workers, or from the scrape cache"""
+    if not fresh:
+        cached = scrape_cache.get(job, url)
+        if cached is not None:
+            return cached, None
+    # The server side of the job: waiting for a worker, pacing round trips, the worker's own spans
+    with tracing.span(f"scrape.{job}", url=url) as span:
+        try:
+            data = scrape_service.run(job, url, SCRAPE_TIMEOUT)
+        except (scrape_service.ScrapeTimeout, scrape_service.ScrapeFailed) as e:
+            span.set(outcome="failed", error=str(e))
+            return None, str(e)
+    scrape_service.keep(job, url, data)
+    return data, None
+
+
+def run_scrapers(url, fresh=False):
+    """Run both scrapers in parallel; return ((scraper_data, error), (amz_data, error))"""
+    # The image scraper's job is dispatched from another thread, inside this request's trace
+    amz = _dispatch.submit(contextvars.copy_context().run, _run_job, "amz_scraper", url, fresh)
+    return _run_job("scraper", url, fresh), amz.result()
+
+
+def format_details_as_array(details):
+    if not details or not isinstance(details, dict):
+        return []
+    return [
+        {"label": key.strip(), "value": value}
+        for key, value in details.items()
+        if key and value and key != "status"
+    ]
+
+
+def get_about_this_item(scraper_data, amz_data):
+    """Prefer scraper.py bullets, then amz_scraper bullets"""
+    if scraper_data and scraper_data.get("bullets"):
+        return scraper_data["bullets"]
+    amz_bullets = ((amz_data or {}).get("product") or {}).get("aboutThisItem")
+    if amz_bullets:
+        return amz_bullets
+    raw_bullets = ((scraper_data or {}).get("raw") or {}).get("bullets")
+    if raw_bullets:
+        return raw_bullets
+    return ['No "About this item" information available.']
+
+
+def merge_scrape_results(scraper_data, amz_data, scraper_error=None, amz_error=None):
+    """Merge both scraper outputs into the response shape the frontend expects"""
+    if not scraper_data and not amz_data:
+        return {
+            "success": False,
+            "error": "Please try again. Unable to load product information from Amazon.",
+            "userMessage": "The product page could not be loaded. Please check the URL and try again in a few moments.",
+            "technicalDetails": {
+                "scraperError": scraper_error,
+                "amzScraperError": amz_error,
+                "timestamp": datetime.utcnow().isoformat() + "Z"
+            }
+        }
+
+    scraper_data = scraper_data or {}
+    amz_product = (amz_data or {}).get("product") or {}
+    images = amz_product.get("images") or scraper_data.get("images") or []
+    bullets = get_about_this_item(scraper_data, amz_data)
+
+    merged = {
+        "success": True,
+        "warnings": [],
+        "product": {
+            "title": scraper_data.get("title") or amz_product.get("title") or "N/A",
+            "description": scraper_data.get("description") or amz_product.get("description") or "N/A",
+            "images": images,
+            "aboutThisItem": bullets,
+            "asin": scraper_data.get("asin") or "N/A"
+        },
+        "details": {
+            "featureBullets": bullets,
+            "productDetails": format_details_as_array(scraper_data.get("productDetails")),
+            "manufacturingDetails": format_details_as_array(scraper_data.get("manufacturingDetails")),
+            "additionalInfo": format_details_as_array(scraper_data.get("additionalInfo"))
+        },
+        "raw": {
+            "productDetails": scraper_data.get("productDetails") or {},
+            "manufacturingDetails": scraper_data.get("manufacturingDetails") or {},
+            "additionalInfo": scraper_data.get("additionalInfo") or {},
+            "bullets": scraper_data.get("bullets") or [],
+            "amzScraperBullets": amz_product.get("aboutThisItem") or []
+        }
+    }
+
+    if scraper_data.get("variants"):
+        merged["variants"] = scraper_data["variants"]
+
+    if scraper_error:
+        merged["warnings"].append("Text scraper failed - data may be incomplete")
+    if amz_error:
+        merged["warnings"].append("Image scraper failed - using fallback images")
+    return merged
+
+
+@scrape_bp.route("/api/scrape-product", methods=["POST"])
+@run_in_pool("scrape")
+def scrape_product():
+    data = request.get_json(silent=True) or {}
+    if not data.get("url"):
+        return jsonify({"success": False, "error": "URL is required"}), 400
+    url = normalize_amazon_url(data.get("url"))
+    if not url:
+        return jsonify({
+            "success": False,
+            "error": "Please provide a valid Amazon product URL",
+            "userMessage": "The URL must be from Amazon.in or Amazon.com"
+        }), 400
+
+    log.info("🔍 Starting dual scraping for URL: %s", url)
+    try:
+        (scraper_data, scraper_error), (amz_data, amz_error) = run_scrapers(url, fresh=bool(data.get("fresh")))
+        prefetch.after_scrape(url, scraper_data)
+        log.info("📊 scraper.py: %s, amz_scraper.py: %s",
+                 "✅ SUCCESS" if scraper_data else "❌ FAILED", "✅ SUCCESS" if amz_data else "❌ FAILED")
+        merged = merge_scrape_results(scraper_data, amz_data, scraper_error, amz_error)
+        return jsonify(select_fields(merged, data.get("fields") or request.args.get("fields")))
+    except Exception as e:
+        log.exception("❌ Scraping error: %s", e)
+        return jsonify({
+            "success": False,
+            "error": "Please try again. Unable to process the product page.",
+            "userMessage": "An unexpected error occurred while loading the product. Please try again.",
+            "technicalDetails": {
+                "message": str(e),
+                "timestamp": datetime.utcnow().isoformat() + "Z"
+            }
+        })
+
+
+@scrape_bp.route("/api/scrape-product/cache", methods=["GET"])
+def scrape_cache_status():
+    """Scrape cache size and prefetch queue state"""
+    return jsonify(prefetch.stats())
@@ -0,0 +1,282 @@
+"""
+Warm scraper workers for the scrape blueprint
+- Both scrapers run as imported functions in long-lived worker processes that import
+  scraper / amz_scraper (requests, bs4, compiled extraction plans) once, when they start
+- Each call has its own timeout; a worker that overruns it or dies is killed and replaced
+  without touching the other workers or their jobs
+- SCRAPER_PROCESSES workers (default 4); each is retired after SCRAPER_PROCESS_MAX_JOBS jobs
+  (default 50) to contain leaks
+- Jobs carry the caller's trace context, so worker spans join the request's trace; each result
+  comes back with the job's metric updates and finished spans, which run() merges into the
+  server's /metrics and attaches under the dispatching span (the slow-trace view sees them)
+- Workers pace Amazon through the server's rate limiter: while a job runs, its worker asks the
+  pool over the job's pipe before each request and reports each outcome, so every worker (and
+  the monitor, which scrapes in the server) shares one bucket and one breaker per host
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+import logs
+import catalog
+import metrics
+import rate_limit
+import scrape_cache
+import tracing
+from serialization import select_fields
+
+log = logs.get_logger("scrape_service")
+
+# SCRAPE_WORKERS already sizes the scrape blueprint's thread pool (executors.py)
+WORKERS = int(os.environ.get("SCRAPER_PROCESSES", "4"))
+MAX_JOBS_PER_WORKER = int(os.environ.get("SCRAPER_PROCESS_MAX_JOBS", "50"))
+
+
+class ScrapeTimeout(Exception):
+    pass
+
+
+class ScrapeFailed(Exception):
+    pass
+
+
+# --- WORKER PROCESS ---
+
+def _scrape_text(url):
+    import scraper
+    return scraper.scrape_amazon(url)
+
+
+def _scrape_images(url):
+    # `amz_scraper.py <url> --formatted` minus the raw copy, which the merge never reads
+    import amz_scraper
+    return select_fields(amz_scraper.format_scraped_data(amz_scraper.scrape_amazon(url)), "-raw")
+
+
+JOBS = {
+    "scraper": _scrape_text,
+    "amz_scraper": _scrape_images,
+}
+
+
+def _pacer(conn):
+    """rate_limit delegate that asks the pool's process over the job pipe"""
+    import rate_limit
+
+    lock = threading.Lock()
+
+    def call(kind, url, arg):
+        with lock:
+            conn.send((kind, url, arg))
+            if kind != "acquire":
+                return None
+            waited, refusal = conn.recv()
+        if refusal is not None:
+            error, retry_after = refusal  # "CircuitOpen" or "PacingTimeout"
+            raise getattr(rate_limit, error)(rate_limit.host_of(url), retry_after)
+        return waited
+
+    return call
+
+
+def _worker_main(conn):
+    import amz_scraper  # noqa: F401  (pay the imports before the first job)
+    import cleaners
+    import rate_limit
+    import scraper  # noqa: F401
+
+    cleaners.preseed()
+    rate_limit.delegate(_pacer(conn))
+    metrics.drain()  # start-up work isn't any job's
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        if message is None:
+            return
+        job, url, context = message
+        root = None
+        try:
+            with tracing.continued(f"{job}.worker", context, url=url) as root:
+                outcome = (True, JOBS[job](url))
+        except Exception as e:
+            log.exception("❌ %s job failed: %s", job, e)
+            outcome = (False, f"{type(e).__name__}: {e}")
+        telemetry = {"metrics": metrics.drain(), "span": tracing.to_dict(root) if root is not None else None}
+        reply = ("done",) + outcome + (telemetry,)
+        try:
+            conn.send(reply)
+        except (BrokenPipeError, OSError):
+            return
+
+
+# --- POOL ---
+
+class _Worker:
+    def __init__(self, context, index):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,),
+                                       name=f"scrape-worker-{index}", daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+
+    def stop(self):
+        """Ask the worker to exit after it finishes; it is idle whenever this is called"""
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.conn.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+
+def _pace(conn, kind, message, deadline):
+    """Serve a worker's rate_limit call with this process's limiters"""
+    url, arg = message
+    if kind == "record":
+        rate_limit.record(url, arg)
+        return
+    # A worker never waits past its job's deadline
+    remaining = max(0.0, deadline - time.monotonic())
+    try:
+        reply = (rate_limit.acquire(url, remaining if arg is None else min(arg, remaining)), None)
+    except (rate_limit.CircuitOpen, rate_limit.PacingTimeout) as e:
+        reply = (None, (type(e).__name__, e.retry_after))
+    conn.send(reply)
+
+
+class WorkerPool:
+    """Fixed set of warm worker processes; each job runs on one idle worker"""
+
+    def __init__(self, size=WORKERS, max_jobs=MAX_JOBS_PER_WORKER):
+        self.size = size
+        self.max_jobs = max_jobs
+        # spawn, not fork: the server has logging, tracing and pool threads a fork would copy mid-flight
+        self._context = multiprocessing.get_context("spawn")
+        self._spawned = 0
+        self._spawn_lock = threading.Lock()
+        self._idle = queue.Queue()
+        for _ in range(size):
+            self._idle.put(self._spawn())
+
+    def _spawn(self):
+        with self._spawn_lock:
+            self._spawned += 1
+            index = self._spawned
+        return _Worker(self._context, index)
+
+    def run(self, job, url, timeout):
+        """Run one scrape job; raises ScrapeTimeout or ScrapeFailed"""
+        deadline = time.monotonic() + timeout
+        try:
+            worker = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            metrics.SCRAPE_JOBS.inc(job=job, outcome="no_worker")
+            raise ScrapeTimeout(f"{job}: no scrape worker free within {timeout}s")
+
+        outcome = "crashed"
+        try:
+            worker.conn.send((job, url, tracing.propagation_env()))
+            while True:
+                if not worker.conn.poll(max(0.0, deadline - time.monotonic())):
+                    outcome = "timeout"
+                    raise ScrapeTimeout(f"{job} timed out after {timeout}s")
+                kind, *message = worker.conn.recv()
+                if kind == "done":
+                    break
+                _pace(worker.conn, kind, message, deadline)
+            ok, value, telemetry = message
+            outcome = "ok" if ok else "error"
+            metrics.merge(telemetry["metrics"])
+            tracing.adopt(telemetry["span"])
+        except (EOFError, OSError) as e:
+            raise ScrapeFailed(f"{job} worker exited unexpectedly: {e}")
+        finally:
+            worker.jobs += 1
+            metrics.SCRAPE_JOBS.inc(job=job, outcome=outcome)
+            self._idle.put(self._replace(worker, outcome))
+
+        if not ok:
+            raise ScrapeFailed(f"{job} failed: {value}")
+        return value
+
+    def _replace(self, worker, outcome):
+        """The worker to put back in the pool after a job"""
+        if outcome in ("timeout", "crashed"):
+            log.warning("🔪 Replacing scrape worker %s after a %s job", worker.process.name, outcome)
+            worker.kill()
+            metrics.SCRAPE_WORKER_RESTARTS.inc(reason=outcome)
+            return self._spawn()
+        if worker.jobs >= self.max_jobs:
+            log.info("♻️ Recycling scrape worker %s after %d jobs", worker.process.name, worker.jobs)
+            worker.stop()
+            metrics.SCRAPE_WORKER_RESTARTS.inc(reason="recycled")
+            return self._spawn()
+        return worker
+
+    def shutdown(self):
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            worker.stop()
+            worker.process.join(timeout=5)
+
+    def stats(self):
+        return {"workers": self.size, "idle": self._idle.qsize(), "spawned": self._spawned,
+                "max_jobs_per_worker": self.max_jobs}
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """The process-wide worker pool, started on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            log.info("🔥 Starting %d scrape workers", WORKERS)
+            _pool = WorkerPool()
+        return _pool
+
+
+def warm_up():
+    """Start the workers now so the first scrape doesn't pay their imports"""
+    get_pool()
+
+
+def run(job, url, timeout):
+    return get_pool().run(job, url, timeout)
+
+
+def keep(job, url, data, source="scrape"):
+    """Where every fresh result goes: the scrape cache, and for amz_scraper the product catalog"""
+    scrape_cache.put(job, url, data, source)
+    if job == "amz_scraper":
+        catalog.record(data, url)
+
+
+def stats():
+    """Worker counts, or None before the pool has started"""
+    pool = _pool
+    return pool.stats() if pool is not None else None
+
+
+def shutdown():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
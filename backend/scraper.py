@@ -5,20 +5,35 @@ Amazon Scraper for Web Interface
 - Enhanced with anti-blocking techniques
 """
 
+import argparse
 import requests
-from bs4 import BeautifulSoup
-import sys
 import re
 import json
-import time
-import random
+import logging
+from urllib.parse import urlparse
+
+import extraction
+import fetcher
+import image_data
+import jsonl_serve
+import logs
+import metrics
+import rate_limit
+import serialization
+import tracing
+import variations
+from cleaners import normalize_spaces
+from extraction import FieldSpec, text_of
+from serialization import select_fields
+
+log = logs.get_logger("scraper")
 
 # Enhanced headers to mimic real browser behavior
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
     "Accept-Language": "en-US,en;q=0.9,hi;q=0.8",
-    "Accept-Encoding": "gzip, deflate, br",
+    "Accept-Encoding": fetcher.ACCEPT_ENCODING,
     "Connection": "keep-alive",
     "Upgrade-Insecure-Requests": "1",
     "Sec-Fetch-Dest": "document",
@@ -32,6 +47,13 @@ HEADERS = {
     "sec-ch-ua-platform": '"Windows"'
 }
 
+# Longest a scrape waits for Amazon's rate limiter / circuit breaker before giving up
+MAX_PACING_WAIT = 60
+
+# Request timeout grows with each attempt: 15s, 25s
+BASE_TIMEOUT = 15
+TIMEOUT_STEP = 10
+
 def is_valid_product_image(url):
     """Validate if URL is likely a real product image (not icon/sprite)"""
     if not url or 'http' not in url:
@@ -74,15 +96,15 @@ def scrape_amazon_with_retry(url, max_retries=2):
         else:
             # Assume it's an Amazon URL
             url = 'https://' + url
-        print(f"🔧 Fixed URL scheme: {url}", file=sys.stderr)
+        log.info("🔧 Fixed URL scheme: %s", url)
     
     for attempt in range(max_retries):
         try:
-            timeout = 15 + (attempt * 10)  # 15s, 25s
-            delay = random.uniform(2, 5) if attempt > 0 else random.uniform(1, 3)
-            
-            print(f"🔍 Attempt {attempt + 1}/{max_retries}: Starting to scrape: {url}", file=sys.stderr)
-            time.sleep(delay)
+            timeout = BASE_TIMEOUT + (attempt * TIMEOUT_STEP)
+            log.info("🔍 Attempt %d/%d: Starting to scrape: %s", attempt + 1, max_retries, url)
+            # Pacing is shared with every other scrape of this host, and adapts to how Amazon responds
+            with tracing.span("scrape.pacing", attempt=attempt + 1) as span:
+                span.set(seconds=round(rate_limit.acquire(url, MAX_PACING_WAIT), 2))
             
             # Create a session to maintain cookies
             session = requests.Session()
@@ -92,518 +114,596 @@ def scrape_amazon_with_retry(url, max_retries=2):
             session.cookies.set('i18n-prefs', 'INR')
             session.cookies.set('lc-acbin', 'en_IN')
             
-            # Make the request with enhanced headers and session
-            r = session.get(url, headers=HEADERS, timeout=timeout, allow_redirects=True)
+            # Make the request with enhanced headers and session; the body is decoded once, here
+            with metrics.FETCH_SECONDS.time(scraper="scraper"):
+                r = fetcher.get(url, headers=HEADERS, timeout=timeout, scraper="scraper", session=session)
             
-            print(f"📡 Response status code: {r.status_code}", file=sys.stderr)
+            log.debug("📡 Response status code: %s", r.status_code)
             
             if r.status_code == 503:
-                print(f"⚠️ Amazon service temporarily unavailable (503), retrying...", file=sys.stderr)
+                rate_limit.record(url, rate_limit.BLOCKED)
+                log.warning("⚠️ Amazon service temporarily unavailable (503), retrying...")
+                metrics.RETRIES.inc(scraper="scraper", reason="status_503")
                 continue
             elif r.status_code != 200:
+                rate_limit.record(url, rate_limit.BLOCKED if r.status_code == 429 else rate_limit.ERROR)
                 if attempt < max_retries - 1:
-                    print(f"⚠️ Status {r.status_code}, retrying...", file=sys.stderr)
+                    log.warning("⚠️ Status %s, retrying...", r.status_code)
+                    metrics.RETRIES.inc(scraper="scraper", reason="status")
                     continue
                 return {"success": False, "error": f"Failed to fetch page. Status code: {r.status_code}"}
             
             # Check if we got a CAPTCHA page
-            if "api-services-support@amazon.com" in r.text or "Type the characters you see in this image" in r.text:
-                print("⚠️ CAPTCHA detected - Amazon is blocking automated requests", file=sys.stderr)
+            if fetcher.is_captcha(r.text):
+                rate_limit.record(url, rate_limit.BLOCKED)
+                log.warning("⚠️ CAPTCHA detected - Amazon is blocking automated requests")
+                metrics.CAPTCHA_HITS.inc(scraper="scraper")
                 if attempt < max_retries - 1:
-                    print("⚠️ Retrying due to CAPTCHA...", file=sys.stderr)
+                    log.info("⚠️ Retrying due to CAPTCHA...")
+                    metrics.RETRIES.inc(scraper="scraper", reason="captcha")
                     continue
                 return {"success": False, "error": "Amazon CAPTCHA detected. Please try again later or use a different IP."}
             
             # Successfully got the page
-            return scrape_amazon_content(r, url)
+            rate_limit.record(url, rate_limit.OK)
+            with tracing.span("scrape.extract"):
+                return scrape_amazon_content(r, url)
             
+        except rate_limit.CircuitOpen as e:
+            log.warning("🚧 Not sending attempt %d: %s", attempt + 1, e)
+            return {"success": False, "error": f"Amazon is blocking requests right now. Please try again in {e.retry_after:.0f} seconds."}
+
+        except rate_limit.PacingTimeout as e:
+            log.warning("⏳ Not sending attempt %d: %s", attempt + 1, e)
+            return {"success": False, "error": f"Too many Amazon requests are queued right now. Please try again in {e.retry_after:.0f} seconds."}
+
         except requests.Timeout:
-            print(f"⏱️ Attempt {attempt + 1}: Timeout after {timeout}s", file=sys.stderr)
+            rate_limit.record(url, rate_limit.ERROR)
+            log.warning("⏱️ Attempt %d: Timeout after %ss", attempt + 1, timeout)
             if attempt < max_retries - 1:
-                print(f"⏱️ Retrying with longer timeout...", file=sys.stderr)
+                log.info("⏱️ Retrying with longer timeout...")
+                metrics.RETRIES.inc(scraper="scraper", reason="timeout")
                 continue
             return {"success": False, "error": "Please try again. The product page is taking too long to load."}
             
         except requests.RequestException as e:
-            print(f"❌ Attempt {attempt + 1}: Network error: {e}", file=sys.stderr)
+            rate_limit.record(url, rate_limit.ERROR)
+            log.error("❌ Attempt %d: Network error: %s", attempt + 1, e)
             if attempt < max_retries - 1:
+                metrics.RETRIES.inc(scraper="scraper", reason="network")
                 continue
             return {"success": False, "error": "Please try again. Unable to connect to Amazon."}
             
         except Exception as e:
-            print(f"❌ Attempt {attempt + 1}: Unexpected error: {e}", file=sys.stderr)
+            rate_limit.record(url, rate_limit.ERROR)
+            log.error("❌ Attempt %d: Unexpected error: %s", attempt + 1, e)
             if attempt < max_retries - 1:
+                metrics.RETRIES.inc(scraper="scraper", reason="error")
                 continue
             return {"success": False, "error": f"Please try again. Error: {str(e)}"}
     
     return {"success": False, "error": "Please try again. All attempts failed after 2 retries."}
 
-def scrape_amazon_content(r, url):
-    """Extract content from successful response"""
-    try:
-        soup = BeautifulSoup(r.text, "html.parser")
+# --- FIELD EXTRACTORS ---
+# Each reads located regions from the extraction Page instead of searching the soup.
+
+# Detail keys that belong in manufacturingDetails rather than productDetails
+MANUFACTURING_FIELDS = ['manufacturer', 'packer', 'importer', 'country of origin', 'item weight', 'item dimensions', 'asin', 'item model number']
+FEATURE_KEYWORDS = ['fabric', 'material', 'blend', 'comfort', 'breathable', 'moisture',
+                    'wicking', 'hydrophobic', 'lightweight', 'ultralight', 'stretch',
+                    'flexibility', 'design', 'fit', 'style', 'collar', 'sleeve']
+FEATURE_BULLET_PATTERNS = [
+    r'"featureBullets":\s*(\[.*?\])',
+    r'featureBullets\s*:\s*(\[.*?\])',
+    r'"feature_bullets":\s*(\[.*?\])',
+    r'data-feature-bullets\s*=\s*"([^"]*)"'
+]
+IMAGE_SCRIPT_MARKERS = ("colorImages", "imageBlockNR", "ImageBlockATF", "imageGalleryData", "twisterData", "altImages")
+IMAGE_FILE = re.compile(r"\.(jpg|jpeg|png|webp)")
+
+def title_from_product_heading(page):
+    """Fallback: an h1 whose class mentions "product" """
+    for h1 in page.region("headings"):
+        if any("product" in cls.lower() for cls in h1.get("class", [])):
+            return h1.text.strip()
+    return None
+
+def title_from_title_span(page):
+    """Fallback: a span whose id contains productTitle"""
+    title_elem = page.soup.find("span", id=lambda x: x and "productTitle" in x.lower() if x else False)
+    return title_elem.text.strip() if title_elem else None
+
+def is_high_quality_feature(text):
+    """Filter to keep only high-quality feature bullet points and exclude reviews"""
+    text_lower = text.lower()
+
+    # CRITICAL: Exclude customer reviews - these should NEVER be in features
+    review_indicators = [
+        'reviewed in',
+        'verified purchase',
+        'out of 5 stars',
+        'helpful',
+        'report',
+        'read more',
+        'images in this review',
+        'one person found this',
+        'people found this',
+        'size:',
+        'colour:',
+        'color:',
+        'style:',
+        'i bought',
+        'i purchased',
+        'i recently',
+        'great quality and comfortable fit!',
+        'the quality of',
+        'highly recommend',
+        'stars'  # Catches rating stars like "5.0 out of 5 stars"
+    ]
 
-        # DEBUG: Check if feature-bullets exists
-        feature_bullets_div = soup.find("div", id="feature-bullets")
-        print(f"🔍 Feature-bullets div found: {feature_bullets_div is not None}", file=sys.stderr)
-        if feature_bullets_div:
-            print(f"🔍 Feature-bullets content length: {len(str(feature_bullets_div))}", file=sys.stderr)
-            # Log first 500 chars of the div content
-            div_text = feature_bullets_div.get_text(strip=True)
-            print(f"🔍 Feature-bullets text preview: {div_text[:500]}...", file=sys.stderr)
-
-        # Title
-        title_elem = soup.find(id="productTitle")
-        title = title_elem.text.strip() if title_elem else "N/A"
-        print(f"📝 Title found: {title[:50]}...", file=sys.stderr)
-        
-        # If title is still N/A, try alternative selectors
-        if title == "N/A":
-            # Try h1 with product title class
-            title_elem = soup.find("h1", class_=lambda x: x and "product" in x.lower())
-            if title_elem:
-                title = title_elem.text.strip()
-            else:
-                # Try span with id containing productTitle
-                title_elem = soup.find("span", id=lambda x: x and "productTitle" in x.lower() if x else False)
-                if title_elem:
-                    title = title_elem.text.strip()
-        
-        print(f"📝 Final title: {title[:50]}...", file=sys.stderr)
-
-        # Product Description
-        desc_elem = soup.find(id="productDescription")
-        product_description = desc_elem.text.strip() if desc_elem else "N/A"
-
-        # About this Item - Feature Bullets (targeted extraction)
-        bullets = []
-        print("🔍 Starting targeted 'About this item' extraction...", file=sys.stderr)
-
-        # Method 1: Look for the actual feature bullet points in the product page
-        # Amazon often stores feature bullets in specific spans with class "a-list-item"
-        feature_bullets_div = soup.find("div", id="feature-bullets")
-        if feature_bullets_div:
-            print("📋 Found feature-bullets div", file=sys.stderr)
-            
-            # Look for span elements that contain the actual feature text
-            # These are typically the bullet points customers see
-            feature_spans = feature_bullets_div.find_all("span", class_="a-list-item")
-            
-            for span in feature_spans:
-                text = span.get_text(strip=True)
-                # Skip empty text, "About this item" header, and other non-feature content
-                if (text and 
-                    len(text) > 10 and 
-                    "about this item" not in text.lower() and
-                    not re.search(r'[0-9]\s*star', text) and
-                    not re.search(r'customer reviews?', text.lower()) and
-                    not re.search(r'secure transaction', text.lower()) and
-                    not re.search(r'to view this video', text.lower()) and
-                    not re.search(r'clothing\s*&\s*accessories', text.lower())):
-                    
-                    # Clean the text
-                    cleaned_text = re.sub(r'\s+', ' ', text)
-                    cleaned_text = re.sub(r'[\u200e\u200f]', '', cleaned_text)
-                    bullets.append(cleaned_text)
-                    print(f"   - Feature Bullet: {cleaned_text[:80]}...", file=sys.stderr)
-
-        # Method 2: If no bullets found in the main location, try alternative patterns
-        if len(bullets) < 3:
-            print("🔍 Trying alternative feature bullet locations...", file=sys.stderr)
-            
-            # Try to find unordered lists that contain feature bullets
-            feature_lists = soup.find_all("ul", class_=lambda x: x and "a-unordered-list" in str(x))
-            
-            for ul in feature_lists:
-                # Check if this list is likely to contain product features
-                list_text = ul.get_text(strip=True).lower()
-                if any(keyword in list_text for keyword in ['fabric', 'material', 'design', 'comfort', 'stretch']):
-                    list_items = ul.find_all("li")
-                    for li in list_items:
-                        text = li.get_text(strip=True)
-                        if text and len(text) > 20 and text not in bullets:
-                            bullets.append(text)
-                            print(f"   - List Feature: {text[:80]}...", file=sys.stderr)
-
-        # Method 3: Extract from script data (Amazon often stores features in JSON)
-        if len(bullets) < 3:
-            print("🔍 Checking script tags for feature data...", file=sys.stderr)
-            script_tags = soup.find_all('script', type='text/javascript')
-            
-            for script in script_tags:
-                if not script.string:
-                    continue
-                    
-                script_text = script.string
-                # Look for feature data in various JSON patterns
-                patterns = [
-                    r'"featureBullets":\s*(\[.*?\])',
-                    r'featureBullets\s*:\s*(\[.*?\])',
-                    r'"feature_bullets":\s*(\[.*?\])',
-                    r'data-feature-bullets\s*=\s*"([^"]*)"'
-                ]
-                
-                for pattern in patterns:
-                    matches = re.findall(pattern, script_text, re.DOTALL)
-                    for match in matches:
-                        try:
-                            # Try to parse as JSON
-                            if match.startswith('['):
-                                feature_list = json.loads(match)
-                                for feature in feature_list:
-                                    if isinstance(feature, str) and feature not in bullets:
-                                        bullets.append(feature)
-                                        print(f"   - JSON Feature: {feature[:80]}...", file=sys.stderr)
-                            else:
-                                # Handle string format
-                                features = [f.strip() for f in match.split(';') if f.strip()]
-                                for feature in features:
-                                    if feature not in bullets:
-                                        bullets.append(feature)
-                                        print(f"   - String Feature: {feature[:80]}...", file=sys.stderr)
-                        except:
-                            pass
-
-        # Method 4: DISABLED - Do NOT use template features as they can be misleading
-        # Only use actual scraped features from the product page
-        if len(bullets) < 3:
-            print("⚠️  Warning: Found fewer than 3 feature bullets. Will use actual scraped features only.", file=sys.stderr)
-            print("   (Template feature generation is disabled to ensure accuracy)", file=sys.stderr)
-
-        # Method 5: Final fallback - ONLY use this if NO features were found at all
-        # Extract meaningful sentences from description that sound like actual product features
-        if len(bullets) == 0:
-            print("🔍 No features found. Extracting feature-like sentences from description as last resort...", file=sys.stderr)
-            
-            description_text = product_description.lower()
-            feature_keywords = ['fabric', 'material', 'blend', 'comfort', 'breathable', 'moisture', 
-                            'wicking', 'hydrophobic', 'lightweight', 'ultralight', 'stretch', 
-                            'flexibility', 'design', 'fit', 'style', 'collar', 'sleeve']
-            
-            sentences = re.split(r'[.!?]+', product_description)
-            for sentence in sentences:
-                sentence = sentence.strip()
-                if (sentence and 
-                    len(sentence) > 30 and 
-                    len(sentence) < 150 and
-                    any(keyword in sentence.lower() for keyword in feature_keywords) and
-                    sentence not in bullets and
-                    len(bullets) < 5):  # Limit to 5 features max
-                    
-                    bullets.append(sentence)
-                    print(f"   - Desc Feature: {sentence[:80]}...", file=sys.stderr)
-        elif len(bullets) < 3:
-            print(f"   ℹ️  Only found {len(bullets)} actual feature(s) from product page", file=sys.stderr)
-
-        # Clean and filter the final bullets - Be LESS aggressive to keep real features
-        def is_high_quality_feature(text):
-            """Filter to keep only high-quality feature bullet points and exclude reviews"""
-            text_lower = text.lower()
-            
-            # CRITICAL: Exclude customer reviews - these should NEVER be in features
-            review_indicators = [
-                'reviewed in',
-                'verified purchase',
-                'out of 5 stars',
-                'helpful',
-                'report',
-                'read more',
-                'images in this review',
-                'one person found this',
-                'people found this',
-                'size:',
-                'colour:',
-                'color:',
-                'style:',
-                'i bought',
-                'i purchased',
-                'i recently',
-                'great quality and comfortable fit!',
-                'the quality of',
-                'highly recommend',
-                'stars'  # Catches rating stars like "5.0 out of 5 stars"
-            ]
-            
-            for indicator in review_indicators:
-                if indicator in text_lower:
-                    return False
-            
-            # Exclude description-like text (long marketing paragraphs)
-            exclude_phrases = [
-                'experience superior',
-                'crafted with advanced',
-                'the fabric quickly',
-                'the innovative',
-                'preferred by professional',
-                'it is perfect for',
-                'elevate your workout',
-                'designed specifically for',
-                'this tee offers',
-                'helping you stay',
-                'allowing you to move',
-                'giving you unrestricted',
-                'this t-shirt features',
-                'combines functional design',
-                'supports your active lifestyle'
-            ]
-            
-            for phrase in exclude_phrases:
-                if phrase in text_lower:
-                    return False
-            
-            # For short features (like "Stylish | Casual"), accept them if they're not too short
-            if len(text) >= 10:
-                return True
-            
+    for indicator in review_indicators:
+        if indicator in text_lower:
             return False
 
-        # Apply final filtering
-        filtered_bullets = []
-        for bullet in bullets:
-            if is_high_quality_feature(bullet):
-                # Final cleaning
-                cleaned = re.sub(r'\s+', ' ', bullet)
-                cleaned = re.sub(r'[\u200e\u200f]', '', cleaned)
-                cleaned = cleaned.strip()
-                
-                # Accept features that are at least 10 chars (lowered from 20)
-                if cleaned and len(cleaned) >= 10:
-                    filtered_bullets.append(cleaned)
-                    print(f"✅ Final Feature: {cleaned[:80]}...", file=sys.stderr)
-
-        bullets = filtered_bullets
-
-        # DISABLED: Do NOT use predefined features - show actual scraped features only
-        # Even if we have fewer than 3 features, it's better to show the real ones
-        # than to add fake/generic features that may not match the product
-        if len(bullets) < 3:
-            print(f"⚠️  Warning: Only found {len(bullets)} feature bullets", file=sys.stderr)
-            print("   (Not adding generic features - using actual scraped data only)", file=sys.stderr)
-
-        print(f"✅ Final feature bullet count: {len(bullets)}", file=sys.stderr)
-        for i, bullet in enumerate(bullets, 1):
-            print(f"   {i}. {bullet}", file=sys.stderr)
-
-        # Extract Product Details from detailBulletsWrapper_feature_div
-        product_details = {}
-        manufacturing_details = {}
-        additional_info = {}
-
-        detail_bullets_div = soup.find("div", id="detailBulletsWrapper_feature_div")
-        if detail_bullets_div:
-            print("📋 Found detailBulletsWrapper_feature_div section", file=sys.stderr)
-            
-            # Find all list items in the detail bullets
-            list_items = detail_bullets_div.find_all("li", class_="a-list-item")
-            
-            for li in list_items:
-                # Find the key (bold text) and value
-                key_spans = li.find_all("span", class_="a-text-bold")
-                value_spans = li.find_all("span")
-                
-                if key_spans:
-                    key_span = key_spans[0]
-                    key = key_span.get_text(strip=True)
-                    
-                    # Clean the key - remove trailing colon and special characters
-                    key = re.sub(r'[:\s&rlm;&lrm;]+$', '', key).strip()
-                    
-                    # Get the value - it's usually in the next span after the key span
-                    # We need to find the span that contains the actual value
-                    value = ""
-                    
-                    # Method 1: Look for spans that don't have a-text-bold class
-                    for span in value_spans:
-                        if 'a-text-bold' not in span.get('class', []):
-                            text = span.get_text(strip=True)
-                            if text and text != key:
-                                value = text
-                                break
-                    
-                    # Method 2: If no value found, extract from the entire li text
-                    if not value:
-                        full_text = li.get_text(strip=True)
-                        # Remove the key part to get the value
-                        value = full_text.replace(key, "").strip(": ").strip()
-                    
-                    # Clean the value
-                    value = re.sub(r'^[:\s&rlm;&lrm;]+', '', value).strip()
-                    
-                    if key and value:
-                        # Skip Best Sellers Rank and Customer Reviews
-                        if "Best Sellers Rank" not in key and "Customer Reviews" not in key:
-                            print(f"   - {key}: {value}", file=sys.stderr)
-                            
-                            # Categorize the details
-                            if any(field in key.lower() for field in ['manufacturer', 'packer', 'importer', 'country of origin', 'item weight', 'item dimensions', 'asin', 'item model number']):
-                                manufacturing_details[key] = value
-                            else:
-                                product_details[key] = value
-        else:
-            print("❌ detailBulletsWrapper_feature_div not found", file=sys.stderr)
+    # Exclude description-like text (long marketing paragraphs)
+    exclude_phrases = [
+        'experience superior',
+        'crafted with advanced',
+        'the fabric quickly',
+        'the innovative',
+        'preferred by professional',
+        'it is perfect for',
+        'elevate your workout',
+        'designed specifically for',
+        'this tee offers',
+        'helping you stay',
+        'allowing you to move',
+        'giving you unrestricted',
+        'this t-shirt features',
+        'combines functional design',
+        'supports your active lifestyle'
+    ]
 
-        # If no product details found in the main section, try alternative locations
-        if not product_details and not manufacturing_details:
-            print("🔍 Trying alternative locations for product details...", file=sys.stderr)
-            
-            # Try detailBullets_feature_div directly
-            detail_div = soup.find("div", id="detailBullets_feature_div")
-            if detail_div:
-                print("📋 Found detailBullets_feature_div section", file=sys.stderr)
-                list_items = detail_div.find_all("li")
+    for phrase in exclude_phrases:
+        if phrase in text_lower:
+            return False
+
+    # For short features (like "Stylish | Casual"), accept them if they're not too short
+    if len(text) >= 10:
+        return True
+
+    return False
+
+def extract_bullets(page):
+    """About this Item - Feature Bullets (targeted extraction)"""
+    product_description = page.values["description"]
+    feature_bullets_div = page.region("feature_bullets")
+
+    # DEBUG: Inspect feature-bullets only when debug logging is on
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("🔍 Feature-bullets div found: %s", feature_bullets_div is not None)
+        if feature_bullets_div:
+            log.debug("🔍 Feature-bullets content length: %d", len(str(feature_bullets_div)))
+            log.debug("🔍 Feature-bullets text preview: %.500s...", feature_bullets_div.get_text(strip=True))
+
+    bullets = []
+    log.debug("🔍 Starting targeted 'About this item' extraction...")
+
+    # Method 1: Look for the actual feature bullet points in the product page
+    # Amazon often stores feature bullets in specific spans with class "a-list-item"
+    if feature_bullets_div:
+        log.debug("📋 Found feature-bullets div")
+
+        # Look for span elements that contain the actual feature text
+        # These are typically the bullet points customers see
+        feature_spans = feature_bullets_div.find_all("span", class_="a-list-item")
+
+        for span in feature_spans:
+            text = span.get_text(strip=True)
+            # Skip empty text, "About this item" header, and other non-feature content
+            if (text and
+                len(text) > 10 and
+                "about this item" not in text.lower() and
+                not re.search(r'[0-9]\s*star', text) and
+                not re.search(r'customer reviews?', text.lower()) and
+                not re.search(r'secure transaction', text.lower()) and
+                not re.search(r'to view this video', text.lower()) and
+                not re.search(r'clothing\s*&\s*accessories', text.lower())):
+
+                # Clean the text
+                cleaned_text = normalize_spaces(text)
+                bullets.append(cleaned_text)
+                log.debug("   - Feature Bullet: %.80s...", cleaned_text, extra=logs.SAMPLED)
+
+    # Method 2: If no bullets found in the main location, try alternative patterns
+    if len(bullets) < 3:
+        log.debug("🔍 Trying alternative feature bullet locations...")
+
+        # Try to find unordered lists that contain feature bullets
+        feature_lists = [ul for ul in page.region("lists")
+                         if any("a-unordered-list" in cls for cls in ul.get("class", []))]
+
+        for ul in feature_lists:
+            # Check if this list is likely to contain product features
+            list_text = ul.get_text(strip=True).lower()
+            if any(keyword in list_text for keyword in ['fabric', 'material', 'design', 'comfort', 'stretch']):
+                list_items = ul.find_all("li")
                 for li in list_items:
-                    key_span = li.find("span", class_="a-text-bold")
-                    if key_span:
-                        key = key_span.get_text(strip=True).rstrip(":")
-                        full_text = li.get_text(strip=True)
-                        key_text = key_span.get_text(strip=True)
-                        value = full_text.replace(key_text, "").strip(": ")
-                        if key and value and "Best Sellers Rank" not in key and "Customer Reviews" not in key:
-                            if any(field in key.lower() for field in ['manufacturer', 'packer', 'importer', 'country of origin', 'item weight', 'item dimensions', 'asin', 'item model number']):
-                                manufacturing_details[key] = value
-                            else:
-                                product_details[key] = value
-                            print(f"   - {key}: {value}", file=sys.stderr)
-            
-            # Try product details table (tech spec table)
-            if not product_details:
-                tech_spec_table = soup.find("table", id="productDetails_techSpec_section_1")
-                if tech_spec_table:
-                    print("📋 Found tech spec table", file=sys.stderr)
-                    rows = tech_spec_table.find_all("tr")
-                    for row in rows:
-                        th = row.find("th")
-                        td = row.find("td")
-                        if th and td:
-                            key = th.get_text(strip=True)
-                            value = td.get_text(strip=True)
-                            if key and value:
-                                if any(field in key.lower() for field in ['manufacturer', 'packer', 'importer', 'country of origin', 'item weight', 'item dimensions', 'asin', 'item model number']):
-                                    manufacturing_details[key] = value
-                                else:
-                                    product_details[key] = value
-                                print(f"   - {key}: {value}", file=sys.stderr)
-
-        # Extract high-quality product images using enhanced method
-        images = []
-        seen_urls = set()
-        
-        print("🖼️ Starting enhanced image extraction...", file=sys.stderr)
-        
-        # Method 1: data-a-dynamic-image attribute (most reliable for high quality)
-        dynamic_images = soup.find_all('img', {'data-a-dynamic-image': True})
-        for img in dynamic_images:
-            try:
-                dynamic_data = img.get('data-a-dynamic-image', '{}')
-                image_dict = json.loads(dynamic_data)
-                for img_url in image_dict.keys():
-                    if img_url not in seen_urls and is_valid_product_image(img_url):
-                        # Convert to highest quality using ._SL1500_.
-                        high_quality_url = re.sub(r'\._[A-Z0-9_]+\.', '._SL1500_.', img_url)
-                        images.append(high_quality_url)
-                        seen_urls.add(img_url)
-                        print(f"✅ Found dynamic image: {high_quality_url[:80]}...", file=sys.stderr)
-                        if len(images) >= 7:
+                    text = li.get_text(strip=True)
+                    if text and len(text) > 20 and text not in bullets:
+                        bullets.append(text)
+                        log.debug("   - List Feature: %.80s...", text, extra=logs.SAMPLED)
+
+    # Method 3: Extract from script data (Amazon often stores features in JSON)
+    if len(bullets) < 3:
+        log.debug("🔍 Checking script tags for feature data...")
+        script_tags = [s for s in page.region("scripts") if s.get("type") == "text/javascript"]
+
+        for script in script_tags:
+            if not script.string:
+                continue
+
+            script_text = script.string
+            # Look for feature data in various JSON patterns
+            for pattern in FEATURE_BULLET_PATTERNS:
+                matches = re.findall(pattern, script_text, re.DOTALL)
+                for match in matches:
+                    try:
+                        # Try to parse as JSON
+                        if match.startswith('['):
+                            feature_list = json.loads(match)
+                            for feature in feature_list:
+                                if isinstance(feature, str) and feature not in bullets:
+                                    bullets.append(feature)
+                                    log.debug("   - JSON Feature: %.80s...", feature, extra=logs.SAMPLED)
+                        else:
+                            # Handle string format
+                            features = [f.strip() for f in match.split(';') if f.strip()]
+                            for feature in features:
+                                if feature not in bullets:
+                                    bullets.append(feature)
+                                    log.debug("   - String Feature: %.80s...", feature, extra=logs.SAMPLED)
+                    except:
+                        pass
+
+    # Method 4: DISABLED - Do NOT use template features as they can be misleading
+    # Only use actual scraped features from the product page
+    if len(bullets) < 3:
+        log.warning("⚠️ Found fewer than 3 feature bullets. Will use actual scraped features only (template features are disabled).")
+
+    # Method 5: Final fallback - ONLY use this if NO features were found at all
+    # Extract meaningful sentences from description that sound like actual product features
+    if len(bullets) == 0:
+        log.info("🔍 No features found. Extracting feature-like sentences from description as last resort...")
+
+        sentences = re.split(r'[.!?]+', product_description)
+        for sentence in sentences:
+            sentence = sentence.strip()
+            if (sentence and
+                len(sentence) > 30 and
+                len(sentence) < 150 and
+                any(keyword in sentence.lower() for keyword in FEATURE_KEYWORDS) and
+                sentence not in bullets and
+                len(bullets) < 5):  # Limit to 5 features max
+
+                bullets.append(sentence)
+                log.debug("   - Desc Feature: %.80s...", sentence, extra=logs.SAMPLED)
+    elif len(bullets) < 3:
+        log.info("ℹ️ Only found %d actual feature(s) from product page", len(bullets))
+
+    return bullets
+
+def clean_bullets(bullets):
+    """Final filtering - Be LESS aggressive to keep real features"""
+    filtered_bullets = []
+    for bullet in bullets:
+        if is_high_quality_feature(bullet):
+            # Final cleaning
+            cleaned = normalize_spaces(bullet).strip()
+
+            # Accept features that are at least 10 chars (lowered from 20)
+            if cleaned and len(cleaned) >= 10:
+                filtered_bullets.append(cleaned)
+                log.debug("✅ Final Feature: %.80s...", cleaned, extra=logs.SAMPLED)
+
+    # DISABLED: Do NOT use predefined features - show actual scraped features only
+    # Even if we have fewer than 3 features, it's better to show the real ones
+    # than to add fake/generic features that may not match the product
+    if len(filtered_bullets) < 3:
+        log.warning("⚠️ Only found %d feature bullets (not adding generic features)", len(filtered_bullets))
+
+    log.info("✅ Final feature bullet count: %d", len(filtered_bullets))
+    for i, bullet in enumerate(filtered_bullets, 1):
+        log.debug("   %d. %s", i, bullet)
+    return filtered_bullets
+
+def _file_detail(details, key, value):
+    """Categorize one detail row into manufacturing or product details"""
+    if any(field in key.lower() for field in MANUFACTURING_FIELDS):
+        details["manufacturing_details"][key] = value
+    else:
+        details["product_details"][key] = value
+
+def extract_details(page):
+    """Extract Product Details from detailBulletsWrapper_feature_div"""
+    details = {"product_details": {}, "manufacturing_details": {}, "additional_info": {}}
+
+    detail_bullets_div = page.region("detail_bullets_wrapper")
+    if detail_bullets_div:
+        log.debug("📋 Found detailBulletsWrapper_feature_div section")
+
+        # Find all list items in the detail bullets
+        list_items = detail_bullets_div.find_all("li", class_="a-list-item")
+
+        for li in list_items:
+            # Find the key (bold text) and value
+            key_spans = li.find_all("span", class_="a-text-bold")
+            value_spans = li.find_all("span")
+
+            if key_spans:
+                key_span = key_spans[0]
+                key = key_span.get_text(strip=True)
+
+                # Clean the key - remove trailing colon and special characters
+                key = re.sub(r'(?:[:\s\u200e\u200f]|&(?:lrm|rlm);)+$', '', key).strip()
+
+                # Get the value - it's usually in the next span after the key span
+                # We need to find the span that contains the actual value
+                value = ""
+
+                # Method 1: Look for spans that don't have a-text-bold class (and don't wrap the key)
+                for span in value_spans:
+                    if 'a-text-bold' not in span.get('class', []) and key_span not in span.descendants:
+                        text = span.get_text(strip=True)
+                        if text and text != key:
+                            value = text
                             break
+
+                # Method 2: If no value found, extract from the entire li text
+                if not value:
+                    full_text = li.get_text(strip=True)
+                    # Remove the key part to get the value
+                    value = full_text.replace(key, "").strip(": ").strip()
+
+                # Clean the value
+                value = re.sub(r'^(?:[:\s\u200e\u200f]|&(?:lrm|rlm);)+', '', value).strip()
+
+                if key and value:
+                    # Skip Best Sellers Rank and Customer Reviews
+                    if "Best Sellers Rank" not in key and "Customer Reviews" not in key:
+                        log.debug("   - %s: %s", key, value, extra=logs.SAMPLED)
+                        _file_detail(details, key, value)
+    else:
+        log.debug("❌ detailBulletsWrapper_feature_div not found")
+    return details
+
+def has_no_details(details):
+    return not details["product_details"] and not details["manufacturing_details"]
+
+def details_from_detail_bullets(page):
+    """Fallback: detailBullets_feature_div directly, then the tech spec table"""
+    details = {"product_details": {}, "manufacturing_details": {}, "additional_info": {}}
+    log.debug("🔍 Trying alternative locations for product details...")
+
+    detail_div = page.region("detail_bullets")
+    if detail_div:
+        log.debug("📋 Found detailBullets_feature_div section")
+        list_items = detail_div.find_all("li")
+        for li in list_items:
+            key_span = li.find("span", class_="a-text-bold")
+            if key_span:
+                key = key_span.get_text(strip=True).rstrip(":")
+                full_text = li.get_text(strip=True)
+                key_text = key_span.get_text(strip=True)
+                value = full_text.replace(key_text, "").strip(": ")
+                if key and value and "Best Sellers Rank" not in key and "Customer Reviews" not in key:
+                    _file_detail(details, key, value)
+                    log.debug("   - %s: %s", key, value, extra=logs.SAMPLED)
+
+    # Try product details table (tech spec table)
+    if not details["product_details"]:
+        tech_spec_table = page.region("tech_spec_table")
+        if tech_spec_table:
+            log.debug("📋 Found tech spec table")
+            rows = tech_spec_table.find_all("tr")
+            for row in rows:
+                th = row.find("th")
+                td = row.find("td")
+                if th and td:
+                    key = th.get_text(strip=True)
+                    value = td.get_text(strip=True)
+                    if key and value:
+                        _file_detail(details, key, value)
+                        log.debug("   - %s: %s", key, value, extra=logs.SAMPLED)
+    return details
+
+def extract_images(page):
+    """Extract high-quality product images using enhanced method"""
+    images = []
+    seen_urls = set()
+
+    log.debug("🖼️ Starting enhanced image extraction...")
+
+    # Method 1: data-a-dynamic-image attribute (most reliable for high quality)
+    dynamic_images = [img for img in page.region("dynamic_images") if img.name == "img"]
+    for img in dynamic_images:
+        try:
+            dynamic_data = img.get('data-a-dynamic-image', '{}')
+            image_dict = json.loads(dynamic_data)
+            for img_url in image_dict.keys():
+                if img_url not in seen_urls and is_valid_product_image(img_url):
+                    # Convert to highest quality using ._SL1500_.
+                    high_quality_url = image_data.sl1500(img_url)
+                    images.append(high_quality_url)
+                    seen_urls.add(img_url)
+                    log.debug("✅ Found dynamic image: %.80s...", high_quality_url, extra=logs.SAMPLED)
+                    if len(images) >= 7:
+                        break
+        except Exception as e:
+            log.warning("⚠️ Error parsing dynamic image: %s", e)
+
+    # Method 2: JavaScript/Script tags (contains high-res image URLs)
+    if len(images) < 7:
+        # Enhanced pattern to catch more image data structures
+        script_tags = [s for s in page.region("scripts")
+                       if s.string is not None and any(marker in s.string for marker in IMAGE_SCRIPT_MARKERS)]
+        for script in script_tags:
+            if len(images) >= 7:
+                break
+            try:
+                # Image data is decoded once per script; lookups run in the old pattern order
+                image_script = image_data.ImageScript(script.string)
+                found = (
+                    image_script.key_urls("hiRes"),
+                    image_script.key_urls("large"),
+                    image_script.key_urls("thumb"),
+                    image_script.media_urls(),
+                    # Additional image data structures:
+                    image_script.gallery_main_urls(),
+                    image_script.alt_image_urls(),
+                    image_script.main_variant_urls(),
+                    image_script.key_urls("landing"),
+                )
+
+                for matches in found:
+                    for img_url in matches:
+                        if img_url not in seen_urls and len(images) < 7 and is_valid_product_image(img_url):
+                            high_quality_url = image_data.sl1500(img_url)
+                            images.append(high_quality_url)
+                            seen_urls.add(img_url)
+                            log.debug("📸 Found script image: %.80s...", high_quality_url, extra=logs.SAMPLED)
             except Exception as e:
-                print(f"⚠️ Error parsing dynamic image: {e}", file=sys.stderr)
-        
-        # Method 2: JavaScript/Script tags (contains high-res image URLs)
-        if len(images) < 7:
-            # Enhanced pattern to catch more image data structures
-            script_tags = soup.find_all('script', string=re.compile('colorImages|imageBlockNR|ImageBlockATF|imageGalleryData|twisterData|altImages'))
-            for script in script_tags:
+                log.warning("⚠️ Error parsing script: %s", e)
+
+    # Method 3: Direct img tags with src (fallback)
+    if len(images) < 7:
+        img_tags = [img for img in page.region("images") if img.get("src") is not None]
+        for img in img_tags:
+            if len(images) >= 7:
+                break
+            src = img.get('src', '')
+            if src and src not in seen_urls and is_valid_product_image(src):
+                # Convert to highest quality
+                high_quality_url = image_data.sl1500(src)
+                images.append(high_quality_url)
+                seen_urls.add(src)
+                log.debug("📸 Found img tag: %.80s...", high_quality_url, extra=logs.SAMPLED)
+
+    # Method 4: Image block container (additional fallback)
+    if len(images) < 7:
+        image_container = page.region("image_block")
+        if image_container:
+            img_elements = image_container.find_all("img", {"src": IMAGE_FILE})
+            for img in img_elements:
                 if len(images) >= 7:
                     break
-                try:
-                    script_text = script.string
-                    # Enhanced patterns to try for high-quality images
-                    patterns = [
-                        r'"hiRes":"(https://[^"]+)"',
-                        r'"large":"(https://[^"]+)"',
-                        r'"thumb":"(https://[^"]+)"',
-                        r'https://m\.media-amazon\.com/images/I/[^"]+\._[A-Z0-9_]+\.[a-z]+',
-                        # NEW PATTERNS for additional image data structures:
-                        r'"imageGalleryData":\s*\[\s*{[^}]*"mainUrl":"([^"]+)"',
-                        r'"altImages":\s*\[\s*"([^"]+)"',
-                        r'"variant":"MAIN"[^}]*"url":"([^"]+)"',
-                        r'"landing":"(https://[^"]+)"'
-                    ]
-                    
-                    for pattern in patterns:
-                        matches = re.findall(pattern, script_text)
-                        for img_url in matches:
-                            if img_url not in seen_urls and len(images) < 7 and is_valid_product_image(img_url):
-                                high_quality_url = re.sub(r'\._[A-Z0-9_]+\.', '._SL1500_.', img_url)
-                                images.append(high_quality_url)
-                                seen_urls.add(img_url)
-                                print(f"📸 Found script image: {high_quality_url[:80]}...", file=sys.stderr)
-                except Exception as e:
-                    print(f"⚠️ Error parsing script: {e}", file=sys.stderr)
-        
-        # Method 3: Direct img tags with src (fallback)
-        if len(images) < 7:
-            img_tags = soup.find_all('img', src=True)
-            for img in img_tags:
-                if len(images) >= 7:
-                    break
-                src = img.get('src', '')
+                src = img.get("src", "")
                 if src and src not in seen_urls and is_valid_product_image(src):
-                    # Convert to highest quality
-                    high_quality_url = re.sub(r'\._[A-Z0-9_]+\.', '._SL1500_.', src)
+                    high_quality_url = image_data.sl1500(src)
                     images.append(high_quality_url)
                     seen_urls.add(src)
-                    print(f"📸 Found img tag: {high_quality_url[:80]}...", file=sys.stderr)
-        
-        # Method 4: Image block container (additional fallback)
-        if len(images) < 7:
-            image_container = soup.find("div", id="imageBlock")
-            if image_container:
-                img_elements = image_container.find_all("img", {"src": re.compile(r"\.(jpg|jpeg|png|webp)")})
-                for img in img_elements:
-                    if len(images) >= 7:
-                        break
-                    src = img.get("src", "")
-                    if src and src not in seen_urls and is_valid_product_image(src):
-                        high_quality_url = re.sub(r'\._[A-Z0-9_]+\.', '._SL1500_.', src)
-                        images.append(high_quality_url)
-                        seen_urls.add(src)
-                        print(f"📦 Found container image: {high_quality_url[:80]}...", file=sys.stderr)
-
-        # Extract ASIN from URL or page
-        asin_match = re.search(r"/dp/([A-Z0-9]{10})", url)
-        asin = asin_match.group(1) if asin_match else "unknown"
-
-        # If ASIN not in manufacturing details, try to find it in the page
-        if asin == "unknown":
-            asin_pattern = re.search(r'"asin":"([A-Z0-9]{10})"', r.text)
-            if asin_pattern:
-                asin = asin_pattern.group(1)
-
-        # Ensure ASIN is in manufacturing details if found
-        if asin != "unknown" and "ASIN" not in manufacturing_details:
-            manufacturing_details["ASIN"] = asin
+                    log.debug("📦 Found container image: %.80s...", high_quality_url, extra=logs.SAMPLED)
+
+    return images[:7]  # Return only first 7 images
+
+def extract_asin(page):
+    """Extract ASIN from URL or page, and make sure it is in the manufacturing details"""
+    asin_match = re.search(r"/dp/([A-Z0-9]{10})", page.url)
+    asin = asin_match.group(1) if asin_match else "unknown"
+
+    # If ASIN not in manufacturing details, try to find it in the page
+    if asin == "unknown":
+        asin_pattern = re.search(r'"asin":"([A-Z0-9]{10})"', page.html)
+        if asin_pattern:
+            asin = asin_pattern.group(1)
+
+    # Ensure ASIN is in manufacturing details if found
+    manufacturing_details = page.values["details"]["manufacturing_details"]
+    if asin != "unknown" and "ASIN" not in manufacturing_details:
+        manufacturing_details["ASIN"] = asin
+    return asin
+
+def extract_variants(page):
+    """Size/colour family of a parent page: child ASINs, their values and per-colour images"""
+    scripts = [s.string for s in page.region("scripts")
+               if s.string is not None and variations.is_variation_script(s.string)]
+    if not scripts:
+        return None
+    try:
+        return variations.parse(scripts, host=urlparse(page.url).netloc or "www.amazon.in")
+    except Exception as e:
+        # Variations are optional: a malformed twister blob must not fail the product
+        log.warning("⚠️ Error parsing variations: %s", e)
+        return None
+
+# Carousel cards ("Products related to this item", sponsored and similar items)
+RELATED_ASIN = re.compile(r'data-asin="([A-Z0-9]{10})"')
+RELATED_LIMIT = 20
+
+def extract_related(page):
+    """ASINs of the product cards on the page (read from the raw HTML: carousels are never parsed)"""
+    own = {page.values["asin"]}
+    own.update(v["asin"] for v in (page.values["variants"] or {}).get("variants", []))
+    related = [asin for asin in dict.fromkeys(RELATED_ASIN.findall(page.html)) if asin not in own]
+    return related[:RELATED_LIMIT]
+
+# --- FIELD SPEC ---
+
+FIELDS = [
+    FieldSpec("title", text_of(extraction.PRODUCT_TITLE, lambda el: el.text.strip()),
+              regions=[extraction.PRODUCT_TITLE, extraction.HEADINGS],
+              fallbacks=[title_from_product_heading, title_from_title_span],
+              empty=lambda title: title is None or title == "N/A", default="N/A"),
+    FieldSpec("description", text_of(extraction.PRODUCT_DESCRIPTION, lambda el: el.text.strip()),
+              regions=[extraction.PRODUCT_DESCRIPTION], empty=lambda desc: desc is None, default="N/A"),
+    FieldSpec("bullets", extract_bullets, regions=[extraction.FEATURE_BULLETS, extraction.LISTS, extraction.SCRIPTS],
+              clean=clean_bullets, needs=["description"]),
+    FieldSpec("details", extract_details,
+              regions=[extraction.DETAIL_BULLETS_WRAPPER, extraction.DETAIL_BULLETS, extraction.TECH_SPEC_TABLE],
+              fallbacks=[details_from_detail_bullets], empty=has_no_details),
+    FieldSpec("images", extract_images,
+              regions=[extraction.DYNAMIC_IMAGES, extraction.SCRIPTS, extraction.IMAGES, extraction.IMAGE_BLOCK]),
+    FieldSpec("asin", extract_asin, needs=["details"]),
+    FieldSpec("variants", extract_variants, regions=[extraction.SCRIPTS]),
+    FieldSpec("related", extract_related, needs=["asin", "variants"]),
+]
+
+PLAN = extraction.compile_plan("scraper", FIELDS)
+
+def scrape_amazon_content(r, url):
+    """Extract content from successful response"""
+    try:
+        values = PLAN.run(r.text, url)
+        title = values["title"]
+        log.info("📝 Final title: %.50s...", title)
+        details = values["details"]
+        product_details = details["product_details"]
+        manufacturing_details = details["manufacturing_details"]
+        images = values["images"]
 
         result = {
             "success": True,
             "title": title,
-            "description": product_description,
-            "bullets": bullets,
+            "description": values["description"],
+            "bullets": values["bullets"],
             "productDetails": product_details if product_details else {"status": "No data available"},
-            "additionalInfo": additional_info,
+            "additionalInfo": details["additional_info"],
             "manufacturingDetails": manufacturing_details,
-            "images": images[:7],  # Return only first 7 images
-            "asin": asin
+            "images": images,
+            "asin": values["asin"]
         }
-        
-        print(f"✅ Successfully scraped product: {title[:50]}...", file=sys.stderr)
-        print(f"📊 Found {len(product_details)} product details", file=sys.stderr)
-        print(f"🏭 Found {len(manufacturing_details)} manufacturing details", file=sys.stderr)
-        print(f"🖼️ Found {len(images)} product images", file=sys.stderr)
+        # Only parent pages of a size/colour family carry variants
+        if values["variants"]:
+            result["variants"] = values["variants"]
+        if values["related"]:
+            result["relatedAsins"] = values["related"]
+
+        log.info("✅ Successfully scraped product: %.50s... (%d product details, %d manufacturing details, %d images)",
+                 title, len(product_details), len(manufacturing_details), len(images))
         return result
 
     except Exception as e:
-        print(f"❌ Error during content extraction: {str(e)}", file=sys.stderr)
+        log.exception("❌ Error during content extraction: %s", e)
         return {"success": False, "error": str(e)}
 
 def scrape_amazon(url):
@@ -611,14 +711,29 @@ def scrape_amazon(url):
     return scrape_amazon_with_retry(url, max_retries=2)
 
 def main():
-    if len(sys.argv) < 2:
+    parser = argparse.ArgumentParser(description="Scrape an Amazon product page and print it as JSON")
+    parser.add_argument("url", nargs="?", help="product URL (omit with --serve)")
+    parser.add_argument("--serve", "--jsonl", dest="serve", action="store_true",
+                        help="read URLs / JSON jobs from stdin, one per line, and write one JSON result per line")
+    parser.add_argument("-j", "--jobs", type=int, default=jsonl_serve.DEFAULT_JOBS,
+                        help="scrapes run in parallel with --serve")
+    parser.add_argument("--fields", help='sections to keep ("title,bullets") or drop ("-raw"); see serialization.py')
+    parser.add_argument("--pretty", action="store_true", help="indent the JSON output")
+    args = parser.parse_args()
+
+    if args.serve:
+        jsonl_serve.serve("scraper", lambda url, options: scrape_amazon(url), jobs=args.jobs,
+                          default_fields=args.fields)
+        return
+    if not args.url:
         error_result = {"success": False, "error": "URL parameter required"}
-        print(json.dumps(error_result))
+        print(serialization.dumps(error_result, pretty=args.pretty))
         return
 
-    url = sys.argv[1]
-    result = scrape_amazon(url)
-    print(json.dumps(result, ensure_ascii=False))
+    url = args.url
+    with tracing.from_environment("scraper.cli", url=url):
+        result = scrape_amazon(url)
+    print(serialization.dumps(select_fields(result, args.fields), pretty=args.pretty))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
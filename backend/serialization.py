@@ -0,0 +1,90 @@
+"""
+JSON output for scraper results and Flask responses
+- orjson when it is installed (several times faster, UTF-8 out, no indentation by default);
+  the standard json module with the same compact output otherwise
+- No Flask import here, so the scraper CLIs can use it without paying for one
+- select_fields() trims a result to the sections a caller asked for: fields="product,details"
+  keeps only those, fields="-raw,-pricing" drops those; dotted paths reach into sections
+  (e.g. "-raw.images_full"), and success / error / warnings are always kept
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Always returned, whatever fields= says, so callers can tell a trimmed result from a failure
+ALWAYS_KEPT = ("success", "error", "warnings", "userMessage")
+
+
+def dumps_bytes(obj, pretty=False, default=None):
+    """Serialize to UTF-8 JSON bytes"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        return orjson.dumps(obj, default=default, option=option)
+    return dumps(obj, pretty, default).encode("utf-8")
+
+
+def dumps(obj, pretty=False, default=None):
+    """Serialize to a JSON string (non-ASCII characters are written as-is)"""
+    if orjson is not None:
+        return dumps_bytes(obj, pretty, default).decode("utf-8")
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, indent=2, default=default)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=default)
+
+
+def parse_fields(fields):
+    """(include paths, exclude paths) from "a,b.c,-d" or a list of the same; None means everything"""
+    if not fields:
+        return None
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    include, exclude = [], []
+    for field in fields:
+        field = str(field).strip()
+        if field.startswith("-"):
+            exclude.append(field[1:].split("."))
+        elif field:
+            include.append(field.split("."))
+    return include, exclude
+
+
+def _keep(data, paths):
+    """Copy of data with only the given key paths"""
+    if any(len(path) == 0 for path in paths) or not isinstance(data, dict):
+        return data
+    kept = {}
+    for key in data:
+        subpaths = [path[1:] for path in paths if path[0] == key]
+        if subpaths:
+            kept[key] = _keep(data[key], subpaths)
+    return kept
+
+
+def _drop(data, path):
+    """Copy of data without one key path (only the dicts along the path are copied)"""
+    if not isinstance(data, dict) or path[0] not in data:
+        return data
+    if len(path) == 1:
+        return {key: value for key, value in data.items() if key != path[0]}
+    return {**data, path[0]: _drop(data[path[0]], path[1:])}
+
+
+def select_fields(data, fields):
+    """Trim a result dict to the requested fields (see module docstring); data is not modified"""
+    spec = parse_fields(fields)
+    if spec is None or not isinstance(data, dict):
+        return data
+    include, exclude = spec
+    if include:
+        selected = _keep(data, include + [[key] for key in ALWAYS_KEPT])
+    else:
+        selected = data
+    for path in exclude:
+        if path[0] not in ALWAYS_KEPT:
+            selected = _drop(selected, path)
+    return selected
+
@@ -0,0 +1,182 @@
+"""
+In-memory snapshots of the Google Sheets the setup pages read
+- Each sheet's CSV export is parsed into a columnar snapshot: the header list plus one list
+  of values per column, so projections and pages are list slices
+- A background thread refreshes every sheet each SHEET_REFRESH_SECONDS (default 300);
+  requests only wait on Google for a sheet that has never loaded
+- A failed refresh keeps the last good snapshot; a sheet that never loaded serves its
+  fallback rows (same as server.js) until a refresh succeeds
+- A snapshot's version is a hash of its CSV, so an unchanged sheet keeps its ETag
+"""
+
+import csv
+import hashlib
+import io
+import os
+import threading
+import time
+
+import fetcher
+import logs
+import metrics
+
+log = logs.get_logger("sheet_data")
+
+SHEET_CSV_URL = os.environ.get(
+    "SHEET_CSV_URL",
+    "https://docs.google.com/spreadsheets/d/1C6s96_hmDTYjwwkq5r4ekAh5FrtAvPJqN54WwYl_eVI/export?format=csv&gid=75817034")
+GOLDEN_SHEET_CSV_URL = os.environ.get(
+    "GOLDEN_SHEET_CSV_URL",
+    "https://docs.google.com/spreadsheets/d/1C6s96_hmDTYjwwkq5r4ekAh5FrtAvPJqN54WwYl_eVI/export?format=csv&gid=62256398")
+
+REFRESH_SECONDS = float(os.environ.get("SHEET_REFRESH_SECONDS", "300"))
+FETCH_TIMEOUT = 15
+HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
+
+# Served while the category sheet has never loaded (the rows server.js falls back to)
+SHEET_FALLBACK_ROWS = [
+    {'': 'Clothing', 'Gender': 'Women', 'Age Group': 'Adults', 'Subcategory': 'Kurtas', 'URL': 'https://www.amazon.in/s?k=women+kurtas'},
+    {'': 'Clothing', 'Gender': 'Women', 'Age Group': 'Adults', 'Subcategory': 'Sarees', 'URL': 'https://www.amazon.in/s?k=women+sarees'},
+    {'': 'Clothing', 'Gender': 'Women', 'Age Group': 'Adults', 'Subcategory': 'Dresses', 'URL': 'https://www.amazon.in/s?k=women+dresses'},
+    {'': 'Clothing', 'Gender': 'Men', 'Age Group': 'Adults', 'Subcategory': 'Shirts', 'URL': 'https://www.amazon.in/s?k=men+shirts'},
+    {'': 'Clothing', 'Gender': 'Men', 'Age Group': 'Adults', 'Subcategory': 'T-Shirts', 'URL': 'https://www.amazon.in/s?k=men+t+shirts'},
+]
+
+
+class Snapshot:
+    """One immutable, column-oriented copy of a sheet"""
+
+    def __init__(self, headers, columns, version, fallback=False):
+        self.headers = headers
+        self.columns = columns  # header -> list of values, all the same length
+        self.version = version
+        self.fallback = fallback
+        self.row_count = len(columns[headers[0]]) if headers else 0
+        self.fetched_at = time.time()
+
+    def rows(self, columns=None, offset=0, limit=None):
+        """(headers, [row dict]) for the selected columns and row range"""
+        headers = self.headers if columns is None else [h for h in self.headers if h in columns]
+        end = self.row_count if limit is None else min(self.row_count, offset + limit)
+        values = [self.columns[h][offset:end] for h in headers]
+        return headers, [dict(zip(headers, row)) for row in zip(*values)] if headers else []
+
+    @classmethod
+    def from_rows(cls, rows, version, fallback=False):
+        headers = list(rows[0]) if rows else []
+        columns = {h: [row.get(h, "") for row in rows] for h in headers}
+        return cls(headers, columns, version, fallback)
+
+
+def parse_csv(text):
+    """(headers, columns) like server.js's csv-parse: header row, trimmed cells, blank lines skipped"""
+    reader = csv.reader(io.StringIO(text))
+    headers = None
+    columns = {}
+    for row in reader:
+        if not row:
+            continue
+        cells = [cell.strip() for cell in row]
+        if headers is None:
+            # A repeated header keeps its last column, as a JS object key would
+            headers = list(dict.fromkeys(cells))
+            positions = {header: index for index, header in enumerate(cells)}
+            columns = {header: [] for header in headers}
+            continue
+        for header in headers:
+            index = positions[header]
+            columns[header].append(cells[index] if index < len(cells) else "")
+    return headers or [], columns
+
+
+class SheetSource:
+    """A sheet's CSV export and its current snapshot"""
+
+    def __init__(self, name, url, fallback_rows=()):
+        self.name = name
+        self.url = url
+        self.fallback_rows = list(fallback_rows)
+        self.snapshot = None
+        self.last_error = None
+        self._load_lock = threading.Lock()
+
+    def get(self):
+        """(snapshot, loaded_now): waits for the first load, never for a refresh"""
+        snapshot = self.snapshot
+        if snapshot is not None:
+            return snapshot, False
+        with self._load_lock:
+            if self.snapshot is None:
+                if not self.refresh():
+                    self.snapshot = Snapshot.from_rows(self.fallback_rows, "fallback", fallback=True)
+                return self.snapshot, True
+            return self.snapshot, False
+
+    def refresh(self):
+        """Fetch and swap in a new snapshot; returns False (keeping the old one) on failure"""
+        try:
+            with metrics.SHEETS_CALL_SECONDS.time(operation=f"export_csv_{self.name}"):
+                response = fetcher.get(self.url, headers=HEADERS, timeout=FETCH_TIMEOUT)
+            if response.status_code != 200:
+                raise RuntimeError(f"status code {response.status_code}")
+            version = hashlib.sha1(response.text.encode("utf-8")).hexdigest()[:16]
+            current = self.snapshot
+            if current is not None and current.version == version:
+                current.fetched_at = time.time()
+                return True
+            headers, columns = parse_csv(response.text)
+            self.snapshot = Snapshot(headers, columns, version)
+        except Exception as e:
+            self.last_error = str(e)
+            metrics.SHEET_REFRESHES.inc(sheet=self.name, outcome="error")
+            log.error("❌ Refreshing the %s sheet failed: %s", self.name, e)
+            return False
+        self.last_error = None
+        metrics.SHEET_REFRESHES.inc(sheet=self.name, outcome="updated")
+        metrics.SHEET_ROWS.set(self.snapshot.row_count, sheet=self.name)
+        log.info("📊 %s sheet refreshed: %d rows, version %s", self.name, self.snapshot.row_count, version)
+        return True
+
+    def stats(self):
+        snapshot = self.snapshot
+        return {
+            "rows": snapshot.row_count if snapshot else None,
+            "version": snapshot.version if snapshot else None,
+            "fallback": snapshot.fallback if snapshot else None,
+            "age_seconds": round(time.time() - snapshot.fetched_at, 1) if snapshot else None,
+            "last_error": self.last_error,
+        }
+
+
+SOURCES = {
+    "sheet": SheetSource("sheet", SHEET_CSV_URL, SHEET_FALLBACK_ROWS),
+    "golden": SheetSource("golden", GOLDEN_SHEET_CSV_URL),
+}
+
+_refresher = None
+_refresher_lock = threading.Lock()
+
+
+def _refresh_forever():
+    while True:
+        time.sleep(REFRESH_SECONDS)
+        for source in SOURCES.values():
+            source.refresh()
+
+
+def start_refresher():
+    """Refresh every sheet in the background from now on (idempotent)"""
+    global _refresher
+    with _refresher_lock:
+        if _refresher is None:
+            _refresher = threading.Thread(target=_refresh_forever, name="sheet-refresh", daemon=True)
+            _refresher.start()
+
+
+def warm_up():
+    """Load every sheet now and keep them fresh, so no request waits on Google"""
+    def load():
+        for source in SOURCES.values():
+            source.get()
+    threading.Thread(target=load, name="sheet-warm-up", daemon=True).start()
+    start_refresher()
@@ -0,0 +1,120 @@
+"""
+Sheet blueprint: /api/sheet-data and /api/golden-sheet-data from in-memory snapshots
+- Same response shape as server.js ({success, data, headers, totalRows, fromCache})
+- ?columns=Gender,URL projects columns; ?offset=&limit= pages rows (totalRows stays the full count)
+- Responses carry an ETag (snapshot version + query) and answer If-None-Match with 304
+- Serialized bodies are memoized per snapshot and query, so a repeat request is a dict lookup
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+from flask import Blueprint, Response, request, jsonify
+
+import logs
+import metrics
+import serialization
+import sheet_data
+from executors import run_in_pool
+
+sheet_bp = Blueprint("sheets", __name__)
+log = logs.get_logger("sheets")
+
+MAX_LIMIT = 10000
+# Serialized responses kept across all sheets, snapshots and queries
+BODY_CACHE_SIZE = 64
+
+_bodies = OrderedDict()
+_bodies_lock = threading.Lock()
+
+
+class BadQuery(ValueError):
+    pass
+
+
+def parse_query(args, snapshot):
+    """(columns or None, offset, limit or None) from the query string"""
+    columns = None
+    if args.get("columns"):
+        columns = [name.strip() for name in args["columns"].split(",") if name.strip()]
+        unknown = [name for name in columns if name not in snapshot.columns]
+        if unknown:
+            raise BadQuery(f"Unknown columns: {', '.join(unknown)}")
+    try:
+        offset = int(args.get("offset", 0))
+        limit = int(args["limit"]) if args.get("limit") else None
+    except ValueError:
+        raise BadQuery("offset and limit must be integers") from None
+    if offset < 0 or (limit is not None and not 0 < limit <= MAX_LIMIT):
+        raise BadQuery(f"offset must be >= 0 and limit between 1 and {MAX_LIMIT}")
+    return columns, offset, limit
+
+
+def cached_body(key, build):
+    with _bodies_lock:
+        body = _bodies.get(key)
+        if body is not None:
+            _bodies.move_to_end(key)
+    metrics.record_cache("sheet_responses", body is not None)
+    if body is None:
+        body = build()
+        with _bodies_lock:
+            _bodies[key] = body
+            while len(_bodies) > BODY_CACHE_SIZE:
+                _bodies.popitem(last=False)
+    return body
+
+
+def sheet_response(name):
+    sheet_data.start_refresher()
+    snapshot, loaded_now = sheet_data.SOURCES[name].get()
+    try:
+        columns, offset, limit = parse_query(request.args, snapshot)
+    except BadQuery as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    query = (tuple(columns) if columns is not None else None, offset, limit)
+    etag = hashlib.sha1(repr((name, snapshot.version, query)).encode("utf-8")).hexdigest()[:20]
+    headers = {"ETag": f'"{etag}"', "Cache-Control": "no-cache"}
+    if request.if_none_match.contains(etag):
+        metrics.record_cache("sheet_etag", True)
+        return Response(status=304, headers=headers)
+    metrics.record_cache("sheet_etag", False)
+
+    def build():
+        names, rows = snapshot.rows(columns, offset, limit)
+        payload = {
+            "success": True,
+            "data": rows,
+            "headers": names,
+            "totalRows": snapshot.row_count,
+            "fromCache": snapshot.fallback or not loaded_now,
+            "version": snapshot.version,
+        }
+        if offset or limit is not None:
+            payload["offset"] = offset
+            payload["limit"] = limit
+        return serialization.dumps_bytes(payload)
+
+    # fromCache differs for the request that loaded the snapshot, so it is never memoized
+    body = build() if loaded_now else cached_body((name, snapshot.version, query), build)
+    return Response(body, mimetype="application/json", headers=headers)
+
+
+@sheet_bp.route("/api/sheet-data", methods=["GET"])
+@run_in_pool("sheets")
+def sheet_data_api():
+    return sheet_response("sheet")
+
+
+@sheet_bp.route("/api/golden-sheet-data", methods=["GET"])
+@run_in_pool("sheets")
+def golden_sheet_data_api():
+    return sheet_response("golden")
+
+
+@sheet_bp.route("/api/sheet-data/status", methods=["GET"])
+def sheet_status():
+    """Snapshot age, size and last refresh error per sheet"""
+    return jsonify({name: source.stats() for name, source in sheet_data.SOURCES.items()})
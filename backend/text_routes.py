@@ -0,0 +1,218 @@
+"""
+Text blueprint: Gemini product title and description generation
+"""
+
+from flask import Blueprint, request, jsonify
+
+import clients
+import logs
+import metrics
+from executors import run_in_pool
+
+text_bp = Blueprint("text", __name__)
+log = logs.get_logger("text")
+
+
+# --- TEXT GENERATION HELPERS ---
+
+
+def create_base_prompt(subcategory, product_details, task_type):
+   if task_type == 'name':
+       instruction = "TASK: Write exactly one labeled line: Product Name: [title here]"
+   else:
+       instruction = "TASK: Write exactly one labeled line: Product Description: [description here]"
+   return f"""
+You are an expert Amazon e-commerce copywriter specializing in Clothing.
+Generate a {'product title' if task_type == 'name' else 'product description'} based on the provided details.
+{instruction}
+
+
+Available Product Information:
+Subcategory: {subcategory}
+{product_details if product_details else 'No additional details provided'}
+
+
+IMPORTANT:
+- For title: Max 200 characters, include key features
+- For description: Max 2000 characters, focus on material, fit, and benefits
+- Use factual information only from the provided details
+- If details are limited, create a professional generic description
+- No promotional language, be factual and descriptive
+- End description with a complete sentence
+
+
+EXAMPLES:
+Even with minimal information, create professional output:
+
+
+Input:
+Subcategory: T-Shirt
+Brand: Generic Brand
+Material: Cotton
+
+
+Output for title:
+Product Name: Generic Brand Cotton T-Shirt | Comfortable Casual Wear
+
+
+Output for description:
+Product Description: This cotton t-shirt from Generic Brand offers comfortable everyday wear. Made from soft cotton material, it provides breathability and ease of movement. The classic design makes it suitable for various casual occasions.
+
+
+Subcategory: {subcategory}
+Details: {product_details if product_details else 'Basic clothing item'}
+"""
+
+
+def call_gemini(prompt, max_tokens):
+   try:
+       genai = clients.genai_module()
+       text_model = clients.get_text_model()
+       with metrics.GEMINI_SECONDS.time(model="text"):
+           response = text_model.generate_content(
+               prompt,
+               generation_config=genai.types.GenerationConfig(
+                   temperature=0.8,
+                   max_output_tokens=max_tokens,
+               ),
+           )
+       if not response.candidates:
+           return "Generation Failed: Model returned no candidates/output."
+
+
+       candidate = response.candidates[0]
+       finish_reason = candidate.finish_reason
+
+
+       FINISH_REASON_SAFETY = 2
+       FINISH_REASON_STOP = 1
+
+
+       if finish_reason == FINISH_REASON_SAFETY:
+           blocked_category_name = ""
+           if candidate.safety_ratings:
+               try:
+                   blocked_category_name = candidate.safety_ratings[0].category.name
+               except AttributeError:
+                   blocked_category_name = f"Code {candidate.safety_ratings[0].category}"
+           return f"Generation Failed: Output Blocked by Safety Filters (Finish Reason: SAFETY). Blocked Category: {blocked_category_name}"
+
+
+       if finish_reason == FINISH_REASON_STOP and hasattr(response, "text") and response.text:
+           return response.text.strip()
+
+
+       return "Generation Failed: Model stopped with non-success reason."
+   except Exception as e:
+       return f"Generation Failed: API Error. {type(e).__name__} - {str(e)}"
+
+
+def generate_product_name(subcategory, product_details):
+   prompt = create_base_prompt(subcategory, product_details, 'name')
+   raw_output = call_gemini(prompt, 2000)
+   label = "Product Name:"
+   if raw_output.startswith(label):
+       return raw_output[len(label):].strip()
+   return raw_output
+
+
+def generate_product_description(subcategory, product_details):
+   prompt = create_base_prompt(subcategory, product_details, 'description')
+   raw_output = call_gemini(prompt, 2000)
+   label = "Product Description:"
+   if raw_output.startswith(label):
+       return raw_output[len(label):].strip()
+   return raw_output
+
+
+# --- TEXT GENERATION ENDPOINT ---
+
+
+@text_bp.route('/api/generate-title-description', methods=['POST'])
+@run_in_pool("text")
+def generate_title_description():
+   try:
+       data = request.get_json()
+       log.debug("📝 Received text generation request with fields: %s", list(data) if data else [])
+
+
+       if not data:
+           return jsonify({'success': False, 'error': 'No data provided'}), 400
+
+
+       subcategory = data.get('subcategory', '')
+       task_type = data.get('type', 'title')
+
+
+       product_details_lines = []
+
+
+       for k, v in data.items():
+           if k not in ('subcategory', 'type') and v is not None:
+               cleaned_v = str(v).strip()
+               if cleaned_v and cleaned_v != 'N/A' and cleaned_v != 'null':
+                   product_details_lines.append(f"{k}: {cleaned_v}")
+
+
+       product_details = "\n".join(product_details_lines)
+
+
+       log.debug("🔍 Processed data - Subcategory: '%s', Details lines: %d", subcategory, len(product_details_lines))
+
+
+       if not subcategory:
+           if 'Generic Name' in data:
+               subcategory = data.get('Generic Name', '')
+           elif 'Product Type' in data:
+               subcategory = data.get('Product Type', '')
+           elif 'Category' in data:
+               subcategory = data.get('Category', '')
+
+
+       if not subcategory:
+           subcategory = "Clothing Item"
+           log.info("⚠ No subcategory found, using default")
+
+
+       if not product_details and len(product_details_lines) == 0:
+           log.info("✗ No valid product details found after cleaning")
+           minimal_details = []
+           for k, v in data.items():
+               if k not in ('subcategory', 'type') and v:
+                   minimal_details.append(f"{k}: {v}")
+
+
+           if minimal_details:
+               product_details = "\n".join(minimal_details)
+               log.debug("⚡ Using minimal details (%d lines)", len(minimal_details))
+           else:
+               return jsonify({
+                   'success': False,
+                   'error': 'Please provide at least some product details like Brand, Material, Fit, etc.'
+               }), 400
+
+
+       log.info("✓ Final - Subcategory: '%s', Details count: %d", subcategory, len(product_details_lines))
+
+
+       if task_type == 'title':
+           generated_title = generate_product_name(subcategory, product_details)
+           if generated_title.startswith("Generation Failed:"):
+               return jsonify({'success': False, 'error': generated_title}), 500
+           return jsonify({'success': True, 'generated_title': generated_title})
+
+
+       elif task_type == 'description':
+           generated_description = generate_product_description(subcategory, product_details)
+           if generated_description.startswith("Generation Failed:"):
+               return jsonify({'success': False, 'error': generated_description}), 500
+           return jsonify({'success': True, 'generated_description': generated_description})
+
+
+       else:
+           return jsonify({'success': False, 'error': 'Unknown type specified'}), 400
+
+
+   except Exception as e:
+       log.exception("Text generation failed")
+       return jsonify({'success': False, 'error': f'Internal server error: {str(e)}'}), 500
@@ -0,0 +1,313 @@
+"""
+Lightweight per-request tracing (OpenTelemetry-compatible)
+- span("name") context managers nest through contextvars, across threads started with copy_context()
+- Trace context travels in W3C traceparent / X-Request-ID headers and the TRACEPARENT env var
+- Finished spans are exported as OTLP/JSON to TRACE_FILE (JSON lines) and/or
+  OTEL_EXPORTER_OTLP_ENDPOINT (POST /v1/traces) from a background thread
+- The slowest recent traces are kept in memory for the flame-style summary endpoint
+- to_dict() / adopt() carry a finished span tree from a worker process back to the span that
+  dispatched it, so the worker's spans show up in that trace's flame summary
+"""
+
+import atexit
+import contextvars
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+import urllib.request
+from collections import deque
+from contextlib import contextmanager
+
+import logs
+
+SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "amz-comparator")
+REQUEST_ID_HEADER = "X-Request-ID"
+RECENT_TRACES = 200  # finished traces kept for /api/traces/slowest
+
+_current = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "request_id", "start_ns", "end_ns",
+                 "attributes", "status", "local_root", "children")
+
+    def __init__(self, name, trace_id, parent_id=None, request_id=None, local_root=False, attributes=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.request_id = request_id
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes or {})
+        self.status = "ok"
+        self.local_root = local_root
+        self.children = []
+
+    @property
+    def duration_ms(self):
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def traceparent(self):
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_otlp(self):
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "kind": 2 if self.local_root else 1,  # SERVER for roots, INTERNAL otherwise
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": 2 if self.status == "error" else 1},
+        }
+
+
+def _otlp_attribute(key, value):
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def parse_traceparent(value):
+    """Return (trace_id, parent_span_id) from a W3C traceparent, or (None, None)"""
+    parts = (value or "").strip().split("-")
+    if len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16:
+        return parts[1], parts[2]
+    return None, None
+
+
+def current_span():
+    return _current.get()
+
+
+def current_request_id():
+    span = _current.get()
+    return span.request_id if span else None
+
+
+# --- EXPORT ---
+
+class _Exporter:
+    """Batch finished spans to the configured file / OTLP endpoint on a daemon thread"""
+
+    def __init__(self):
+        self.path = os.getenv("TRACE_FILE")
+        endpoint = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")
+        self.endpoint = endpoint.rstrip("/") + "/v1/traces" if endpoint else None
+        self.enabled = bool(self.path or self.endpoint)
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, span):
+        if not self.enabled:
+            return
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                    self._thread.start()
+                    atexit.register(self.flush)
+        self._queue.put(span)
+
+    def _drain(self):
+        spans = []
+        while True:
+            try:
+                spans.append(self._queue.get_nowait())
+            except queue.Empty:
+                return spans
+
+    def _run(self):
+        while True:
+            time.sleep(1.0)
+            self.flush()
+
+    def flush(self):
+        spans = self._drain()
+        if not spans:
+            return
+        payload = {"resourceSpans": [{
+            "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+            "scopeSpans": [{"scope": {"name": "tracing"}, "spans": [s.to_otlp() for s in spans]}],
+        }]}
+        body = json.dumps(payload, separators=(",", ":"))
+        try:
+            if self.path:
+                with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                    f.write(body + "\n")
+            if self.endpoint:
+                req = urllib.request.Request(self.endpoint, data=body.encode("utf-8"),
+                                             headers={"Content-Type": "application/json"})
+                urllib.request.urlopen(req, timeout=5).close()
+        except Exception as e:
+            logs.get_logger("tracing").warning("⚠️ Trace export failed: %s", e)
+
+
+_exporter = _Exporter()
+_recent = deque(maxlen=RECENT_TRACES)
+_recent_lock = threading.Lock()
+
+
+def _finish(span):
+    span.end_ns = time.time_ns()
+    _exporter.submit(span)
+    if span.local_root:
+        with _recent_lock:
+            _recent.append(span)
+
+
+# --- SPANS ---
+
+def start_span(name, traceparent=None, request_id=None, **attributes):
+    """Open a span and make it current; pair with end_span(span, token)"""
+    parent = _current.get()
+    if parent is not None and not traceparent:
+        span = Span(name, parent.trace_id, parent.span_id, parent.request_id, attributes=attributes)
+        parent.children.append(span)
+    else:
+        trace_id, parent_id = parse_traceparent(traceparent)
+        span = Span(name, trace_id or secrets.token_hex(16), parent_id,
+                    request_id=request_id or secrets.token_hex(8), local_root=True, attributes=attributes)
+    return span, _current.set(span)
+
+
+def end_span(span, token, error=None):
+    if error is not None:
+        span.status = "error"
+        span.attributes["error"] = f"{type(error).__name__}: {error}"
+    _current.reset(token)
+    _finish(span)
+
+
+@contextmanager
+def span(name, **attributes):
+    """Trace a block as a child of the current span (or a new root)"""
+    opened, token = start_span(name, **attributes)
+    try:
+        yield opened
+    except BaseException as e:
+        end_span(opened, token, error=e)
+        raise
+    else:
+        end_span(opened, token)
+
+
+def record_span(name, duration_seconds, **attributes):
+    """Add an already-measured child span ending now (used by metrics.Stopwatch)"""
+    parent = _current.get()
+    if parent is None:
+        return
+    child = Span(name, parent.trace_id, parent.span_id, parent.request_id, attributes=attributes)
+    child.end_ns = time.time_ns()
+    child.start_ns = child.end_ns - int(duration_seconds * 1e9)
+    parent.children.append(child)
+    _exporter.submit(child)
+
+
+@contextmanager
+def continued(name, context, **attributes):
+    """Root span continuing a trace from a propagation_env() dict sent by another process"""
+    with span(name, traceparent=context.get("TRACEPARENT"), request_id=context.get("REQUEST_ID"), **attributes) as opened:
+        yield opened
+    _exporter.flush()
+
+
+def from_environment(name, **attributes):
+    """Root span for a CLI process, continuing TRACEPARENT / REQUEST_ID from the parent process"""
+    return continued(name, os.environ, **attributes)
+
+
+def propagation_env():
+    """Environment variables that let a child process join the current trace"""
+    current = _current.get()
+    if current is None:
+        return {}
+    return {"TRACEPARENT": current.traceparent(), "REQUEST_ID": current.request_id}
+
+
+def to_dict(span):
+    """A finished span and its children as plain data (picklable, for another process)"""
+    return {"name": span.name, "trace_id": span.trace_id, "span_id": span.span_id, "parent_id": span.parent_id,
+            "request_id": span.request_id, "start_ns": span.start_ns, "end_ns": span.end_ns,
+            "attributes": span.attributes, "status": span.status,
+            "children": [to_dict(child) for child in span.children]}
+
+
+def _from_dict(data):
+    span = Span(data["name"], data["trace_id"], data["parent_id"], data["request_id"], attributes=data["attributes"])
+    span.span_id, span.start_ns, span.end_ns, span.status = data["span_id"], data["start_ns"], data["end_ns"], data["status"]
+    span.children = [_from_dict(child) for child in data["children"]]
+    return span
+
+
+def adopt(data):
+    """Attach a to_dict() span tree under the current span; not exported again (its process already did)"""
+    parent = _current.get()
+    if parent is None or data is None:
+        return
+    parent.children.append(_from_dict(data))
+
+
+# --- FLAME SUMMARY ---
+
+def _flame_node(span):
+    children = sorted(span.children, key=lambda s: s.start_ns)
+    child_ms = sum(c.duration_ms for c in children)
+    return {
+        "name": span.name,
+        "duration_ms": round(span.duration_ms, 2),
+        "self_ms": round(max(0.0, span.duration_ms - child_ms), 2),
+        "status": span.status,
+        "attributes": span.attributes,
+        "children": [_flame_node(c) for c in children],
+    }
+
+
+def _folded(span, prefix=""):
+    """Folded stacks ("a;b;c self_ms"), the input format of flame graph tools"""
+    path = f"{prefix};{span.name}" if prefix else span.name
+    child_ms = sum(c.duration_ms for c in span.children)
+    lines = [f"{path} {max(0.0, span.duration_ms - child_ms):.2f}"]
+    for child in span.children:
+        lines.extend(_folded(child, path))
+    return lines
+
+
+def slowest_traces(limit=10):
+    with _recent_lock:
+        roots = list(_recent)
+    roots.sort(key=lambda s: s.duration_ms, reverse=True)
+    return [{
+        "trace_id": root.trace_id,
+        "request_id": root.request_id,
+        "name": root.name,
+        "duration_ms": round(root.duration_ms, 2),
+        "started_at": root.start_ns // 1_000_000,
+        "flame": _flame_node(root),
+        "folded": _folded(root),
+    } for root in roots[:limit]]
+
+
+def _log_context():
+    current = _current.get()
+    if current is None:
+        return None
+    return {"trace_id": current.trace_id, "span_id": current.span_id, "request_id": current.request_id}
+
+
+logs.register_context(_log_context)
@@ -0,0 +1,144 @@
+"""
+Variation (twister) matrix embedded in a parent product page's inline scripts
+- Amazon ships every child ASIN of a size/colour family with the parent page: the dimension
+  names, each dimension's values, each child's values and, on apparel pages, each colour's images
+- Each known key is located with a regex and only its value is decoded with json, so the
+  surrounding JavaScript never has to parse
+- parse() returns {"parentAsin", "currentAsin", "dimensions", "variants"} or None for a page
+  without variations; one fetch of the parent replaces a fetch per child ASIN
+- Decoded values are type-checked before use: a map that arrives as a list (or any other
+  unexpected shape) is treated as absent rather than failing the page
+"""
+
+import json
+import re
+
+# Scripts worth searching: the twister init data and the colour image map
+MARKERS = ("dimensionValuesDisplayData", "asinVariationValues", "dimensionToAsinMap", "twisterData", "landingAsinColor")
+
+_KEYS = ("parentAsin", "currentAsin", "dimensions", "dimensionsDisplay", "variationValues",
+         "dimensionValuesDisplayData", "asinVariationValues", "dimensionToAsinMap", "colorImages")
+_KEY_STARTS = {key: re.compile(r'["\']%s["\']\s*:\s*' % key) for key in _KEYS}
+_DECODER = json.JSONDecoder()
+_ASIN = re.compile(r'^[A-Z0-9]{10}$')
+
+# Upper bound on the JSON decoded per key (a colour image map on a large family is ~1 MB)
+MAX_VALUE_CHARS = 2_000_000
+
+
+def is_variation_script(text):
+    return any(marker in text for marker in MARKERS)
+
+
+def _values(scripts):
+    """{key: decoded value} for the first decodable occurrence of each key across the scripts"""
+    found = {}
+    for text in scripts:
+        for key, start in _KEY_STARTS.items():
+            if key in found:
+                continue
+            for match in start.finditer(text):
+                try:
+                    value, _ = _DECODER.raw_decode(text[match.end():match.end() + MAX_VALUE_CHARS])
+                except ValueError:
+                    continue  # e.g. ImageBlockATF's single-quoted colorImages
+                found[key] = value
+                break
+    return found
+
+
+def _mapping(found, key):
+    """found[key] when it decoded to an object, else {}"""
+    value = found.get(key)
+    return value if isinstance(value, dict) else {}
+
+
+def _label(value):
+    return isinstance(value, (str, int, float)) and not isinstance(value, bool)
+
+
+def _child_values(asin, found, dimensions):
+    """{dimension: value} for one child ASIN, from whichever map the page carries"""
+    display = _mapping(found, "dimensionValuesDisplayData").get(asin)
+    if isinstance(display, list) and len(display) == len(dimensions) and all(map(_label, display)):
+        return dict(zip(dimensions, display))
+
+    variation_values = _mapping(found, "variationValues")
+    indexes = _mapping(found, "asinVariationValues").get(asin)
+    if not isinstance(indexes, dict):
+        # dimensionToAsinMap: {"<index>_<index>": asin}
+        key = next((key for key, child in _mapping(found, "dimensionToAsinMap").items() if child == asin), None)
+        indexes = dict(zip(dimensions, key.split("_"))) if key else {}
+    values = {}
+    for dimension in dimensions:
+        options = variation_values.get(dimension)
+        if not isinstance(options, list):
+            continue
+        index = indexes.get(dimension)
+        if (isinstance(index, (str, int)) and str(index).isdigit() and int(index) < len(options)
+                and _label(options[int(index)])):
+            values[dimension] = options[int(index)]
+    return values
+
+
+def _images(color_images, values):
+    """Image URLs (hiRes, else large) for a child, looked up by its values in the colour image map"""
+    if not isinstance(color_images, dict) or not values:
+        return []
+    names = [" ".join(str(value) for value in values.values())] + [str(value) for value in values.values()]
+    for name in names:
+        entries = color_images.get(name)
+        if isinstance(entries, list):
+            return [entry.get("hiRes") or entry.get("large") for entry in entries
+                    if isinstance(entry, dict) and (entry.get("hiRes") or entry.get("large"))]
+    return []
+
+
+def parse(scripts, host="www.amazon.in"):
+    """The variation matrix from a page's script texts, or None when the page has none"""
+    found = _values([text for text in scripts if is_variation_script(text)])
+    dimensions = found.get("dimensions")
+    if not isinstance(dimensions, list) or not dimensions or not all(isinstance(name, str) for name in dimensions):
+        return None
+
+    children = []
+    for source in ("dimensionValuesDisplayData", "asinVariationValues"):
+        if isinstance(found.get(source), dict):
+            children = list(found[source])
+            break
+    else:
+        children = [asin for asin in _mapping(found, "dimensionToAsinMap").values() if isinstance(asin, str)]
+        children = list(dict.fromkeys(children))
+    children = [asin for asin in children if isinstance(asin, str) and _ASIN.match(asin)]
+    if not children:
+        return None
+
+    labels = found.get("dimensionsDisplay")
+    if not isinstance(labels, list) or len(labels) != len(dimensions):
+        labels = dimensions
+    variation_values = _mapping(found, "variationValues")
+    color_images = {name: entries for name, entries in _mapping(found, "colorImages").items() if name != "initial"}
+
+    variants = []
+    for asin in children:
+        values = _child_values(asin, found, dimensions)
+        variants.append({
+            "asin": asin,
+            "url": f"https://{host}/dp/{asin}",
+            "values": values,
+            "images": _images(color_images, values),
+        })
+
+    dimension_values = []
+    for name, label in zip(dimensions, labels):
+        options = variation_values.get(name)
+        if not isinstance(options, list) or not options:
+            options = list(dict.fromkeys(v["values"][name] for v in variants if name in v["values"]))
+        dimension_values.append({"name": name, "label": label, "values": options})
+
+    return {
+        "parentAsin": found.get("parentAsin"),
+        "currentAsin": found.get("currentAsin"),
+        "dimensions": dimension_values,
+        "variants": variants,
+    }